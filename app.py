@@ -1,101 +1,398 @@
-import pandas as pd
 import os
+import sys
+from collections import Counter
 
-def load_data(file_path):
-    """Loads data from a CSV file."""
+from bitwarden_csv_manager import lazy, lite, profiling
+
+# The data modules import pandas, so they load in the background while the
+# menu is shown; see lazy.py
+batch = lazy.LazyModule('bitwarden_csv_manager.batch')
+breach = lazy.LazyModule('bitwarden_csv_manager.breach')
+cache = lazy.LazyModule('bitwarden_csv_manager.cache')
+cleaning = lazy.LazyModule('bitwarden_csv_manager.cleaning')
+dedup = lazy.LazyModule('bitwarden_csv_manager.dedup')
+hygiene = lazy.LazyModule('bitwarden_csv_manager.hygiene')
+importers = lazy.LazyModule('bitwarden_csv_manager.importers')
+json_format = lazy.LazyModule('bitwarden_csv_manager.json_format')
+near_dedup = lazy.LazyModule('bitwarden_csv_manager.near_dedup')
+query = lazy.LazyModule('bitwarden_csv_manager.query')
+search = lazy.LazyModule('bitwarden_csv_manager.search')
+streaming = lazy.LazyModule('bitwarden_csv_manager.streaming')
+
+BACKGROUND_MODULES = tuple(
+    module.__name__ for module in (
+        streaming, search, query, cache, cleaning, importers, dedup, near_dedup, hygiene, breach
+    )
+)
+
+def load_data(file_path, frame_cache=None):
+    """Loads data from a CSV or JSON export, through the parsed-file cache if given."""
     try:
-        return pd.read_csv(file_path)
+        return cache.load_with_cache(file_path, streaming.read_export, frame_cache)
     except FileNotFoundError:
         print(f"Error: The file at {file_path} was not found.")
         return None
 
-def filter_data(df, column, value):
-    """Filters the DataFrame based on a column and value."""
-    return df[df[column].str.contains(value, case=False, na=False)]
+def open_export(file_path, streamed):
+    """
+    Returns (df, cache, search index) for the menu, df None if the file is gone.
+    
+    Only the header of a streamed export is read.
+    """
+    # Parsed files are cached only when the user has chosen a cache directory
+    try:
+        frame_cache = cache.FrameCache.from_env()
+    except cache.CacheUnavailable as e:
+        print(f"⚠️  {e}")
+        frame_cache = None
+        
+    if streamed:
+        return streaming.read_header(file_path), frame_cache, None
+    df = load_data(file_path, frame_cache)
+    if df is None:
+        return None, frame_cache, None
+    print("CSV file loaded successfully.")
+    # Columns are indexed on first search so repeated searches are fast
+    return df, frame_cache, search.SearchIndex(df)
+
+def filter_data(df, column, value, index=None, mode=None):
+    """Filters the DataFrame based on a column and value, using a SearchIndex if given."""
+    mode = mode or search.DEFAULT_SEARCH_MODE
+    if index is not None:
+        return index.filter(column, value, mode=mode)
+    return df[search.match_mask(search.column_values(df[column]), value, mode=mode)]
 
 def export_data(df, file_path):
-    """Exports the DataFrame to a CSV file."""
-    df.to_csv(file_path, index=False)
+    """Exports the DataFrame to a CSV file, or a Bitwarden JSON export for .json names."""
+    with lite.atomic_output(file_path) as tmp_path:
+        if json_format.is_json_path(file_path):
+            json_format.export_json_chunks([df], tmp_path)
+        else:
+            df.to_csv(tmp_path, index=False)
     print(f"Data exported successfully to {file_path}")
 
+def print_progress(rows_read, bytes_read, total_bytes):
+    """Prints streaming progress on a single console line."""
+    percent = 100 * bytes_read / total_bytes if total_bytes else 100
+    print(f"\rProcessed {rows_read} rows ({percent:.0f}%)", end="", flush=True)
+
 def get_user_filter(df):
-    """Gets filtering criteria from the user."""
+    """Gets filtering criteria from the user as a Query."""
     print("\nAvailable columns:")
     for col in df.columns:
         print(f"- {col}")
     
-    column = input("Enter the column to filter by: ")
-    if column not in df.columns:
-        print("Invalid column.")
-        return None, None
+    print("\nEnter a column to filter by, or a query such as:")
+    print("  type=login AND login_uri~bank AND folder!=Work")
+    column = input("Column or query: ").strip()
+    
+    try:
+        if column not in df.columns:
+            return query.parse_query(column, columns=df.columns)
+            
+        value = input(f"Enter the value to search for in '{column}': ")
+        if not value:
+            return None
+        mode = input("Search as (1) plain text or (2) regular expression? [1]: ").strip()
+        return query.column_query(column, value, mode='regex' if mode == '2' else 'literal')
+    except query.QueryError as e:
+        print(f"Invalid filter: {e}")
+        return None
+
+def get_dedup_policy():
+    """Asks the user how duplicate entries should be handled."""
+    print("\nHow should duplicates be handled?")
+    print("1. Keep the first entry of each group")
+    print("2. Keep the newest entry of each group")
+    print("3. Report only")
+    print("4. Find similar entries (possible typos) for review")
+    choice = input("Enter your choice (1/2/3/4): ")
+    return {'1': 'keep_first', '2': 'keep_newest', '3': 'report', '4': 'similar'}.get(choice)
+
+def show_duplicates(report, group_column=None):
+    """Prints a duplicate report and offers to save it."""
+    group_column = group_column or dedup.GROUP_COLUMN
+    groups = report[group_column].nunique() if len(report) else 0
+    print(f"\nFound {len(report)} duplicate entries in {groups} groups.")
+    if report.empty:
+        return
+        
+    columns = [group_column] + [col for col in ('name', 'login_uri', 'login_username') if col in report.columns]
+    print(report[columns])
+    
+    save = input("\nSave the full duplicate report to a CSV? (y/n): ").lower()
+    if save == 'y':
+        report_filename = input("Enter a filename for the report (e.g., 'duplicates.csv'): ")
+        export_data(report, report_filename)
+
+def show_password_report(report):
+    """Prints the password hygiene summary and offers to save the report."""
+    print()
+    for line in hygiene.describe_summary(hygiene.hygiene_summary(report)):
+        print(line)
+    if report.empty:
+        return
         
-    value = input(f"Enter the value to search for in '{column}': ")
-    return column, value
+    print("\nMost reused and weakest first:")
+    print(report[[col for col in ('name', 'login_username', 'strength', 'reuse_count') if col in report.columns]].head(20))
+    
+    save = input("\nSave the full report (no passwords included)? (y/n): ").lower()
+    if save == 'y':
+        report_filename = input("Enter a filename, .csv or .json (e.g., 'password_report.csv'): ")
+        hygiene.save_report(report, report_filename)
+        print(f"Report saved to {report_filename}")
+
+def show_breaches(flagged, checked):
+    """Prints the entries whose password is breached and offers to save them."""
+    print(f"\n{len(flagged)} of {checked} entries use a password found in the breach corpus.")
+    if flagged.empty:
+        return
+        
+    print(flagged)
+    save = input("\nSave the list (no passwords included)? (y/n): ").lower()
+    if save == 'y':
+        report_filename = input("Enter a filename for the list (e.g., 'breached.csv'): ")
+        export_data(flagged, report_filename)
+
+def main(argv=None):
+    """Main function to run the application.
+    
+    With arguments, runs a batch command (see batch.py) and exits with its
+    status; without, starts the interactive menu. A leading
+    "--profile FILE" writes a cProfile file of either; batch commands are
+    profiled in the main process only, so add -j 1 to include their work.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    profile_path, argv = profiling.pop_profile_option(argv)
+    if profile_path:
+        profiling.start_profiling(profile_path)
+    try:
+        with profiling.profile_thread():
+            status = batch.batch_main(argv) if argv else menu()
+    finally:
+        if profiling.stop_profiling():
+            print(f"Profile written to {profile_path} (view it with: python -m pstats {profile_path})")
+    if argv:
+        sys.exit(status)
 
-def main():
-    """Main function to run the application."""
+def menu():
+    """Runs the interactive menu."""
     print("⚠️  SECURITY WARNING: Never commit actual password files to version control!")
     print("Place your Bitwarden export CSV file in this directory and update the filename below.\n")
     
     # Update this filename to match your actual Bitwarden export
-    csv_file = 'your_bitwarden_export.csv'  # ← Change this to your file's name
+    csv_file = 'your_bitwarden_export.csv'  # ← Change this to your file's name (.csv or .json)
+    memory_limit = lite.DEFAULT_MEMORY_LIMIT  # ← Lower this on machines with little RAM
     
     if not os.path.exists(csv_file):
         print(f"❌ File '{csv_file}' not found!")
         print("\n📋 Instructions:")
-        print("1. Export your data from Bitwarden as CSV")
+        print("1. Export your data from Bitwarden as CSV or unencrypted JSON")
         print("2. Place the file in this directory") 
         print("3. Update the 'csv_file' variable in this script with the correct filename")
         print("4. NEVER commit the actual password file to git!")
         return
     
-    df = load_data(csv_file)
-
-    if df is not None:
-        print("CSV file loaded successfully.")
+    # pandas loads while the menu is shown; the file is read on first use
+    lazy.preload(*BACKGROUND_MODULES)
+    df = frame_cache = search_index = None
+    
+    # The ideal column order is read from ideal_bitwarden_export.csv once
+    ideal_columns = lite.load_ideal_columns()
+    
+    # Large exports are processed chunk by chunk; only the header is kept in memory.
+    streamed = lite.needs_streaming(csv_file, memory_limit)
+    if streamed:
+        print("Large CSV file detected - it will be processed in chunks.")
         
-        while True:
-            print("\nWhat would you like to do?")
-            print("1. Filter data and export")
-            print("2. Export entire database in ideal format")
-            print("3. Exit")
-            choice = input("Enter your choice (1/2/3): ")
-
-            if choice == '1':
-                column, value = get_user_filter(df)
-                
-                if column and value:
-                    filtered_df = filter_data(df, column, value)
-                    print(f"\nFound {len(filtered_df)} results:")
+    # Stages of the last action, timed for the summary printed after it
+    timings = profiling.Timings()
+    while True:
+        if timings.spans:
+            print(f"\n⏱  {timings.summary()}")
+        timings = profiling.Timings()
+        print("\nWhat would you like to do?")
+        print("1. Filter data and export")
+        print("2. Export entire database in ideal format")
+        print("3. Find duplicate entries")
+        print("4. Password hygiene report (reused and weak passwords)")
+        print("5. Check passwords against a breach list (offline)")
+        print("6. Purge the parsed-file cache")
+        print("7. Exit")
+        choice = input("Enter your choice (1/2/3/4/5/6/7): ")
+        
+        if choice in ('1', '3', '4', '5', '6') and df is None:
+            with timings.span('load'):
+                df, frame_cache, search_index = open_export(csv_file, streamed)
+            if df is None:
+                return
+
+        if choice == '1':
+            row_query = get_user_filter(df)
+            
+            if row_query and streamed:
+                export_filename = input("Enter a filename for the export (e.g., 'export.csv'): ")
+                chunks = timings.chunks(
+                    'parse', streaming.iter_chunks(csv_file, memory_limit=memory_limit, progress=print_progress, workers=None)
+                )
+                chunks = timings.chunks('filter', streaming.query_chunks(chunks, row_query))
+                with timings.span('write'):
+                    rows = streaming.export_chunks(chunks, export_filename)
+                print(f"\nFound {rows} results, exported to {export_filename}")
+
+            elif row_query:
+                with timings.span('filter', rows=len(df)):
+                    filtered_df = row_query.filter(df, index=search_index)
+                print(f"\nFound {len(filtered_df)} results:")
+                with timings.span('display', rows=len(filtered_df)):
                     print(filtered_df)
-                    
-                    if not filtered_df.empty:
-                        export = input("\nExport these results to a new CSV? (y/n): ").lower()
-                        if export == 'y':
-                            export_filename = input("Enter a filename for the export (e.g., 'export.csv'): ")
+                
+                if not filtered_df.empty:
+                    export = input("\nExport these results to a new CSV? (y/n): ").lower()
+                    if export == 'y':
+                        export_filename = input("Enter a filename for the export (e.g., 'export.csv'): ")
+                        with timings.span('write', rows=len(filtered_df)):
                             export_data(filtered_df, export_filename)
+        
+        elif choice == '2':
+            output_filename = input(
+                "Enter a filename, .csv or .json for Bitwarden JSON [formatted_export.csv]: "
+            ).strip() or 'formatted_export.csv'
+            clean_prompt = "Clean export artifacts (escapes, whitespace, URIs, flags)? (y/n): "
             
-            elif choice == '2':
-                ideal_format_file = 'ideal_bitwarden_export.csv'
-                output_filename = 'formatted_export.csv'
-                
-                try:
-                    ideal_df = pd.read_csv(ideal_format_file)
-                    ideal_columns = ideal_df.columns.tolist()
+            # Small Bitwarden CSV exports are formatted by the csv module, without pandas
+            clean = None
+            if lite.is_small_export(csv_file, output_filename):
+                clean = input(clean_prompt).lower() == 'y'
+                if not clean:
+                    with timings.span('format') as span:
+                        rows = lite.format_small_file(csv_file, output_filename, ideal_columns)
+                        span.add_rows(rows)
+                    print(f"Exported {rows} entries to {output_filename}")
+                    continue
                     
-                    # Reindex the dataframe with the ideal columns
-                    # This will add missing columns with NaN and reorder existing ones.
-                    formatted_df = df.reindex(columns=ideal_columns)
+            if df is None:
+                with timings.span('load'):
+                    df, frame_cache, search_index = open_export(csv_file, streamed)
+                if df is None:
+                    return
                     
-                    export_data(formatted_df, output_filename)
-                except FileNotFoundError:
-                    print(f"Error: Ideal format file '{ideal_format_file}' not found.")
+            # Reorder to the ideal columns, adding missing ones as blanks, one chunk at a time
+            if streamed:
+                chunks = timings.chunks(
+                    'parse', streaming.iter_chunks(csv_file, memory_limit=memory_limit, progress=print_progress, workers=None)
+                )
+            else:
+                chunks = streaming.split_frame(df)
+            # Other password managers' exports are mapped to Bitwarden's columns first
+            with timings.span('detect'):
+                source = importers.detect_format(csv_file)
+            if source in importers.IMPORTERS:
+                print(f"Detected a {importers.SOURCE_LABELS[source]} export; converting it to Bitwarden's columns.")
+                chunks = timings.chunks('import', importers.import_chunks(chunks, source))
+                
+            if clean is None:
+                clean = input(clean_prompt).lower() == 'y'
+            counts = Counter()
+            if clean:
+                chunks = timings.chunks('clean', cleaning.clean_chunks(chunks, counts=counts))
+            chunks = timings.chunks('format', streaming.format_chunks(chunks, ideal_columns))
+            with timings.span('write'):
+                rows = streaming.export_chunks(chunks, output_filename)
+            if streamed:
+                print()
+            print(f"Exported {rows} entries to {output_filename}")
+            if clean:
+                for line in cleaning.describe_counts(counts):
+                    print(f"  {line}")
+
+        elif choice == '3':
+            policy = get_dedup_policy()
+            if policy is None:
+                print("Invalid choice.")
+                continue
+                
+            if policy == 'similar':
+                if streamed:
+                    # Only the compared columns are read from large files
+                    columns = [col for col in near_dedup.KEY_COLUMNS if col in df.columns]
+                    chunks = streaming.iter_chunks(
+                        csv_file, memory_limit=memory_limit, progress=print_progress, workers=None, usecols=columns
+                    )
+                    source_df = streaming.collect_chunks(timings.chunks('parse', chunks), columns=columns)
+                    print()
+                else:
+                    source_df = df
+                with timings.span('similar', rows=len(source_df)):
+                    report = near_dedup.find_near_duplicates(source_df)
+                show_duplicates(report, near_dedup.NEAR_GROUP_COLUMN)
+                continue
+                
+            output_filename = None
+            if policy != 'report':
+                output_filename = input("Enter a filename for the de-duplicated export (e.g., 'deduplicated.csv'): ")
+                
+            if streamed:
+                with timings.span('dedup') as span:
+                    rows, report = dedup.dedup_file(
+                        csv_file, output_filename, policy, memory_limit=memory_limit, progress=print_progress,
+                        workers=None
+                    )
+                    span.add_rows(rows)
+                print()
+                if output_filename:
+                    print(f"Exported {rows} entries to {output_filename}")
+            else:
+                with timings.span('dedup', rows=len(df)):
+                    deduped_df, report = dedup.drop_duplicates(df, policy)
+                if output_filename:
+                    with timings.span('write', rows=len(deduped_df)):
+                        export_data(deduped_df, output_filename)
+                    
+            show_duplicates(report)
+
+        elif choice == '4':
+            if streamed:
+                with timings.span('hygiene'):
+                    report = hygiene.password_report_file(csv_file, memory_limit=memory_limit, progress=print_progress)
+                print()
+            else:
+                with timings.span('hygiene', rows=len(df)):
+                    report = hygiene.password_report(df)
+            show_password_report(report)
+
+        elif choice == '5':
+            corpus_path = os.environ.get(breach.CORPUS_ENV) or input(
+                "Path to a Pwned Passwords SHA-1 file (ordered by hash): "
+            ).strip()
+            try:
+                if streamed:
+                    with timings.span('breach'):
+                        flagged, checked = breach.breached_entries_file(
+                            csv_file, corpus_path, memory_limit=memory_limit, progress=print_progress
+                        )
+                    print()
+                else:
+                    with timings.span('breach', rows=len(df)):
+                        flagged = breach.breached_entries(df, corpus_path)
+                    checked = int(df[breach.PASSWORD_COLUMN].notna().sum()) if breach.PASSWORD_COLUMN in df.columns else 0
+            except (OSError, ValueError) as e:
+                print(f"Error: {e}")
+                continue
+            show_breaches(flagged, checked)
 
-            elif choice == '3':
-                print("Exiting.")
-                break
+        elif choice == '6':
+            if frame_cache is None:
+                print(f"No cache is configured. Set {cache.CACHE_DIR_ENV} to a private directory to enable it.")
             else:
-                print("Invalid choice. Please try again.")
+                removed = frame_cache.purge()
+                print(f"Removed {removed} cached file(s) from {frame_cache.directory}")
+
+        elif choice == '7':
+            print("Exiting.")
+            break
+        else:
+            print("Invalid choice. Please try again.")
 
 if __name__ == "__main__":
     main()
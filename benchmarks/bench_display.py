@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: vectorized display formatting vs. the per-cell loop
+that display_data used to run.
+
+    python benchmarks/bench_display.py [rows]
+"""
+
+import os
+import sys
+import timeit
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitwarden_csv_manager.display import format_for_display
+from synthetic import make_frame
+
+
+def legacy_format(df):
+    """The original nested loop from BitwardenCSVManager.display_data."""
+    rows = []
+    for index, row in df.iterrows():
+        display_row = []
+        for value in row:
+            str_val = str(value) if pd.notna(value) else ""
+            if len(str_val) > 50:
+                str_val = str_val[:47] + "..."
+            display_row.append(str_val)
+        rows.append(display_row)
+    return rows
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    df = make_frame(rows)
+
+    assert format_for_display(df) == legacy_format(df), "outputs differ"
+
+    legacy = min(timeit.repeat(lambda: legacy_format(df), number=1, repeat=3))
+    vectorized = min(timeit.repeat(lambda: format_for_display(df), number=1, repeat=3))
+
+    print(f"rows:       {rows}")
+    print(f"loop:       {legacy:.3f}s ({legacy / rows * 1e6:.2f} us/row)")
+    print(f"vectorized: {vectorized:.3f}s ({vectorized / rows * 1e6:.2f} us/row)")
+    print(f"speedup:    {legacy / vectorized:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Parse throughput of each installed CSV engine on a wide, note-heavy
+synthetic export, checking that every engine returns the same frame.
+
+    python benchmarks/bench_engines.py [rows] [extra_columns]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitwarden_csv_manager.engines import available_engines
+from bitwarden_csv_manager.schema import read_compact_csv
+from synthetic import make_frame
+
+
+def make_wide_frame(rows, extra_columns):
+    """Adds custom-field columns and long multi-line notes to the synthetic vault."""
+    df = make_frame(rows)
+    df['notes'] = df['notes'].fillna("") + "Recovery codes:\n" + df['login_password'] * 8
+    for i in range(extra_columns):
+        df[f'custom_{i}'] = df['name'] + f" field {i}"
+    return df
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    extra_columns = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'wide.csv')
+        make_wide_frame(rows, extra_columns).to_csv(path, index=False)
+        size_mb = os.path.getsize(path) / 2 ** 20
+        print(f"rows: {rows}, columns: {11 + extra_columns}, size: {size_mb:.1f} MiB")
+
+        reference = None
+        for engine in available_engines():
+            df = read_compact_csv(path, engine=engine)
+            if reference is None:
+                reference = df
+            identical = df.equals(reference)
+            seconds = min(timeit.repeat(lambda: read_compact_csv(path, engine=engine), number=1, repeat=3))
+            print(f"{engine:<11} {seconds:7.3f}s {size_mb / seconds:8.1f} MiB/s "
+                  f"{rows / seconds:12.0f} rows/s  identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Memory use of a synthetic vault loaded with pandas' inferred dtypes vs.
+the compact schema, and a check that the compact frame writes back the
+same bytes.
+
+    python benchmarks/bench_memory.py [rows]
+"""
+
+import os
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitwarden_csv_manager.schema import memory_usage, read_compact_csv
+from synthetic import make_frame
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'vault.csv')
+        make_frame(rows).to_csv(path, index=False)
+        with open(path, newline='', encoding='utf-8') as handle:
+            original = handle.read()
+
+        inferred = pd.read_csv(path)
+        compact = read_compact_csv(path)
+
+    before = memory_usage(inferred)
+    after = memory_usage(compact)
+    print(f"rows:     {rows}")
+    print(f"inferred: {before / 2 ** 20:.1f} MiB")
+    print(f"compact:  {after / 2 ** 20:.1f} MiB ({100 * after / before:.0f}%)")
+    print(f"dtypes:   {', '.join(f'{col}={dtype}' for col, dtype in compact.dtypes.items())}")
+    print(f"round trip identical: {compact.to_csv(index=False) == original}")
+
+
+if __name__ == "__main__":
+    main()
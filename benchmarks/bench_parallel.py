@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Parse throughput of one large, note-heavy export read in one piece vs.
+split at record boundaries and parsed by 1..N worker processes, checking
+that every result equals the single-threaded read.
+
+    python benchmarks/bench_parallel.py [rows] [max_workers]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitwarden_csv_manager.parallel import read_parallel
+from bitwarden_csv_manager.schema import read_compact_csv
+from bench_engines import make_wide_frame
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'vault.csv')
+        make_wide_frame(rows, 0).to_csv(path, index=False)
+        size_mb = os.path.getsize(path) / 2 ** 20
+        print(f"rows: {rows}, size: {size_mb:.1f} MiB, cores: {os.cpu_count()}")
+
+        reference = read_compact_csv(path)
+        seconds = min(timeit.repeat(lambda: read_compact_csv(path), number=1, repeat=3))
+        print(f"{'single':<10} {seconds:7.3f}s {size_mb / seconds:8.1f} MiB/s")
+
+        workers = 2
+        while workers <= max(max_workers, 2):
+            identical = read_parallel(path, workers=workers).equals(reference)
+            seconds = min(timeit.repeat(lambda: read_parallel(path, workers=workers), number=1, repeat=3))
+            print(f"{workers:>2} workers {seconds:7.3f}s {size_mb / seconds:8.1f} MiB/s  identical: {identical}")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
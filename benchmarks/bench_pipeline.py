@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Wall time, peak RSS and rows/sec of every pipeline stage on synthetic
+vaults of several sizes, saved as JSON so runs can be compared over time.
+
+    load      main.load_data (parse, narrow dtypes)
+    filter    main.filter_data through a SearchIndex, as the filter dialog
+    query     a multi-column query, as the filter dialog's query box
+    format    reordering to the ideal columns, as Format for Bitwarden
+    write     writing the formatted rows with to_csv
+    dedup     finding duplicate groups (http/https, www., case)
+    display   sorting by name and formatting the visible rows, as the preview
+    stream    filtering the file chunk by chunk, as for exports too large to load
+
+    python benchmarks/bench_pipeline.py [ROWS ...] [--seed N] [--stages load,filter]
+        [--output FILE.json] [--compare OLD.json]
+
+ROWS default to 1000 10000 100000 and accept 1e6 etc.; vaults come from
+synthetic.write_vault with the given seed. Results go to
+benchmarks/results/pipeline-<time>.json unless --output is given;
+--compare prints each stage's time relative to an earlier results file.
+"""
+
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bitwarden_csv_manager.dedup import drop_duplicates
+from bitwarden_csv_manager.display import format_for_display
+from bitwarden_csv_manager.main import filter_data, load_data
+from bitwarden_csv_manager.profiling import current_rss
+from bitwarden_csv_manager.query import parse_query
+from bitwarden_csv_manager.schema import load_ideal_columns
+from bitwarden_csv_manager.search import SearchIndex
+from bitwarden_csv_manager.streaming import export_chunks, format_chunks, iter_chunks, query_chunks, split_frame
+from synthetic import write_vault
+
+STAGES = ('load', 'filter', 'query', 'format', 'write', 'dedup', 'display', 'stream')
+DEFAULT_ROWS = (1000, 10000, 100000)
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+FILTER = ('login_uri', 'github')
+QUERY = 'type=login AND login_uri~bank AND folder!=Work'
+VISIBLE_ROWS = 40
+SAMPLE_SECONDS = 0.005
+
+
+def max_rss():
+    """Returns the peak resident set size of this process so far in bytes, or 0 where unknown."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RSSMonitor:
+    """Samples the resident set size on a thread to find a stage's peak."""
+
+    def __init__(self):
+        self.start = current_rss()
+        self.peak = self.start or 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(SAMPLE_SECONDS):
+            self.peak = max(self.peak, current_rss() or 0)
+
+    def __enter__(self):
+        if self.start is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        end = current_rss()
+        if self.start is None:
+            # Without /proc only the lifetime peak is known
+            self.peak = max_rss()
+            self.end = None
+            return
+        self._thread.join()
+        self.end = end
+        self.peak = max(self.peak, end)
+
+
+def measure(stage, rows, function):
+    """Runs function() once and returns (its result, the stage's measurements)."""
+    gc.collect()
+    with RSSMonitor() as monitor:
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+    return result, {
+        'stage': stage,
+        'rows': rows,
+        'seconds': round(seconds, 6),
+        'rows_per_second': round(rows / seconds) if seconds else None,
+        'peak_rss_mib': round(monitor.peak / 2 ** 20, 1),
+        'rss_delta_mib': round((monitor.end - monitor.start) / 2 ** 20, 1) if monitor.end is not None else None,
+    }
+
+
+def run_size(rows, seed, stages, tmp):
+    """Generates one vault and measures the chosen stages on it."""
+    path = os.path.join(tmp, f'vault-{rows}.csv')
+    output = os.path.join(tmp, 'output.csv')
+    start = time.perf_counter()
+    write_vault(path, rows, seed)
+    print(f"\n{rows} rows, {os.path.getsize(path) / 2 ** 20:.1f} MiB (generated in {time.perf_counter() - start:.1f}s)")
+
+    results = []
+
+    def record(stage, count, function):
+        if stage not in stages:
+            return None
+        result, measurement = measure(stage, count, function)
+        measurement['file_bytes'] = os.path.getsize(path)
+        results.append(measurement)
+        print(
+            f"  {stage:<8} {measurement['seconds']:9.3f}s {measurement['rows_per_second'] or 0:>12,} rows/s"
+            f"  peak {measurement['peak_rss_mib']:8.1f} MiB"
+        )
+        return result
+
+    # Later stages need the loaded frame, so it is read even when load is not measured
+    df = record('load', rows, lambda: load_data(path))
+    if df is None:
+        df = load_data(path)
+    columns = load_ideal_columns()
+
+    index = SearchIndex(df)
+    record('filter', rows, lambda: filter_data(df, *FILTER, index=index))
+    query = parse_query(QUERY, columns=df.columns)
+    record('query', rows, lambda: query.filter(df, index=index))
+    formatted = record('format', rows, lambda: list(format_chunks(split_frame(df), columns)))
+    if formatted is None and 'write' in stages:
+        formatted = list(format_chunks(split_frame(df), columns))
+    record('write', rows, lambda: export_chunks(formatted, output))
+    formatted = None
+    record('dedup', rows, lambda: drop_duplicates(df, 'report'))
+    record('display', rows, lambda: format_for_display(
+        df.sort_values('name', kind='stable', na_position='last').head(VISIBLE_ROWS)
+    ))
+    record('stream', rows, lambda: export_chunks(query_chunks(iter_chunks(path), query), output))
+    return results
+
+
+def git_commit():
+    """Returns the checked-out commit, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, old_path):
+    """Prints each stage's time against the same stage and size in an earlier run."""
+    with open(old_path, encoding='utf-8') as handle:
+        old = {(r['rows'], r['stage']): r for r in json.load(handle)['results']}
+    print(f"\nCompared with {old_path}:")
+    for result in results:
+        before = old.get((result['rows'], result['stage']))
+        if before and before['seconds']:
+            ratio = result['seconds'] / before['seconds']
+            print(f"  {result['rows']:>10} {result['stage']:<8} {before['seconds']:9.3f}s -> {result['seconds']:9.3f}s  ({ratio:.2f}x)")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic vaults.")
+    parser.add_argument('rows', nargs='*', type=lambda value: int(float(value)), default=list(DEFAULT_ROWS),
+                        help="vault sizes in rows (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="generator seed (default: 0)")
+    parser.add_argument('--stages', default=','.join(STAGES), help="comma-separated stages (default: all)")
+    parser.add_argument('--output', help="results file (default: benchmarks/results/pipeline-<time>.json)")
+    parser.add_argument('--compare', metavar='OLD', help="an earlier results file to compare with")
+    args = parser.parse_args(argv)
+    args.stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))} (choose from {', '.join(STAGES)})")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    started = datetime.datetime.now()
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            results.extend(run_size(rows, args.seed, args.stages, tmp))
+
+    try:
+        import pyarrow
+        pyarrow_version = pyarrow.__version__
+    except ImportError:
+        pyarrow_version = None
+    report = {
+        'benchmark': 'pipeline',
+        'started': started.isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'pyarrow': pyarrow_version,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'seed': args.seed,
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline-{started:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+        handle.write('\n')
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
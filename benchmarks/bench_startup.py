@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Start-up latency of the entry points, each measured from spawning a fresh
+interpreter:
+
+    first prompt  the interactive menu asking for a choice
+    first window  the GUI window mapped on screen (needs a display)
+    pandas        importing pandas alone, what both used to wait for
+
+The best of several runs is reported, as the first runs also warm the
+disk cache.
+
+    python benchmarks/bench_startup.py [runs]
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROMPT = b"Enter your choice"
+
+CLI = "from bitwarden_csv_manager.main import main; main()"
+GUI = """
+import sys, tkinter as tk
+from bitwarden_csv_manager.gui import BitwardenCSVManager
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print("no display", flush=True)
+    sys.exit()
+app = BitwardenCSVManager(root)
+root.wait_visibility()
+print("window", 'pandas' in sys.modules, flush=True)
+root.destroy()
+"""
+PANDAS = "import pandas; print('imported', flush=True)"
+
+
+def spawn(code, cwd, stdin=None):
+    """Starts code in a fresh interpreter with the repository importable."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.Popen(
+        [sys.executable, '-c', code], cwd=cwd, env=env,
+        stdin=subprocess.PIPE if stdin is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+
+
+def time_to_output(code, cwd, marker, stdin=None):
+    """Returns (seconds until marker is printed, the line holding it), or (None, last line)."""
+    start = time.perf_counter()
+    process = spawn(code, cwd, stdin)
+    seen = b""
+    line = b""
+    while True:
+        block = process.stdout.read1(4096)
+        if not block:
+            break
+        seen += block
+        if marker in seen:
+            elapsed = time.perf_counter() - start
+            line = seen[seen.index(marker):].split(b"\n")[0]
+            process.communicate(stdin)
+            return elapsed, line.decode()
+        line = seen.strip().split(b"\n")[-1]
+    process.wait()
+    return None, line.decode()
+
+
+def best(code, cwd, marker, runs, stdin=None):
+    times = []
+    line = ""
+    for _ in range(runs):
+        elapsed, line = time_to_output(code, cwd, marker, stdin)
+        if elapsed is None:
+            return None, line
+        times.append(elapsed)
+    return min(times), line
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The menu only appears when the configured export exists
+        shutil.copy(os.path.join(ROOT, 'sample_bitwarden_export.csv'), os.path.join(tmp, 'your_bitwarden_export.csv'))
+
+        baseline, _ = best("print('started', flush=True)", tmp, b"started", runs)
+        pandas_time, _ = best(PANDAS, tmp, b"imported", runs)
+        prompt, _ = best(CLI, tmp, PROMPT, runs, stdin=b"7\n")
+        window, line = best(GUI, tmp, b"window", runs)
+
+    print(f"interpreter:  {baseline * 1000:7.1f} ms")
+    print(f"pandas:       {pandas_time * 1000:7.1f} ms")
+    print(f"first prompt: {prompt * 1000:7.1f} ms")
+    if window is None:
+        print(f"first window:    skipped ({line or 'GUI failed to start'})")
+    else:
+        loaded = "with" if line.endswith("True") else "before"
+        print(f"first window: {window * 1000:7.1f} ms ({loaded} pandas)")
+
+
+if __name__ == "__main__":
+    main()
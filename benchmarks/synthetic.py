@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Synthetic Bitwarden-shaped data for the benchmarks.
+
+make_frame builds a small uniform frame in memory; write_vault writes a
+realistic, seeded export of any size (1k to 10M rows and beyond) chunk by
+chunk:
+
+    python benchmarks/synthetic.py 1e6 vault.csv [seed]
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bitwarden_csv_manager.json_format import export_json_chunks
+
+
+def make_frame(rows, seed=0):
+    """Builds a Bitwarden-shaped frame with blanks, repeated folders and long notes."""
+    rng = random.Random(seed)
+    folders = ["Personal", "Work", "Finance", "Social", None]
+    return pd.DataFrame({
+        'folder': [rng.choice(folders) for _ in range(rows)],
+        'favorite': pd.array([rng.choice([0, 1, None]) for _ in range(rows)], dtype='Int64'),
+        'type': [rng.choice(["login", "note"]) for _ in range(rows)],
+        'name': [f"Site {i}" for i in range(rows)],
+        'notes': [("note line\n" * rng.randint(0, 12)) or None for _ in range(rows)],
+        'fields': [None] * rows,
+        'reprompt': [rng.choice([0, 0, 0, 1]) for _ in range(rows)],
+        'login_uri': [f"https://www.example{i % 500}.com/login" for i in range(rows)],
+        'login_username': [f"user{i % 2000}@example.com" for i in range(rows)],
+        'login_password': [f"pw-{rng.getrandbits(64):x}" for _ in range(rows)],
+        'login_totp': [None] * rows,
+    })
+
+
+# Rows generated per chunk; each chunk has its own seeded generator, so a
+# vault's content depends only on its row count and seed
+VAULT_CHUNK_ROWS = 100000
+
+VAULT_TYPES = ['login', 'note', 'card', 'identity']
+VAULT_TYPE_WEIGHTS = [0.82, 0.12, 0.04, 0.02]
+VAULT_FOLDERS = [
+    '', 'Personal', 'Work', 'Finance', 'Social', 'Shopping', 'Travel', 'Email',
+    'Work/Projects', 'Work/Servers', 'Family', 'Gaming', 'Dev', 'Archive',
+]
+VAULT_SITES = [
+    'google.com', 'github.com', 'amazon.com', 'mybank.com', 'paypal.com', 'reddit.com',
+    'twitter.com', 'linkedin.com', 'netflix.com', 'dropbox.com', 'gitlab.com', 'ebay.com',
+    'accounts.firefox.com', 'login.microsoftonline.com', 'store.steampowered.com',
+]
+VAULT_NOTE_LINES = [
+    'Recovery codes stored offline',
+    'Security question: first pet, "Rex"',
+    'Account number 12345678, sort code 01-02-03',
+    'Shared with family, ask before changing',
+    'Old password rotated in March',
+    'Support PIN, see fields',
+    'Wi-Fi: guest network, WPA2',
+]
+# Share of login rows that repeat an earlier login with the other URI scheme
+VAULT_DUPLICATE_RATE = 0.04
+
+
+def make_vault_chunk(rows, seed=0, chunk=0, start=0):
+    """
+    Builds one chunk of a realistic vault as text columns, blank for missing.
+
+    Mixes item types, repeats a handful of folders, gives notes several
+    lines with commas and quotes, and repeats some logins with http and
+    https URIs so deduplication has work to do.
+    """
+    rng = np.random.default_rng([seed, chunk])
+    types = rng.choice(VAULT_TYPES, size=rows, p=VAULT_TYPE_WEIGHTS)
+    logins = types == 'login'
+    sites = rng.choice(VAULT_SITES, size=rows)
+    numbers = np.arange(start, start + rows)
+
+    folder_weights = 1 / np.arange(1, len(VAULT_FOLDERS) + 1)
+    folders = rng.choice(VAULT_FOLDERS, size=rows, p=folder_weights / folder_weights.sum())
+    schemes = np.where(rng.random(rows) < 0.85, 'https://', 'http://')
+    prefixes = np.where(rng.random(rows) < 0.3, 'www.', '')
+    paths = rng.choice(['', '/', '/login', '/signin?next=%2F', '/account/'], size=rows)
+
+    # Secure notes always have text, other items sometimes
+    note_counts = np.where(
+        types == 'note', rng.integers(1, 9, rows), np.where(rng.random(rows) < 0.3, rng.integers(1, 4, rows), 0)
+    )
+    note_picks = rng.integers(0, len(VAULT_NOTE_LINES), (rows, 8))
+    notes = [
+        '\n'.join(VAULT_NOTE_LINES[pick] for pick in picks[:count])
+        for picks, count in zip(note_picks.tolist(), note_counts.tolist())
+    ]
+    fields = np.where(rng.random(rows) < 0.1, 'PIN: 4821\nRecovery email: me@example.com', '')
+    passwords = [f"{value:016x}!Aa" for value in rng.integers(0, 2 ** 62, rows).tolist()]
+    users = rng.integers(0, max(rows // 20, 1), rows)
+    totp = np.where(rng.random(rows) < 0.08, 'otpauth://totp/Example?secret=JBSWY3DPEHPK3PXP', '')
+
+    df = pd.DataFrame({
+        'folder': folders,
+        'favorite': np.where(rng.random(rows) < 0.05, '1', ''),
+        'type': types,
+        'name': [f"{site.split('.')[-2].title()} {number}" for site, number in zip(sites.tolist(), numbers.tolist())],
+        'notes': notes,
+        'fields': fields,
+        'reprompt': np.where(rng.random(rows) < 0.05, '1', '0'),
+        'login_uri': np.char.add(np.char.add(np.char.add(schemes, prefixes), sites), paths),
+        'login_username': [f"user{user}@example.com" for user in users.tolist()],
+        'login_password': passwords,
+        'login_totp': totp,
+    })
+    for col in ('login_uri', 'login_username', 'login_password', 'login_totp'):
+        df.loc[~logins, col] = ''
+
+    # Repeat earlier logins with the other scheme
+    login_rows = np.flatnonzero(logins)
+    copies = login_rows[rng.random(len(login_rows)) < VAULT_DUPLICATE_RATE]
+    copies = copies[copies > 0]
+    if len(copies):
+        originals = (rng.random(len(copies)) * copies).astype(int)
+        copies, originals = copies[logins[originals]], originals[logins[originals]]
+        for col in ('folder', 'name', 'login_username', 'login_password'):
+            df.iloc[copies, df.columns.get_loc(col)] = df[col].to_numpy()[originals]
+        uris = df['login_uri'].to_numpy()[originals].astype(str)
+        flipped = np.where(
+            np.char.startswith(uris, 'https://'),
+            np.char.replace(uris, 'https://', 'http://', count=1),
+            np.char.replace(uris, 'http://', 'https://', count=1),
+        )
+        df.iloc[copies, df.columns.get_loc('login_uri')] = flipped
+    return df
+
+
+def iter_vault(rows, seed=0, chunk_rows=VAULT_CHUNK_ROWS):
+    """Yields a vault of rows rows as make_vault_chunk chunks."""
+    for chunk, start in enumerate(range(0, rows, chunk_rows)):
+        yield make_vault_chunk(min(chunk_rows, rows - start), seed, chunk, start)
+
+
+def write_vault(file_path, rows, seed=0):
+    """Writes a synthetic vault as a CSV, or Bitwarden JSON for .json paths, and returns the row count."""
+    if file_path.lower().endswith('.json'):
+        return export_json_chunks(iter_vault(rows, seed), file_path, folders=[f for f in VAULT_FOLDERS if f])
+    written = 0
+    with open(file_path, 'w', newline='', encoding='utf-8') as handle:
+        for chunk in iter_vault(rows, seed):
+            chunk.to_csv(handle, index=False, header=written == 0)
+            written += len(chunk)
+    return written
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("usage: python benchmarks/synthetic.py ROWS OUTPUT.csv|OUTPUT.json [SEED]")
+        return 2
+    rows = int(float(sys.argv[1]))
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    written = write_vault(sys.argv[2], rows, seed)
+    print(f"Wrote {written} rows to {sys.argv[2]} ({os.path.getsize(sys.argv[2]) / 2 ** 20:.1f} MiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
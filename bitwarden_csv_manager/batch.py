@@ -0,0 +1,622 @@
+"""
+Non-interactive batch processing of many exports.
+
+    bitwarden-csv-manager format  exports/ -o formatted/
+    bitwarden-csv-manager format  lastpass_export.csv chrome_passwords.csv
+    bitwarden-csv-manager filter  'vaults/*.csv' -q 'type=login AND login_uri~bank'
+    bitwarden-csv-manager dedup   exports/ --policy keep_newest --report
+    bitwarden-csv-manager stats   exports/ --summary -
+    bitwarden-csv-manager hygiene exports/ --json
+    bitwarden-csv-manager breach  exports/ --corpus pwned-passwords-sha1-ordered-by-hash.txt
+    bitwarden-csv-manager merge   alice.csv bob.csv 'orgs/*.csv' -o combined.csv
+    bitwarden-csv-manager convert exports/ --to json -o json/
+    bitwarden-csv-manager diff    last_week.csv this_week.csv -o changes.csv
+
+Inputs are files, directories (every *.csv and JSON export inside) or glob patterns;
+Bitwarden JSON exports (*.json) are read too, and filtered, formatted or
+deduplicated exports are written in the input's format. Each file is
+streamed chunk by chunk in its own worker process, so throughput scales
+with the number of workers while memory stays bounded per worker.
+format recognizes Chrome, Firefox, LastPass and 1Password exports by
+their header and converts them to Bitwarden's columns (see importers).
+A status line is printed per file as it finishes, --summary writes a JSON
+summary ('-' for stdout), and the exit code is 0 when every file
+succeeded, 1 when any failed and 2 for usage errors.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from bitwarden_csv_manager.breach import CORPUS_ENV, BreachCorpus, breached_entries_file
+from bitwarden_csv_manager.cleaning import CLEANING_RULES, clean_chunks, parse_rules
+from bitwarden_csv_manager.diff import describe_counts, diff_files
+from bitwarden_csv_manager.dedup import DEDUP_POLICIES, GROUP_COLUMN, dedup_file, dedup_keys, duplicate_groups
+from bitwarden_csv_manager.hygiene import hygiene_summary, password_report_file, save_report
+from bitwarden_csv_manager.importers import IMPORTERS, SOURCE_LABELS, detect_format, import_chunks
+from bitwarden_csv_manager.json_format import export_json_chunks, is_json_path, looks_like_json_export
+from bitwarden_csv_manager.lite import atomic_output
+from bitwarden_csv_manager.merge import merge_files
+from bitwarden_csv_manager.query import QueryError, parse_query
+from bitwarden_csv_manager.schema import load_ideal_columns
+from bitwarden_csv_manager.streaming import (
+    DEFAULT_MEMORY_LIMIT,
+    export_chunks,
+    format_chunks,
+    iter_chunks,
+    query_chunks,
+    read_header,
+)
+
+# Suffix added to the input name for each command's output file
+OUTPUT_SUFFIXES = {'format': '_formatted', 'filter': '_filtered', 'dedup': '_deduplicated'}
+REPORT_SUFFIX = '_duplicates'
+HYGIENE_SUFFIX = '_passwords'
+BREACH_SUFFIX = '_breached'
+DIFF_SUFFIX = '_diff'
+# Every suffix the subcommands add, so earlier outputs are not read back as exports
+GENERATED_SUFFIXES = tuple(OUTPUT_SUFFIXES.values()) + (REPORT_SUFFIX, HYGIENE_SUFFIX, BREACH_SUFFIX, DIFF_SUFFIX)
+# File extension written by convert for each target format
+CONVERT_EXTENSIONS = {'csv': '.csv', 'json': '.json'}
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def expand_inputs(patterns):
+    """
+    Returns the export files named by paths, directories and glob patterns, in order, without repeats.
+
+    A directory contributes its *.csv files and those *.json files that
+    look like Bitwarden exports, so JSON summaries and reports are skipped.
+    """
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(
+                glob.glob(os.path.join(pattern, '*.csv')) +
+                [path for path in glob.glob(os.path.join(pattern, '*.json')) if looks_like_json_export(path)]
+            )
+        elif os.path.isfile(pattern):
+            matches = [pattern]
+        else:
+            matches = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        files.extend(matches)
+
+    seen = set()
+    unique = []
+    for path in files:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique.append(path)
+    return unique
+
+
+def drop_outputs(files, output_dir=None):
+    """
+    Returns files without those an earlier run wrote for another of them.
+
+    a_formatted.csv, a_passwords.json or a_diff.csv is left out when a.csv
+    (or a.json) is also an input, whether it sits next to it or in
+    output_dir.
+    """
+    stems = set()
+    for path in files:
+        stem = os.path.splitext(os.path.abspath(path))[0]
+        stems.add(stem)
+        if output_dir:
+            stems.add(os.path.join(os.path.abspath(output_dir), os.path.basename(stem)))
+    kept = []
+    for path in files:
+        stem = os.path.splitext(os.path.abspath(path))[0]
+        if not any(stem.endswith(suffix) and stem[:-len(suffix)] in stems for suffix in GENERATED_SUFFIXES):
+            kept.append(path)
+    return kept
+
+
+def output_clash(args, files, output_dir=None):
+    """Returns two inputs whose outputs would overwrite each other, or None."""
+    if args.command in ('stats', 'merge'):
+        return None
+    # Reports and converted files are named after the input without its extension
+    by_stem = args.command in ('hygiene', 'breach', 'convert') or (
+        args.command == 'dedup' and (args.report or args.policy == 'report')
+    )
+    seen = {}
+    for path in files:
+        name = os.path.basename(path)
+        key = (os.path.abspath(output_dir or os.path.dirname(path)), os.path.splitext(name)[0] if by_stem else name)
+        if key in seen:
+            return seen[key], path
+        seen[key] = path
+    return None
+
+
+def output_path(file_path, output_dir, suffix, extension=None):
+    """Returns where the output for file_path goes: next to it, or in output_dir, with its extension unless given."""
+    stem, ext = os.path.splitext(os.path.basename(file_path))
+    directory = output_dir if output_dir else os.path.dirname(file_path)
+    return os.path.join(directory, f"{stem}{suffix}{extension or ext or '.csv'}")
+
+
+def format_file(file_path, output_file, memory_limit=DEFAULT_MEMORY_LIMIT, columns=None, clean_rules=None,
+                source=None):
+    """
+    Writes file_path reordered to the ideal Bitwarden columns, cleaned if
+    rules are given, and returns the result fields.
+
+    source is the export's format (see importers); it is detected when None.
+    """
+    source = source or detect_format(file_path) or 'bitwarden'
+    chunks = iter_chunks(file_path, memory_limit=memory_limit)
+    if source in IMPORTERS:
+        chunks = import_chunks(chunks, source)
+    counts = Counter()
+    if clean_rules:
+        chunks = clean_chunks(chunks, clean_rules, counts)
+    rows = export_chunks(format_chunks(chunks, columns or load_ideal_columns()), output_file)
+    result = {'rows': rows, 'output': output_file, 'source': source}
+    if clean_rules:
+        result['cleaned'] = {rule: counts[rule] for rule in clean_rules}
+        result['invalid'] = {key[len('invalid_'):]: value for key, value in counts.items() if key.startswith('invalid_')}
+    return result
+
+
+def filter_file(file_path, output_file, query_text, case=False, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """Writes the rows of file_path matching a query and returns the result fields."""
+    query = parse_query(query_text, columns=read_header(file_path).columns, case=case)
+    chunks = iter_chunks(file_path, memory_limit=memory_limit)
+    rows = export_chunks(query_chunks(chunks, query), output_file)
+    return {'rows': rows, 'output': output_file}
+
+
+def dedup_export(file_path, output_file, policy='keep_first', report_file=None,
+                 memory_limit=DEFAULT_MEMORY_LIMIT):
+    """Deduplicates file_path, optionally saving the duplicate report, and returns the result fields."""
+    rows, report = dedup_file(file_path, output_file, policy, memory_limit=memory_limit)
+    result = {
+        'rows': rows,
+        'output': output_file,
+        'duplicates': len(report),
+        'groups': int(report[GROUP_COLUMN].nunique()) if len(report) else 0,
+    }
+    if report_file:
+        with atomic_output(report_file) as tmp_path:
+            report.to_csv(tmp_path, index=False)
+        result['report'] = report_file
+    return result
+
+
+def file_stats(file_path, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """Returns row, column, type, folder and duplicate counts for file_path in one streaming pass."""
+    rows = 0
+    columns = []
+    types = {}
+    folders = set()
+    missing_passwords = 0
+    keys = []
+    for chunk in iter_chunks(file_path, memory_limit=memory_limit):
+        columns = list(chunk.columns)
+        rows += len(chunk)
+        if 'type' in chunk.columns:
+            for value, count in chunk['type'].value_counts(dropna=False).items():
+                label = "" if value != value else str(value)  # NaN is not equal to itself
+                types[label] = types.get(label, 0) + int(count)
+        if 'folder' in chunk.columns:
+            folders.update(chunk['folder'].dropna().astype(str).unique())
+        if 'login_password' in chunk.columns:
+            missing_passwords += int(chunk['login_password'].isna().sum())
+        keys.append(dedup_keys(chunk))
+
+    keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.uint64)
+    positions, groups = duplicate_groups(keys)
+    return {
+        'rows': rows,
+        'columns': len(columns) if columns else len(read_header(file_path).columns),
+        'bytes': os.path.getsize(file_path),
+        'types': dict(sorted(types.items())),
+        'folders': len(folders),
+        'missing_passwords': missing_passwords,
+        'duplicates': len(positions),
+        'duplicate_groups': int(groups.max()) if len(groups) else 0,
+    }
+
+
+def hygiene_file(file_path, report_file, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """Writes the password hygiene report of file_path and returns the result fields."""
+    # Each file already has its own worker, so scoring stays in it
+    report = password_report_file(file_path, memory_limit=memory_limit, workers=1)
+    save_report(report, report_file)
+    result = {'rows': len(report), 'output': report_file}
+    result.update(hygiene_summary(report))
+    return result
+
+
+def breach_file(file_path, report_file, corpus_path, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """Writes the entries of file_path with a breached password and returns the result fields."""
+    # Each file already has its own worker, so hashing stays in it
+    flagged, checked = breached_entries_file(file_path, corpus_path, memory_limit=memory_limit, workers=1)
+    with atomic_output(report_file) as tmp_path:
+        flagged.to_csv(tmp_path, index=False)
+    return {'rows': len(flagged), 'output': report_file, 'passwords': checked, 'breached': len(flagged)}
+
+
+def convert_file(file_path, output_file, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """Writes file_path as CSV or Bitwarden JSON, by output_file's extension, and returns the result fields."""
+    if os.path.abspath(file_path) == os.path.abspath(output_file):
+        raise ValueError("already in the requested format")
+    source = detect_format(file_path) or 'bitwarden'
+
+    def chunks(**read_kwargs):
+        chunks = iter_chunks(file_path, memory_limit=memory_limit, **read_kwargs)
+        return import_chunks(chunks, source) if source in IMPORTERS else chunks
+
+    if not is_json_path(output_file):
+        rows = export_chunks(format_chunks(chunks()), output_file)
+        return {'rows': rows, 'output': output_file, 'source': source}
+
+    # Bitwarden lists folders before items; collecting their names first
+    # only reads the folder column of a Bitwarden export
+    folders = {}
+    if source in IMPORTERS or 'folder' in read_header(file_path).columns:
+        for chunk in chunks(usecols=None if source in IMPORTERS else ['folder']):
+            folders.update(dict.fromkeys(chunk['folder'].dropna().astype(str).unique()))
+    with atomic_output(output_file) as tmp_path:
+        rows = export_json_chunks(chunks(), tmp_path, folders=list(folders))
+    return {'rows': rows, 'output': output_file, 'source': source, 'folders': len(folders)}
+
+
+def process_file(command, file_path, options):
+    """
+    Runs one command on one file and returns its result record.
+
+    Never raises: failures are reported with status 'error' so one bad
+    export does not stop the batch.
+    """
+    start = time.perf_counter()
+    result = {'file': file_path, 'status': 'ok'}
+    memory_limit = options.get('memory_limit', DEFAULT_MEMORY_LIMIT)
+    output_dir = options.get('output_dir')
+    try:
+        if command == 'format':
+            result.update(format_file(
+                file_path, output_path(file_path, output_dir, OUTPUT_SUFFIXES['format']), memory_limit,
+                clean_rules=options.get('clean'), source=options.get('source')
+            ))
+        elif command == 'filter':
+            result.update(filter_file(
+                file_path, output_path(file_path, output_dir, OUTPUT_SUFFIXES['filter']),
+                options['query'], options.get('case', False), memory_limit
+            ))
+        elif command == 'dedup':
+            policy = options.get('policy', 'keep_first')
+            output_file = None
+            if policy != 'report':
+                output_file = output_path(file_path, output_dir, OUTPUT_SUFFIXES['dedup'])
+            report_file = None
+            if options.get('report') or policy == 'report':
+                report_file = output_path(file_path, output_dir, REPORT_SUFFIX, '.csv')
+            result.update(dedup_export(file_path, output_file, policy, report_file, memory_limit))
+        elif command == 'stats':
+            result.update(file_stats(file_path, memory_limit))
+        elif command == 'hygiene':
+            report_file = output_path(
+                file_path, output_dir, HYGIENE_SUFFIX, '.json' if options.get('json') else '.csv'
+            )
+            result.update(hygiene_file(file_path, report_file, memory_limit))
+        elif command == 'breach':
+            report_file = output_path(file_path, output_dir, BREACH_SUFFIX, '.csv')
+            result.update(breach_file(file_path, report_file, options['corpus'], memory_limit))
+        elif command == 'convert':
+            output_file = output_path(file_path, output_dir, '', CONVERT_EXTENSIONS[options['to']])
+            result.update(convert_file(file_path, output_file, memory_limit))
+        else:
+            raise ValueError(f"Unknown command: {command}")
+    except (OSError, ValueError) as e:
+        result.update(status='error', error=str(e))
+    except Exception as e:  # Malformed CSV and the like; keep the batch going
+        result.update(status='error', error=f"{type(e).__name__}: {e}")
+    result['seconds'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_batch(command, files, options, workers=None, on_result=None):
+    """
+    Processes files with a process pool and returns their results in input order.
+
+    Larger files are started first so one big export does not finish last
+    on an otherwise idle pool. on_result(result) is called as each file
+    completes. workers defaults to the number of cores; 1 runs inline.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+    results = {}
+
+    if workers == 1:
+        for file_path in files:
+            results[file_path] = process_file(command, file_path, options)
+            if on_result:
+                on_result(results[file_path])
+    else:
+        by_size = sorted(files, key=lambda path: os.path.getsize(path) if os.path.exists(path) else 0, reverse=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(process_file, command, path, options): path for path in by_size}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                if on_result:
+                    on_result(results[futures[future]])
+    return [results[file_path] for file_path in files]
+
+
+def print_status(result, stream=sys.stderr):
+    """Prints a one-line status for a finished file."""
+    if result['status'] == 'ok':
+        detail = f"{result['rows']} rows"
+        if 'duplicates' in result:
+            detail += f", {result['duplicates']} duplicates"
+        if 'breached' in result:
+            detail = f"{result['breached']} of {result['passwords']} entries breached"
+        if 'reused_passwords' in result:
+            detail += f", {result['reused_passwords']} reused passwords"
+        if result.get('source', 'bitwarden') != 'bitwarden':
+            detail += f", from {SOURCE_LABELS[result['source']]}"
+        if 'cleaned' in result:
+            detail += f", {sum(result['cleaned'].values())} values cleaned"
+        if result.get('output'):
+            detail += f" -> {result['output']}"
+        print(f"ok     {result['file']}: {detail} ({result['seconds']:.2f}s)", file=stream, flush=True)
+    else:
+        print(f"error  {result['file']}: {result['error']}", file=stream, flush=True)
+
+
+def summarize(command, results, seconds, workers):
+    """Returns the machine-readable summary of a batch run."""
+    failed = sum(1 for result in results if result['status'] != 'ok')
+    rows = sum(result.get('rows', 0) for result in results)
+    return {
+        'command': command,
+        'workers': workers,
+        'files': len(results),
+        'succeeded': len(results) - failed,
+        'failed': failed,
+        'rows': rows,
+        'seconds': round(seconds, 3),
+        'rows_per_second': round(rows / seconds) if seconds else None,
+        'results': results,
+    }
+
+
+def write_summary(summary, path):
+    """Writes a summary as JSON to path, or to stdout for '-'."""
+    if path == '-':
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    elif path:
+        with atomic_output(path) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump(summary, handle, indent=2)
+
+
+def merge_main(args, files, workers):
+    """Runs the merge command and returns the exit code."""
+    # An earlier merge into the same directory is not an input
+    files = [path for path in files if os.path.abspath(path) != os.path.abspath(args.output)]
+    start = time.perf_counter()
+    try:
+        merged = merge_files(files, args.output, args.memory_limit, workers, args.temp_dir)
+    except KeyboardInterrupt:
+        print("Interrupted.", file=sys.stderr)
+        return EXIT_FAILED
+    except Exception as e:
+        print(f"error  merge: {type(e).__name__}: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+    results = [dict(entry, status='ok') for entry in merged.pop('inputs')]
+    summary = summarize('merge', results, time.perf_counter() - start, min(workers, len(files)))
+    summary.update(merged)
+    print(
+        f"Merged {summary['rows_read']} rows from {summary['files']} files into {summary['rows']} "
+        f"({summary['duplicates']} duplicates removed) -> {args.output} in {summary['seconds']:.2f}s",
+        file=sys.stderr
+    )
+    write_summary(summary, args.summary)
+    return EXIT_OK
+
+
+def diff_main(args):
+    """Runs the diff command and returns the exit code."""
+    for path in (args.old, args.new):
+        if not os.path.isfile(path):
+            print(f"No such export: {path}", file=sys.stderr)
+            return EXIT_USAGE
+    report_file = args.output or output_path(args.new, None, DIFF_SUFFIX, '.csv')
+    start = time.perf_counter()
+    try:
+        counts = diff_files(args.old, args.new, report_file, args.memory_limit, args.temp_dir)
+    except KeyboardInterrupt:
+        print("Interrupted.", file=sys.stderr)
+        return EXIT_FAILED
+    except Exception as e:
+        print(f"error  diff: {type(e).__name__}: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+    seconds = time.perf_counter() - start
+    for line in describe_counts(counts):
+        print(line, file=sys.stderr)
+    print(f"Changes written to {report_file} in {seconds:.2f}s", file=sys.stderr)
+    summary = {'command': 'diff', 'old': args.old, 'new': args.new, 'report': report_file,
+               'seconds': round(seconds, 3)}
+    summary.update(counts)
+    write_summary(summary, args.summary)
+    return EXIT_OK
+
+
+def build_parser():
+    """Returns the argument parser for the batch subcommands."""
+    parser = argparse.ArgumentParser(
+        prog='bitwarden-csv-manager',
+        description="Process Bitwarden CSV exports in batch. Run without arguments for the interactive menu."
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.required = True
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('inputs', nargs='+', metavar='INPUT',
+                        help="CSV or JSON exports, directories or glob patterns (quote globs to use ** recursion)")
+    common.add_argument('-j', '--workers', type=int, default=None,
+                        help="worker processes (default: number of cores)")
+    common.add_argument('--summary', metavar='PATH',
+                        help="write a JSON summary to PATH ('-' for stdout)")
+    common.add_argument('--memory-limit', type=int, default=DEFAULT_MEMORY_LIMIT, metavar='BYTES',
+                        help="memory budget for each worker's chunks (default: %(default)s)")
+
+    outputs = argparse.ArgumentParser(add_help=False)
+    outputs.add_argument('-o', '--output-dir',
+                         help="directory for output files (default: next to each input)")
+
+    format_parser = subparsers.add_parser('format', parents=[common, outputs],
+                                          help="reorder exports to the ideal Bitwarden columns")
+    format_parser.add_argument('--clean', nargs='?', const='all', metavar='RULES',
+                               help="also clean export artifacts; optionally a comma-separated "
+                                    f"subset of: {', '.join(CLEANING_RULES)}")
+    format_parser.add_argument('--from', dest='source', choices=['auto'] + list(SOURCE_LABELS), default='auto',
+                               help="format of the inputs (default: detected from each file's header)")
+
+    filter_parser = subparsers.add_parser('filter', parents=[common, outputs],
+                                          help="keep the rows that match a query")
+    filter_parser.add_argument('-q', '--query', required=True,
+                               help="query such as \"type=login AND login_uri~bank\"")
+    filter_parser.add_argument('--case', action='store_true', help="match case")
+
+    dedup_parser = subparsers.add_parser('dedup', parents=[common, outputs],
+                                         help="remove exact duplicate entries")
+    dedup_parser.add_argument('--policy', choices=DEDUP_POLICIES, default='keep_first',
+                              help="which entry of each group to keep (default: %(default)s)")
+    dedup_parser.add_argument('--report', action='store_true',
+                              help="also write each file's duplicate groups")
+
+    subparsers.add_parser('stats', parents=[common], help="summarize exports without writing them")
+
+    hygiene_parser = subparsers.add_parser('hygiene', parents=[common, outputs],
+                                           help="report reused and weak passwords (without the passwords)")
+    hygiene_parser.add_argument('--json', action='store_true', help="write JSON reports instead of CSV")
+
+    breach_parser = subparsers.add_parser('breach', parents=[common, outputs],
+                                          help="list entries whose password is in a local breach corpus")
+    breach_parser.add_argument('--corpus', default=os.environ.get(CORPUS_ENV),
+                               help=f"Pwned Passwords SHA-1 file ordered by hash (default: ${CORPUS_ENV})")
+
+    convert_parser = subparsers.add_parser('convert', parents=[common, outputs],
+                                           help="convert between CSV and Bitwarden JSON exports")
+    convert_parser.add_argument('--to', choices=sorted(CONVERT_EXTENSIONS), required=True,
+                                help="format to write")
+
+    merge_parser = subparsers.add_parser('merge', parents=[common],
+                                         help="combine exports into one file without duplicates")
+    merge_parser.add_argument('-o', '--output', required=True, help="merged CSV file to write")
+    merge_parser.add_argument('--temp-dir',
+                              help="where sorted runs are kept while merging (default: system temp)")
+
+    # Takes exactly two exports, in order, so it does not share the inputs of the others
+    diff_parser = subparsers.add_parser('diff', help="list entries added, removed or changed between two exports")
+    diff_parser.add_argument('old', help="the earlier export")
+    diff_parser.add_argument('new', help="the later export")
+    diff_parser.add_argument('-o', '--output',
+                             help="CSV report of the changes (default: NEW_diff.csv next to NEW)")
+    diff_parser.add_argument('--summary', metavar='PATH',
+                             help="write a JSON summary to PATH ('-' for stdout)")
+    diff_parser.add_argument('--memory-limit', type=int, default=DEFAULT_MEMORY_LIMIT, metavar='BYTES',
+                             help="memory budget for comparing the files (default: %(default)s)")
+    diff_parser.add_argument('--temp-dir',
+                             help="where partitions are kept while comparing (default: system temp)")
+    return parser
+
+
+def batch_main(argv):
+    """Runs a batch command and returns the exit code."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'diff':
+        return diff_main(args)
+
+    files = expand_inputs(args.inputs)
+    if not files:
+        print("No export files matched the given inputs.", file=sys.stderr)
+        return EXIT_USAGE
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    options = {'memory_limit': args.memory_limit}
+    output_dir = getattr(args, 'output_dir', None)
+    # Outputs and reports of earlier runs in the same directory are not inputs
+    inputs = len(files)
+    files = drop_outputs(files, output_dir)
+    if len(files) < inputs:
+        print(f"Skipping {inputs - len(files)} file(s) written by earlier runs.", file=sys.stderr)
+    if args.command == 'convert':
+        # Exports already in the target format would be converted onto themselves
+        files = [
+            path for path in files
+            if os.path.abspath(output_path(path, output_dir, '', CONVERT_EXTENSIONS[args.to])) != os.path.abspath(path)
+        ]
+    clash = output_clash(args, files, output_dir)
+    if clash:
+        parser.error(f"{clash[0]} and {clash[1]} would write the same output file; pass only one of them")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        options['output_dir'] = output_dir
+    if args.command == 'format':
+        if args.clean:
+            try:
+                options['clean'] = parse_rules(args.clean)
+            except ValueError as e:
+                parser.error(str(e))
+        if args.source != 'auto':
+            options['source'] = args.source
+    if args.command == 'filter':
+        try:
+            parse_query(args.query)  # Fail once here rather than once per file
+        except QueryError as e:
+            parser.error(f"invalid query: {e}")
+        options.update(query=args.query, case=args.case)
+    elif args.command == 'dedup':
+        options.update(policy=args.policy, report=args.report)
+    elif args.command == 'hygiene':
+        options['json'] = args.json
+    elif args.command == 'convert':
+        options['to'] = args.to
+    elif args.command == 'breach':
+        if not args.corpus:
+            parser.error(f"--corpus is required unless {CORPUS_ENV} is set")
+        try:
+            BreachCorpus(args.corpus).close()  # Validate, and build the prefix index once
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+        options['corpus'] = args.corpus
+
+    workers = args.workers or os.cpu_count() or 1
+    if args.command == 'merge':
+        return merge_main(args, files, workers)
+        
+    start = time.perf_counter()
+    try:
+        results = run_batch(args.command, files, options, workers, on_result=print_status)
+    except KeyboardInterrupt:
+        print("Interrupted.", file=sys.stderr)
+        return EXIT_FAILED
+    summary = summarize(args.command, results, time.perf_counter() - start, min(workers, len(files)))
+
+    print(
+        f"{summary['succeeded']} of {summary['files']} files succeeded, "
+        f"{summary['rows']} rows in {summary['seconds']:.2f}s",
+        file=sys.stderr
+    )
+    write_summary(summary, args.summary)
+    return EXIT_OK if summary['failed'] == 0 else EXIT_FAILED
@@ -0,0 +1,219 @@
+"""
+Offline check of passwords against a downloaded breach corpus.
+
+The corpus is a Pwned Passwords style text file, one "SHA1HEX:COUNT" line
+per hash, ordered by hash. Nothing goes over the network. The file, tens
+of GB for the full list, is memory-mapped rather than read: a lookup is a
+binary search over byte offsets, narrowed first by a table of where every
+4-hex-digit prefix starts. That table is built with 65,536 binary searches
+the first time a corpus is opened and saved next to it for later runs.
+
+Passwords are SHA-1 hashed and looked up in batches spread over a process
+pool; every worker maps the same file, so the corpus sits once in the page
+cache. Only breach counts are returned, never hashes.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from bitwarden_csv_manager.parallel import map_batches, use_pool
+from bitwarden_csv_manager.schema import ENTRY_COLUMNS, PASSWORD_COLUMN
+from bitwarden_csv_manager.search import column_values
+from bitwarden_csv_manager.streaming import DEFAULT_MEMORY_LIMIT, iter_chunks, read_header
+
+CORPUS_ENV = 'BITWARDEN_BREACH_CORPUS'
+
+HASH_HEX = 40
+PREFIX_HEX = 4
+INDEX_SUFFIX = '.prefix.npy'
+
+# Windows smaller than this are scanned line by line instead of bisected
+SCAN_BYTES = 4096
+
+BREACH_COLUMN = 'breach_count'
+BATCH_PASSWORDS = 10000
+
+LINE_RE = re.compile(rb'^[0-9A-Fa-f]{40}(:[0-9]+)?\r?$')
+
+
+class BreachCorpus:
+    """A memory-mapped, hash-sorted breach corpus."""
+
+    def __init__(self, path, build_index=True):
+        self.path = path
+        self.handle = open(path, 'rb')
+        try:
+            if os.fstat(self.handle.fileno()).st_size == 0:
+                raise ValueError(f"Breach corpus '{path}' is empty")
+            self.data = mmap.mmap(self.handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self.handle.close()
+            raise
+
+        first = self._line(0)
+        if not LINE_RE.match(first):
+            self.close()
+            raise ValueError(f"'{path}' is not a SHA-1 breach corpus (expected lines like HASH:COUNT)")
+        # The downloads use upper case; compare in the corpus's own case
+        self.lowercase = first[:HASH_HEX] != first[:HASH_HEX].upper()
+        self.offsets = self._load_index() if build_index else None
+
+    def close(self):
+        self.data.close()
+        self.handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _line(self, start):
+        end = self.data.find(b'\n', start)
+        return self.data[start:end if end != -1 else len(self.data)].rstrip(b'\r')
+
+    def lower_bound(self, target, lo=0, hi=None):
+        """Returns the offset of the first line whose key is >= target, within [lo, hi)."""
+        data = self.data
+        hi = len(data) if hi is None else hi
+        width = len(target)
+        # lo is a line start with a smaller key (or the start); hi a line start with a key >= target (or the end)
+        while hi - lo > SCAN_BYTES:
+            newline = data.find(b'\n', (lo + hi) // 2, hi)
+            if newline == -1 or newline + 1 >= hi:
+                break
+            start = newline + 1
+            if data[start:start + width] < target:
+                lo = start
+            else:
+                hi = start
+        position = lo
+        while position < hi:
+            if data[position:position + width] >= target:
+                return position
+            newline = data.find(b'\n', position, hi)
+            if newline == -1:
+                return hi
+            position = newline + 1
+        return hi
+
+    def _prefix_key(self, prefix):
+        text = f"{prefix:0{PREFIX_HEX}X}"
+        return (text.lower() if self.lowercase else text).encode('ascii')
+
+    def _load_index(self):
+        """Returns where each hash prefix starts, loading or saving it next to the corpus."""
+        index_path = self.path + INDEX_SUFFIX
+        size = len(self.data)
+        try:
+            if os.path.getmtime(index_path) >= os.path.getmtime(self.path):
+                offsets = np.load(index_path)
+                if len(offsets) == 16 ** PREFIX_HEX + 1 and offsets[-1] == size:
+                    return offsets
+        except (OSError, ValueError):
+            pass
+
+        offsets = np.empty(16 ** PREFIX_HEX + 1, dtype=np.uint64)
+        lo = 0
+        for prefix in range(16 ** PREFIX_HEX):
+            lo = self.lower_bound(self._prefix_key(prefix), lo)
+            offsets[prefix] = lo
+        offsets[-1] = size
+        try:
+            np.save(index_path, offsets)
+        except OSError:
+            pass  # Read-only location; the index is rebuilt next time
+        return offsets
+
+    def count(self, sha1_hex):
+        """Returns how often a SHA-1 hex digest appears in the corpus, 0 if not at all."""
+        target = (sha1_hex.lower() if self.lowercase else sha1_hex.upper()).encode('ascii')
+        lo, hi = 0, len(self.data)
+        if self.offsets is not None:
+            prefix = int(sha1_hex[:PREFIX_HEX], 16)
+            lo, hi = int(self.offsets[prefix]), int(self.offsets[prefix + 1])
+        position = self.lower_bound(target, lo, hi)
+        if position >= hi:
+            return 0
+        line = self._line(position)
+        if line[:HASH_HEX] != target:
+            return 0
+        _, _, count = line.partition(b':')
+        return int(count) if count else 1
+
+    def counts(self, sha1_hexes):
+        """Returns the breach count of each digest, looking them up in sorted order."""
+        results = np.zeros(len(sha1_hexes), dtype=np.int64)
+        for i in sorted(range(len(sha1_hexes)), key=sha1_hexes.__getitem__):
+            results[i] = self.count(sha1_hexes[i])
+        return results
+
+
+def sha1_hexes(passwords):
+    """Returns the upper-case SHA-1 hex digest of each password."""
+    return [hashlib.sha1(p.encode('utf-8')).hexdigest().upper() for p in passwords]
+
+
+_open_corpora = {}
+
+
+def _check_batch(passwords, corpus_path):
+    """Pool worker: hashes a batch of passwords and returns their breach counts."""
+    corpus = _open_corpora.get(corpus_path)
+    if corpus is None:
+        corpus = _open_corpora[corpus_path] = BreachCorpus(corpus_path)
+    return corpus.counts(sha1_hexes(passwords))
+
+
+def check_passwords(passwords, corpus_path, workers=None):
+    """Returns the breach count of each of a list of distinct passwords."""
+    batches = [passwords[i:i + BATCH_PASSWORDS] for i in range(0, len(passwords), BATCH_PASSWORDS)]
+    if not use_pool(workers, len(passwords), batches):
+        with BreachCorpus(corpus_path) as corpus:
+            results = [corpus.counts(sha1_hexes(batch)) for batch in batches]
+    else:
+        # Build or load the prefix index once before the workers need it
+        BreachCorpus(corpus_path).close()
+        results = map_batches(_check_batch, batches, corpus_path, workers=workers, items=len(passwords))
+    return np.concatenate(results) if results else np.zeros(0, dtype=np.int64)
+
+
+def breach_counts(df, corpus_path, workers=None):
+    """Returns the breach count of every row's login_password (0 for none or not found)."""
+    if PASSWORD_COLUMN not in df.columns:
+        return np.zeros(len(df), dtype=np.int64)
+    codes, uniques = pd.factorize(column_values(df[PASSWORD_COLUMN]))
+    counts = check_passwords([p for p in uniques if p], corpus_path, workers)
+    # Map counts back through the unique passwords, skipping the blank one
+    by_unique = np.zeros(len(uniques), dtype=np.int64)
+    by_unique[np.asarray([p != "" for p in uniques], dtype=bool)] = counts
+    return by_unique[codes]
+
+
+def breached_entries(df, corpus_path, workers=None):
+    """Returns the entries whose password is in the corpus, most breached first, without passwords."""
+    counts = breach_counts(df, corpus_path, workers)
+    flagged = df.loc[counts > 0, [col for col in ENTRY_COLUMNS if col in df.columns]].copy()
+    flagged[BREACH_COLUMN] = counts[counts > 0]
+    return flagged.sort_values(BREACH_COLUMN, ascending=False, kind='stable')
+
+
+def breached_entries_file(file_path, corpus_path, memory_limit=DEFAULT_MEMORY_LIMIT, workers=None, progress=None):
+    """Returns (breached entries, passwords checked) for a CSV file read chunk by chunk."""
+    columns = read_header(file_path).columns
+    usecols = [col for col in ENTRY_COLUMNS + [PASSWORD_COLUMN] if col in columns]
+    parts = []
+    checked = 0
+    for chunk in iter_chunks(file_path, memory_limit=memory_limit, progress=progress, workers=workers, usecols=usecols):
+        if PASSWORD_COLUMN in chunk.columns:
+            checked += int(chunk[PASSWORD_COLUMN].notna().sum())
+        parts.append(breached_entries(chunk, corpus_path, workers))
+    if not parts:
+        return pd.DataFrame(columns=[col for col in ENTRY_COLUMNS if col in columns] + [BREACH_COLUMN]), 0
+    flagged = pd.concat(parts)
+    return flagged.sort_values(BREACH_COLUMN, ascending=False, kind='stable'), checked
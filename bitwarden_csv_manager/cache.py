@@ -0,0 +1,177 @@
+"""
+Optional on-disk cache of parsed exports for instant reloads.
+
+Parsed frames are stored as uncompressed Arrow IPC (Feather v2) files and
+read back memory-mapped. Entries are keyed by a BLAKE2 hash of the file
+contents plus its size and mtime, so any change to the export misses the
+cache. An index from path, size and mtime to that key spares rehashing a
+file that has not changed since it was last loaded. Nothing is cached
+unless the user picks a directory (for the CLI, through the
+BITWARDEN_CSV_CACHE_DIR environment variable). The cached data contains
+passwords in the clear: choose a location on an encrypted disk.
+Requires pyarrow.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from bitwarden_csv_manager.schema import HAS_PYARROW
+
+CACHE_DIR_ENV = 'BITWARDEN_CSV_CACHE_DIR'
+CACHE_MAX_BYTES_ENV = 'BITWARDEN_CSV_CACHE_MAX_BYTES'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+CACHE_SUFFIX = '.arrow'
+INDEX_NAME = 'index.json'
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class CacheUnavailable(RuntimeError):
+    """Raised when the cache is requested but pyarrow is not installed."""
+
+
+def file_key(file_path):
+    """Returns the cache key of a file: content hash, size and mtime."""
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as handle:
+        for block in iter(lambda: handle.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return f"{digest.hexdigest()}-{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def stat_key(file_path):
+    """Returns the index key of a file: absolute path, size and mtime."""
+    stat = os.stat(file_path)
+    return f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+class FrameCache:
+    """A size-bounded directory of parsed exports, evicted least recently used first."""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        if not HAS_PYARROW:
+            raise CacheUnavailable("The parsed-file cache needs pyarrow: pip install pyarrow")
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self._index = None
+
+    @classmethod
+    def from_env(cls):
+        """Returns the cache configured in the environment, or None."""
+        directory = os.environ.get(CACHE_DIR_ENV)
+        if not directory:
+            return None
+        max_bytes = int(os.environ.get(CACHE_MAX_BYTES_ENV, DEFAULT_MAX_BYTES))
+        return cls(directory, max_bytes)
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def index(self):
+        """Returns the stat key to cache key index, loading it on first use."""
+        if self._index is None:
+            try:
+                with open(os.path.join(self.directory, INDEX_NAME), encoding='utf-8') as handle:
+                    self._index = json.load(handle)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def save_index(self):
+        """Writes the index, dropping entries whose cached frame is gone."""
+        index = {stat: key for stat, key in self.index().items() if os.path.exists(self.path_for(key))}
+        handle, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(handle, 'w', encoding='utf-8') as tmp:
+                json.dump(index, tmp)
+            os.replace(tmp_path, os.path.join(self.directory, INDEX_NAME))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._index = index
+
+    def key_for(self, file_path):
+        """Returns the cache key of file_path, hashing it only if it changed since it was last seen."""
+        stat = stat_key(file_path)
+        key = self.index().get(stat)
+        if key is None:
+            key = file_key(file_path)
+            self.index()[stat] = key
+        return key
+
+    def entries(self):
+        """Returns (path, size, last used) for every cache entry."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(CACHE_SUFFIX):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def size(self):
+        """Returns the total size of the cache in bytes."""
+        return sum(size for _, size, _ in self.entries())
+
+    def get(self, file_path, key=None):
+        """Returns the cached frame for file_path, or None."""
+        import pyarrow.feather as feather
+
+        path = self.path_for(key or self.key_for(file_path))
+        if not os.path.exists(path):
+            return None
+        os.utime(path)  # Mark as recently used
+        return feather.read_table(path, memory_map=True).to_pandas()
+
+    def put(self, file_path, df, key=None):
+        """Stores the parsed frame for file_path and evicts old entries."""
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        path = self.path_for(key or self.key_for(file_path))
+        handle, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(handle)
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            feather.write_feather(table, tmp_path, compression='uncompressed')
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict()
+        self.save_index()
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits max_bytes."""
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+
+    def purge(self):
+        """Deletes every cache entry and returns how many were removed."""
+        entries = self.entries()
+        for path, _, _ in entries:
+            os.remove(path)
+        self.save_index()
+        return len(entries)
+
+
+def load_with_cache(file_path, loader, cache=None):
+    """Loads file_path through the cache if one is given, else calls loader(file_path)."""
+    if cache is None:
+        return loader(file_path)
+    key = cache.key_for(file_path)
+    df = cache.get(file_path, key=key)
+    if df is None:
+        df = loader(file_path)
+        cache.put(file_path, df, key=key)
+    return df
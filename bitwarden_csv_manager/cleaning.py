@@ -0,0 +1,235 @@
+"""
+Cleaning of common export artifacts before import.
+
+Rules, applied in this order and individually selectable:
+
+    unescape  decode Excel/OpenXML escapes such as _x000D_ and drop the
+              control characters they leave behind (e.g. _x0010_)
+    trim      strip leading and trailing whitespace (passwords excepted)
+    uri       repair login URIs: blank bare schemes like "http://" and put
+              back the "/" lost between host and path, as in
+              https://accounts.firefox.comcomplete_reset_password; a
+              host ending in a real TLD (see tlds.py) is never split
+    flags     canonical favorite (1 or blank) and reprompt (0 or 1) values
+    type      canonical type names (login, note)
+
+Every rule is a vectorized string operation over the distinct values of a
+column, so repeated values cost nothing. Values a rule cannot repair are
+left alone and counted as invalid. clean_frame works on a whole frame and
+clean_chunks on a stream of chunks; both add the number of changed cells
+per rule to a Counter, which describe_counts turns into report lines.
+"""
+
+import logging
+import re
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from bitwarden_csv_manager.schema import compact_frame
+from bitwarden_csv_manager.tlds import TLDS
+
+logger = logging.getLogger(__name__)
+
+CLEANING_RULES = ('unescape', 'trim', 'uri', 'flags', 'type')
+
+# Leading or trailing spaces in a password are significant
+TRIM_EXCLUDE_COLUMNS = ['login_password']
+
+ESCAPE_RE = r'_x([0-9A-Fa-f]{4})_'
+# C0 controls other than tab, newline and carriage return
+CONTROL_RE = r'[\x00-\x08\x0b\x0c\x0e-\x1f]'
+
+BARE_SCHEME_RE = r'^[A-Za-z][A-Za-z0-9+.-]*://$'
+URI_PARTS_RE = r'^(?P<head>https?://(?:[^/?#.]+\.)+)(?P<label>[A-Za-z0-9_-]+)(?P<rest>.*)$'
+
+# Last labels of intranet hosts, which are not TLDs but are not glued paths either
+PRIVATE_LABELS = {'corp', 'home', 'internal', 'intranet', 'lan', 'local', 'localdomain', 'localhost', 'private'}
+
+# TLDs a glued path is split from. A last label is only split when it is
+# neither in TLDS nor PRIVATE_LABELS, and then only after one of these.
+KNOWN_TLDS = {
+    'ai', 'am', 'app', 'at', 'au', 'be', 'biz', 'br', 'ca', 'cc', 'ch', 'cn', 'co',
+    'com', 'cz', 'de', 'dev', 'dk', 'edu', 'es', 'eu', 'fi', 'fm', 'fr', 'gg', 'gov',
+    'in', 'info', 'int', 'io', 'it', 'jp', 'ly', 'me', 'mil', 'net', 'nl', 'no',
+    'org', 'page', 'pl', 'ru', 'se', 'sh', 'shop', 'site', 'tech', 'to', 'tv', 'uk',
+    'us', 'xyz',
+}
+GLUED_TLD_RE = '^(?P<tld>{})(?P<tail>.+)$'.format(
+    '|'.join(sorted((re.escape(tld) for tld in KNOWN_TLDS), key=len, reverse=True))
+)
+
+FLAG_TRUE = {'1', '1.0', 'true', 'yes', 'y'}
+FLAG_FALSE = {'0', '0.0', 'false', 'no', 'n'}
+# Value written for a false flag: Bitwarden exports favorite blank and reprompt 0
+FLAG_FALSE_VALUES = {'favorite': '', 'reprompt': '0'}
+
+VALID_TYPES = ('login', 'note')
+TYPE_ALIASES = {'securenote': 'note', 'secure note': 'note', 'secure_note': 'note', '1': 'login', '2': 'note'}
+
+
+def unescape_values(values):
+    """Decodes _xHHHH_ escapes and drops the control characters they produce."""
+    escaped = values.str.contains('_x', regex=False)
+    if not escaped.any():
+        return values
+    values = values.copy()
+    values[escaped] = (
+        values[escaped]
+        .str.replace(ESCAPE_RE, lambda match: chr(int(match.group(1), 16)), regex=True)
+        .str.replace(CONTROL_RE, '', regex=True)
+    )
+    return values
+
+
+def trim_values(values):
+    """Strips surrounding whitespace."""
+    return values.str.strip()
+
+
+def repair_uris(values):
+    """
+    Blanks bare schemes and re-inserts the slash between a host and a glued-on
+    path; returns (values, invalid mask). Hosts whose last label is not a TLD
+    and cannot be split are left alone and marked invalid.
+    """
+    values = values.where(~values.str.match(BARE_SCHEME_RE), '')
+    parts = values.str.extract(URI_PARTS_RE, flags=re.IGNORECASE)
+    label = parts['label'].str.lower()
+    glued = (
+        parts['label'].notna() & ~label.isin(TLDS) & ~label.isin(PRIVATE_LABELS)
+        & ~label.str.isdigit().fillna(False).astype(bool)  # IPv4 addresses
+    )
+    invalid = pd.Series(False, index=values.index)
+    if not glued.any():
+        return values, invalid
+
+    split = parts.loc[glued, 'label'].str.extract(GLUED_TLD_RE, flags=re.IGNORECASE)
+    fixable = split['tld'].notna()
+    invalid[split.index[~fixable]] = True
+    index = split.index[fixable]
+    values = values.copy()
+    values[index] = (
+        parts.loc[index, 'head'] + split.loc[index, 'tld'] + '/' + split.loc[index, 'tail']
+        + parts.loc[index, 'rest']
+    )
+    return values, invalid
+
+
+def flag_values(values, false_value):
+    """Maps truthy values to '1' and falsy ones to false_value; returns (values, invalid mask)."""
+    lowered = values.str.strip().str.lower()
+    canonical = values.copy()
+    canonical[lowered.isin(FLAG_TRUE)] = '1'
+    canonical[lowered.isin(FLAG_FALSE)] = false_value
+    invalid = ~(lowered.isin(FLAG_TRUE) | lowered.isin(FLAG_FALSE) | (lowered == ''))
+    return canonical, invalid
+
+
+def type_values(values):
+    """Maps type names to Bitwarden's spelling; returns (values, invalid mask)."""
+    lowered = values.str.strip().str.lower().replace(TYPE_ALIASES)
+    valid = lowered.isin(VALID_TYPES)
+    return values.where(~valid, lowered), ~valid & (lowered != '')
+
+
+def _map_distinct(series, func):
+    """
+    Applies func to the distinct non-blank values of series.
+
+    func takes and returns a Series of str; it may also return an invalid
+    mask as a second value. Returns (object Series or None if unchanged,
+    cells changed, cells invalid).
+    """
+    codes, uniques = pd.factorize(series)
+    if not len(uniques):
+        return None, 0, 0
+    before = pd.Series(np.asarray(uniques, dtype=object)).astype(str)
+    result = func(before)
+    after, invalid = result if isinstance(result, tuple) else (result, None)
+
+    present = codes[codes >= 0]
+    invalid_cells = int(invalid.to_numpy()[present].sum()) if invalid is not None else 0
+    changed = (after != before).to_numpy()
+    if not changed.any():
+        return None, 0, invalid_cells
+
+    values = after.to_numpy(dtype=object)[codes]
+    values[(codes == -1) | (values == '')] = np.nan  # Blank fields are missing, as when read
+    return pd.Series(values, index=series.index, name=series.name), int(changed[present].sum()), invalid_cells
+
+
+def clean_frame(df, rules=CLEANING_RULES, counts=None):
+    """
+    Returns a cleaned copy of df and a Counter of changed cells per rule.
+
+    Invalid values that were left unchanged are counted as invalid_<column>.
+    Pass counts to accumulate over several chunks.
+    """
+    unknown = set(rules) - set(CLEANING_RULES)
+    if unknown:
+        raise ValueError(f"Unknown cleaning rule(s): {', '.join(sorted(unknown))}")
+    counts = Counter() if counts is None else counts
+
+    steps = []  # (rule, column, func)
+    for col in df.columns:
+        if 'unescape' in rules:
+            steps.append(('unescape', col, unescape_values))
+        if 'trim' in rules and col not in TRIM_EXCLUDE_COLUMNS:
+            steps.append(('trim', col, trim_values))
+        if 'uri' in rules and col == 'login_uri':
+            steps.append(('uri', col, repair_uris))
+        if 'flags' in rules and col in FLAG_FALSE_VALUES:
+            steps.append(('flags', col, lambda values, col=col: flag_values(values, FLAG_FALSE_VALUES[col])))
+        if 'type' in rules and col == 'type':
+            steps.append(('type', col, type_values))
+
+    cleaned = {}
+    for rule, col, func in steps:
+        values, changed, invalid = _map_distinct(cleaned.get(col, df[col]), func)
+        if values is not None:
+            cleaned[col] = values
+        counts[rule] += changed
+        if changed:
+            logger.debug("%s changed %d value(s) in %s", rule, changed, col)
+        if invalid:
+            counts[f'invalid_{col}'] += invalid
+
+    if not cleaned:
+        return df, counts
+    df = df.copy()
+    narrowed = compact_frame(pd.DataFrame(cleaned, index=df.index))
+    for col in cleaned:
+        df[col] = narrowed[col]
+    return df, counts
+
+
+def clean_chunks(chunks, rules=CLEANING_RULES, counts=None):
+    """Yields each chunk cleaned, adding its changes to counts."""
+    counts = Counter() if counts is None else counts
+    for chunk in chunks:
+        chunk, _ = clean_frame(chunk, rules, counts)
+        yield chunk
+
+
+def describe_counts(counts):
+    """Returns one human-readable line per rule."""
+    lines = []
+    for rule in CLEANING_RULES:
+        lines.append(f"{rule}: {counts.get(rule, 0)} value(s) changed")
+    for key in sorted(key for key in counts if key.startswith('invalid_')):
+        if counts[key]:
+            lines.append(f"{key[len('invalid_'):]}: {counts[key]} invalid value(s) left unchanged")
+    return lines
+
+
+def parse_rules(text):
+    """Parses a comma-separated rule list; 'all' or an empty string selects every rule."""
+    if not text or text == 'all':
+        return CLEANING_RULES
+    rules = tuple(rule.strip() for rule in text.split(',') if rule.strip())
+    unknown = set(rules) - set(CLEANING_RULES)
+    if unknown:
+        raise ValueError(f"Unknown cleaning rule(s): {', '.join(sorted(unknown))}. Choose from: {', '.join(CLEANING_RULES)}")
+    return rules
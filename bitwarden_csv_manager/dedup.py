@@ -0,0 +1,174 @@
+"""
+Exact duplicate detection for Bitwarden exports.
+
+Rows are keyed by a 64-bit hash of name, normalized login_uri,
+login_username and login_password, so grouping is a single O(n) pass.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from bitwarden_csv_manager.search import column_values
+from bitwarden_csv_manager.streaming import DEFAULT_MEMORY_LIMIT, export_chunks, iter_chunks
+
+KEY_COLUMNS = ['name', 'login_uri', 'login_username', 'login_password']
+
+# Used by keep_newest when present; otherwise the last row in the file wins.
+DATE_COLUMNS = ['revisionDate', 'revision_date', 'modified']
+
+# keep_first and keep_newest drop duplicates, report leaves the data unchanged.
+DEDUP_POLICIES = ('keep_first', 'keep_newest', 'report')
+
+GROUP_COLUMN = 'duplicate_group'
+
+URI_RE = re.compile(r'^(?:https?://)?([^/?#]*)(.*)$', re.IGNORECASE | re.DOTALL)
+
+
+def normalize_uri_value(uri):
+    """Normalizes a single URI string, see normalize_uri."""
+    match = URI_RE.match(uri.strip())
+    host = match.group(1).lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    return host + match.group(2).rstrip('/')
+
+
+def normalize_uri(series):
+    """
+    Normalizes URIs so that trivially different spellings compare equal.
+
+    Drops an http(s) scheme and a leading www., lowercases the host and
+    strips trailing slashes. Each distinct URI is normalized only once.
+    """
+    codes, uniques = pd.factorize(column_values(series))
+    normalized = np.array([normalize_uri_value(uri) for uri in uniques], dtype=object)
+    return pd.Series(normalized[codes] if len(normalized) else [""] * len(codes), index=series.index)
+
+
+def key_frame(df):
+    """Returns the normalized key columns of df; rows are duplicates when these are equal."""
+    keys = pd.DataFrame(index=df.index)
+    for col in KEY_COLUMNS:
+        if col not in df.columns:
+            keys[col] = ""
+        elif col == 'login_uri':
+            keys[col] = normalize_uri(df[col])
+        else:
+            keys[col] = column_values(df[col]).str.strip()
+    return keys
+
+
+def dedup_keys(df):
+    """Returns one uint64 hash per row over the key columns."""
+    return pd.util.hash_pandas_object(key_frame(df), index=False).to_numpy()
+
+
+def date_column(columns):
+    """Returns the name of the first revision date column, if any."""
+    for col in DATE_COLUMNS:
+        if col in columns:
+            return col
+    return None
+
+
+def keep_mask(keys, policy='keep_first', dates=None):
+    """Returns a boolean array of the rows to keep under policy."""
+    if policy not in DEDUP_POLICIES:
+        raise ValueError(f"Unknown dedup policy: {policy}")
+    keys = pd.Series(keys)
+    if policy == 'report':
+        return np.ones(len(keys), dtype=bool)
+    if policy == 'keep_first':
+        return ~keys.duplicated(keep='first').to_numpy()
+    if dates is None:
+        return ~keys.duplicated(keep='last').to_numpy()
+
+    # Newest revision wins; ties and missing dates fall back to file order
+    frame = pd.DataFrame({
+        'key': keys,
+        'date': pd.to_datetime(pd.Series(dates), errors='coerce', utc=True),
+    })
+    newest = frame.sort_values('date', kind='stable', na_position='first').drop_duplicates('key', keep='last')
+    mask = np.zeros(len(keys), dtype=bool)
+    mask[newest.index.to_numpy()] = True
+    return mask
+
+
+def duplicate_groups(keys):
+    """Returns (positions, group numbers) for rows whose key occurs more than once."""
+    keys = pd.Series(keys)
+    positions = np.flatnonzero(keys.duplicated(keep=False).to_numpy())
+    codes, _ = pd.factorize(keys.iloc[positions])
+    order = np.argsort(codes, kind='stable')
+    return positions[order], codes[order] + 1
+
+
+def duplicate_report(df, keys):
+    """Returns the duplicated rows of df, grouped, with a duplicate_group column."""
+    positions, groups = duplicate_groups(keys)
+    report = df.iloc[positions].copy()
+    report.insert(0, GROUP_COLUMN, groups)
+    return report
+
+
+def drop_duplicates(df, policy='keep_first'):
+    """Returns (deduplicated DataFrame, duplicate report) for an in-memory export."""
+    keys = dedup_keys(df)
+    dates_col = date_column(df.columns)
+    dates = df[dates_col].to_numpy() if dates_col else None
+    report = duplicate_report(df, keys)
+    return df[keep_mask(keys, policy, dates)], report
+
+
+def dedup_file(file_path, output_path=None, policy='keep_first',
+               memory_limit=DEFAULT_MEMORY_LIMIT, progress=None, workers=1):
+    """
+    Deduplicates a CSV file in two streaming passes.
+
+    The first pass only keeps one hash (and revision date) per row; the
+    second writes the kept rows to output_path if given. Returns
+    (rows written, duplicate report). workers is passed to iter_chunks.
+    """
+    keys = []
+    dates = []
+    dates_col = None
+    for chunk in iter_chunks(file_path, memory_limit=memory_limit, progress=progress, workers=workers):
+        keys.append(dedup_keys(chunk))
+        dates_col = date_column(chunk.columns)
+        if dates_col:
+            dates.append(chunk[dates_col].to_numpy())
+    keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.uint64)
+    keep = keep_mask(keys, policy, np.concatenate(dates) if dates_col else None)
+    positions, groups = duplicate_groups(keys)
+    by_position = np.argsort(positions)
+    positions, groups = positions[by_position], groups[by_position]
+
+    report_chunks = []
+
+    def kept_chunks():
+        start = 0
+        for chunk in iter_chunks(file_path, memory_limit=memory_limit, progress=progress, workers=workers):
+            end = start + len(chunk)
+            low, high = np.searchsorted(positions, [start, end])
+            if high > low:
+                report = chunk.iloc[positions[low:high] - start].copy()
+                report.insert(0, GROUP_COLUMN, groups[low:high])
+                report_chunks.append(report)
+            yield chunk[keep[start:end]]
+            start = end
+
+    if output_path:
+        rows = export_chunks(kept_chunks(), output_path)
+    else:
+        rows = 0
+        for chunk in kept_chunks():
+            rows += len(chunk)
+
+    if report_chunks:
+        report = pd.concat(report_chunks)
+        report = report.iloc[np.argsort(report[GROUP_COLUMN].to_numpy(), kind='stable')]
+    else:
+        report = pd.DataFrame(columns=[GROUP_COLUMN])
+    return rows, report
@@ -0,0 +1,303 @@
+"""
+Streaming diff of two exports of the same vault.
+
+Entries are matched by a 64-bit hash of their identifying fields: type,
+name, normalized login_uri (as in dedup.py) and login_username, so an
+entry whose password, notes or folder changed is reported as modified,
+while a renamed one shows up as removed and added. When several entries
+share a key, identical copies are paired first and the rest in file
+order.
+
+Both files are read chunk by chunk and every row is appended to one of
+several partition files picked by its hash, so rows with the same key
+meet in the same partition. The partitions are then joined one pair at a
+time; their number is chosen so a pair fits within memory_limit, which
+bounds memory however large the exports are. Exports that fit at once
+skip the partition files. Changes are reported per field, in file order
+within each partition.
+
+Partition files hold passwords in the clear; they are written to a
+private temporary directory that is removed afterwards. The report never
+contains passwords or TOTP secrets, only that they changed.
+"""
+
+import csv
+import math
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from bitwarden_csv_manager.dedup import normalize_uri
+from bitwarden_csv_manager.lite import MEMORY_OVERHEAD_FACTOR, atomic_output
+from bitwarden_csv_manager.schema import ENTRY_COLUMNS, load_ideal_columns
+from bitwarden_csv_manager.streaming import DEFAULT_MEMORY_LIMIT, collect_chunks, iter_chunks, read_header
+
+IDENTITY_COLUMNS = ['type', 'name', 'login_uri', 'login_username']
+
+# Columns of the report: the change and the entry it applies to
+REPORT_COLUMNS = ['change'] + ENTRY_COLUMNS + ['field', 'old_value', 'new_value']
+CHANGES = ('added', 'removed', 'modified')
+
+# Fields whose values are left out of the report
+SECRET_COLUMNS = ['login_password', 'login_totp']
+SECRET_VALUE = '(hidden)'
+
+# Partitions written at once; larger inputs get bigger partitions instead
+MAX_PARTITIONS = 256
+
+KEY_COLUMN = '_diff_key'
+ROW_COLUMN = '_diff_row'  # Hash of every compared field, to pair identical copies
+POSITION_COLUMN = '_diff_position'
+TEXT_COLUMNS = [KEY_COLUMN, ROW_COLUMN, POSITION_COLUMN]
+
+# Fields are compared as written, as plain str objects
+TEXT_READ_KWARGS = {'dtype': object, 'keep_default_na': False, 'na_filter': False}
+
+
+def diff_columns(old_file, new_file):
+    """Returns the columns compared: the ideal ones present in either file, then any others."""
+    present = list(read_header(old_file).columns)
+    present += [col for col in read_header(new_file).columns if col not in present]
+    ideal = [col for col in load_ideal_columns() if col in present]
+    return ideal + [col for col in present if col not in ideal]
+
+
+def identity_keys(values):
+    """Returns one uint64 hash per row of a text frame over the identifying columns."""
+    keys = pd.DataFrame(index=values.index)
+    for col in IDENTITY_COLUMNS:
+        if col not in values.columns:
+            keys[col] = ""
+        elif col == 'login_uri':
+            keys[col] = normalize_uri(values[col])
+        else:
+            keys[col] = values[col].str.strip()
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def partition_count(old_file, new_file, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """Returns how many partitions keep one pair of them within memory_limit."""
+    total_bytes = os.path.getsize(old_file) + os.path.getsize(new_file)
+    return max(1, min(MAX_PARTITIONS, math.ceil(total_bytes * MEMORY_OVERHEAD_FACTOR / memory_limit)))
+
+
+def _partition_path(prefix, number):
+    return f"{prefix}-{number:04d}.pickle"
+
+
+def text_values(series):
+    """Returns a column as an array of str objects, with missing values as the empty string."""
+    values = series.to_numpy(dtype=object)
+    missing = pd.isna(values)
+    if missing.any():
+        values = values.copy()
+        values[missing] = ""
+    return values
+
+
+def text_chunks(file_path, columns, memory_limit=DEFAULT_MEMORY_LIMIT, progress=None):
+    """Yields file_path chunk by chunk as text in columns, with each row's key, row hash and position."""
+    rows = 0
+    for chunk in iter_chunks(file_path, memory_limit=memory_limit, progress=progress, compact=False,
+                             **TEXT_READ_KWARGS):
+        values = pd.DataFrame({
+            col: text_values(chunk[col]) if col in chunk.columns else ""
+            for col in columns
+        }, index=pd.RangeIndex(len(chunk)))
+        text = pd.DataFrame({
+            KEY_COLUMN: identity_keys(values),
+            ROW_COLUMN: pd.util.hash_pandas_object(values, index=False).to_numpy(),
+            POSITION_COLUMN: np.arange(rows, rows + len(chunk)),
+        })
+        rows += len(chunk)
+        yield pd.concat([text, values], axis=1)
+
+
+def partition_file(file_path, prefix, columns, partitions, memory_limit=DEFAULT_MEMORY_LIMIT, progress=None):
+    """
+    Appends every row of file_path, as from text_chunks, to the partition of its key; returns the rows.
+
+    Partition files are sequences of pickled frames, which are much
+    quicker to write and read back than CSV.
+    """
+    rows = 0
+    for text in text_chunks(file_path, columns, memory_limit, progress):
+        for number, part in text.groupby(text[KEY_COLUMN].to_numpy() % partitions, sort=False):
+            with open(_partition_path(prefix, number), 'ab') as handle:
+                pickle.dump(part, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        rows += len(text)
+    return rows
+
+
+def read_partition(path, columns):
+    """Reads a partition file written by partition_file, or an empty frame if there is none."""
+    parts = []
+    if os.path.exists(path):
+        with open(path, 'rb') as handle:
+            while True:
+                try:
+                    parts.append(pickle.load(handle))
+                except EOFError:
+                    break
+    return collect_chunks(parts, TEXT_COLUMNS + list(columns))
+
+
+def _pair(old, new, on):
+    """Outer-joins two partitions on the columns on and the occurrence of those values."""
+    for part in (old, new):
+        part['_occurrence'] = part.groupby(on, sort=False).cumcount()
+    return old.merge(new, on=on + ['_occurrence'], how='outer', suffixes=('_old', '_new'), indicator=True)
+
+
+def _entry_frame(joined, side, change):
+    """Returns the report rows of entries found on one side only."""
+    report = pd.DataFrame({'change': change}, index=joined.index)
+    for col in ENTRY_COLUMNS:
+        name = f"{col}_{side}"
+        report[col] = joined[name].to_numpy() if name in joined.columns else ""
+    report['field'] = ""
+    report['old_value'] = ""
+    report['new_value'] = ""
+    report['_position'] = joined[f"{POSITION_COLUMN}_{side}"].to_numpy()
+    return report
+
+
+def _field_changes(both, columns):
+    """Returns one report row per changed field of the entries in both files, and the rows changed."""
+    parts = []
+    changed_rows = np.zeros(len(both), dtype=bool)
+    for col in columns:
+        old_values = both[f"{col}_old"].to_numpy()
+        new_values = both[f"{col}_new"].to_numpy()
+        changed = old_values != new_values
+        if not changed.any():
+            continue
+        changed_rows |= changed
+        rows = both[changed]
+        part = _entry_frame(rows, 'new', 'modified')
+        part['field'] = col
+        if col in SECRET_COLUMNS:
+            part['old_value'] = SECRET_VALUE
+            part['new_value'] = SECRET_VALUE
+        else:
+            part['old_value'] = old_values[changed]
+            part['new_value'] = new_values[changed]
+        part['_order'] = columns.index(col)
+        parts.append(part)
+    if not parts:
+        return None, changed_rows
+    report = pd.concat(parts)
+    report = report.sort_values(['_position', '_order'], kind='stable').drop(columns='_order')
+    return report, changed_rows
+
+
+def diff_partition(old, new, columns, counts=None):
+    """Returns the report rows of one pair of partitions and adds to counts."""
+    # Identical rows first, so one removed copy of a duplicate does not shift the pairing
+    exact = _pair(old[[KEY_COLUMN, ROW_COLUMN, POSITION_COLUMN]], new[[KEY_COLUMN, ROW_COLUMN, POSITION_COLUMN]],
+                  [KEY_COLUMN, ROW_COLUMN])
+    side = exact['_merge'].to_numpy()
+    unchanged = int((side == 'both').sum())
+    old = old[old[POSITION_COLUMN].isin(exact.loc[side == 'left_only', f"{POSITION_COLUMN}_old"])]
+    new = new[new[POSITION_COLUMN].isin(exact.loc[side == 'right_only', f"{POSITION_COLUMN}_new"])]
+
+    joined = _pair(old.drop(columns=ROW_COLUMN), new.drop(columns=ROW_COLUMN), [KEY_COLUMN])
+    side = joined['_merge'].to_numpy()
+    added = joined[side == 'right_only']
+    removed = joined[side == 'left_only']
+    both = joined[side == 'both']
+    modified, changed_rows = _field_changes(both, columns)
+
+    if counts is not None:
+        counts['added'] += len(added)
+        counts['removed'] += len(removed)
+        counts['modified'] += int(changed_rows.sum())
+        counts['unchanged'] += unchanged + int((~changed_rows).sum())
+        counts['field_changes'] += 0 if modified is None else len(modified)
+
+    parts = [
+        _entry_frame(removed, 'old', 'removed').sort_values('_position', kind='stable'),
+        _entry_frame(added, 'new', 'added').sort_values('_position', kind='stable'),
+    ]
+    if modified is not None:
+        parts.append(modified)
+    report = pd.concat(parts, ignore_index=True)
+    return report.drop(columns='_position')[REPORT_COLUMNS]
+
+
+def diff_chunks(old_file, new_file, counts=None, memory_limit=DEFAULT_MEMORY_LIMIT,
+                temp_dir=None, progress=None):
+    """
+    Yields the changes from old_file to new_file as report chunks.
+
+    Each chunk holds the removed, added and modified entries of one
+    partition, with one row per changed field of a modified entry. counts
+    gets the number of added, removed, modified and unchanged entries and
+    of field changes. progress is called while each file is partitioned,
+    as in streaming.iter_chunks.
+    """
+    columns = diff_columns(old_file, new_file)
+    partitions = partition_count(old_file, new_file, memory_limit)
+    if partitions == 1:
+        old = collect_chunks(text_chunks(old_file, columns, memory_limit, progress), TEXT_COLUMNS + columns)
+        new = collect_chunks(text_chunks(new_file, columns, memory_limit, progress), TEXT_COLUMNS + columns)
+        if counts is not None:
+            counts['old_rows'] += len(old)
+            counts['new_rows'] += len(new)
+        report = diff_partition(old, new, columns, counts)
+        if len(report):
+            yield report
+        return
+
+    with tempfile.TemporaryDirectory(prefix='bitwarden-diff-', dir=temp_dir) as directory:
+        old_prefix = os.path.join(directory, 'old')
+        new_prefix = os.path.join(directory, 'new')
+        old_rows = partition_file(old_file, old_prefix, columns, partitions, memory_limit, progress)
+        new_rows = partition_file(new_file, new_prefix, columns, partitions, memory_limit, progress)
+        if counts is not None:
+            counts['old_rows'] += old_rows
+            counts['new_rows'] += new_rows
+
+        for number in range(partitions):
+            old = read_partition(_partition_path(old_prefix, number), columns)
+            new = read_partition(_partition_path(new_prefix, number), columns)
+            report = diff_partition(old, new, columns, counts)
+            if len(report):
+                yield report
+
+
+def write_report(chunks, file_path):
+    """Writes report chunks to a CSV file, with a header even when empty; returns the rows."""
+    rows = 0
+    with atomic_output(file_path) as tmp_path, open(tmp_path, 'w', encoding='utf-8', newline='') as handle:
+        csv.writer(handle, lineterminator=os.linesep).writerow(REPORT_COLUMNS)
+        for chunk in chunks:
+            chunk.to_csv(handle, index=False, header=False)
+            rows += len(chunk)
+    return rows
+
+
+def empty_counts():
+    """Returns the counts diff_chunks fills in, all zero."""
+    return dict.fromkeys(['old_rows', 'new_rows', *CHANGES, 'unchanged', 'field_changes'], 0)
+
+
+def diff_files(old_file, new_file, report_file, memory_limit=DEFAULT_MEMORY_LIMIT, temp_dir=None, progress=None):
+    """Writes the diff report of two exports to report_file and returns the counts."""
+    counts = empty_counts()
+    write_report(diff_chunks(old_file, new_file, counts, memory_limit, temp_dir, progress), report_file)
+    return counts
+
+
+def describe_counts(counts):
+    """Returns diff counts as human-readable lines."""
+    return [
+        f"{counts['old_rows']} entries before, {counts['new_rows']} after",
+        f"added: {counts['added']}",
+        f"removed: {counts['removed']}",
+        f"modified: {counts['modified']} ({counts['field_changes']} field changes)",
+        f"unchanged: {counts['unchanged']}",
+    ]
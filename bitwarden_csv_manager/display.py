@@ -0,0 +1,23 @@
+"""
+Display formatting for previewing exports in the GUI.
+"""
+
+# Longer values are cut to DISPLAY_WIDTH - 3 characters followed by "..."
+DISPLAY_WIDTH = 50
+
+
+def format_column(series, width=DISPLAY_WIDTH):
+    """Converts a column to display strings: blanks for NaN, long values truncated."""
+    values = series.astype(object).where(series.notna(), "").astype(str)
+    too_long = values.str.len() > width
+    if too_long.any():
+        values = values.where(~too_long, values.str[:width - 3] + "...")
+    return values
+
+
+def format_for_display(df, width=DISPLAY_WIDTH):
+    """Returns the rows of a DataFrame as lists of display strings."""
+    if df.empty:
+        return []
+    columns = [format_column(df[col], width).tolist() for col in df.columns]
+    return [list(row) for row in zip(*columns)]
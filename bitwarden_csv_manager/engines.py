@@ -0,0 +1,142 @@
+"""
+Interchangeable CSV parser backends.
+
+Every engine reads all fields as text, treats only empty fields as
+missing, keeps quoted multi-line notes intact and supports usecols, so
+their results are identical:
+
+    pyarrow     pyarrow.csv, multithreaded (needs pyarrow)
+    c           pandas' C parser
+    python-csv  the standard library csv module, always available
+
+'auto' picks the first installed engine in that order. The default can be
+overridden with the BITWARDEN_CSV_ENGINE environment variable.
+"""
+
+import csv
+import importlib.util
+import io
+import os
+
+import pandas as pd
+
+ENGINES = ('pyarrow', 'c', 'python-csv')
+ENGINE_ENV = 'BITWARDEN_CSV_ENGINE'
+
+# Only empty fields are missing; "NA", "null" etc. are kept as text
+READ_KWARGS = {'dtype': str, 'keep_default_na': False, 'na_values': ['']}
+
+
+def available_engines():
+    """Returns the installed engines, fastest first."""
+    return [engine for engine in ENGINES
+            if engine != 'pyarrow' or importlib.util.find_spec('pyarrow') is not None]
+
+
+def resolve_engine(engine=None):
+    """Returns a concrete engine name for engine, 'auto' or None."""
+    engine = engine or os.environ.get(ENGINE_ENV) or 'auto'
+    if engine == 'auto':
+        return available_engines()[0]
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown CSV engine '{engine}'. Choose from: auto, {', '.join(ENGINES)}")
+    if engine not in available_engines():
+        raise ValueError(f"CSV engine '{engine}' is not installed")
+    return engine
+
+
+def read_text_csv(file_path, engine=None, usecols=None):
+    """Reads a CSV file with every field as text using the chosen engine."""
+    engine = resolve_engine(engine)
+    if engine == 'pyarrow':
+        return _read_pyarrow(file_path, usecols)
+    if engine == 'python-csv':
+        return _read_python_csv(file_path, usecols)
+    return pd.read_csv(file_path, engine='c', usecols=usecols, **READ_KWARGS)
+
+
+def read_text_records(data, columns, usecols=None, engine=None):
+    """
+    Parses headerless CSV bytes with every field as text, naming the
+    columns columns, as read_text_csv does for a whole file.
+
+    Used to parse pieces of a file in parallel, so pyarrow runs on a
+    single thread; python-csv reads with the C parser.
+    """
+    engine = resolve_engine(engine)
+    if engine == 'pyarrow':
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        try:
+            table = pa_csv.read_csv(
+                pa.BufferReader(data),
+                read_options=pa_csv.ReadOptions(use_threads=False, column_names=columns),
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types={col: pa.string() for col in columns},
+                    include_columns=[col for col in columns if col in usecols] if usecols is not None else None,
+                    strings_can_be_null=True,
+                    null_values=[''],
+                ),
+            )
+        except pa.ArrowInvalid:
+            pass  # Ragged rows are padded by pandas, as in _read_pyarrow
+        else:
+            return pd.DataFrame({name: table.column(name).to_pandas().astype(object) for name in table.column_names})
+    return pd.read_csv(io.BytesIO(data), engine='c', header=None, names=columns, usecols=usecols, **READ_KWARGS)
+
+
+def _read_header(file_path):
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as handle:
+        return next(csv.reader(handle), [])
+
+
+def _read_pyarrow(file_path, usecols):
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    columns = _read_header(file_path)
+    try:
+        table = pa_csv.read_csv(
+            file_path,
+            read_options=pa_csv.ReadOptions(use_threads=True),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={col: pa.string() for col in columns},
+                include_columns=[col for col in columns if col in usecols] if usecols is not None else None,
+                strings_can_be_null=True,
+                null_values=[''],
+            ),
+        )
+    except pa.ArrowInvalid:
+        # Ragged rows (e.g. missing trailing fields) are padded by pandas, not by pyarrow
+        return pd.read_csv(file_path, engine='c', usecols=usecols, **READ_KWARGS)
+    return pd.DataFrame({name: table.column(name).to_pandas().astype(object) for name in table.column_names})
+
+
+def _read_python_csv(file_path, usecols):
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as handle:
+        reader = csv.reader(handle)
+        columns = next(reader, [])
+        if usecols is not None:
+            missing = set(usecols) - set(columns)
+            if missing:
+                raise ValueError(f"Usecols do not match columns, columns expected but not found: {sorted(missing)}")
+        keep = [i for i, col in enumerate(columns) if usecols is None or col in usecols]
+        values = [[] for _ in keep]
+
+        width = len(columns)
+        for row in reader:
+            if not row:
+                continue  # Blank line
+            if len(row) > width:
+                raise ValueError(f"Expected {width} fields in line {reader.line_num}, saw {len(row)}")
+            for out, i in zip(values, keep):
+                value = row[i] if i < len(row) else ''
+                out.append(value if value != '' else None)
+
+    return pd.DataFrame(
+        {columns[i]: pd.Series(out, dtype=object) for i, out in zip(keep, values)},
+        columns=[columns[i] for i in keep]
+    )
@@ -1,9 +1,53 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import pandas as pd
 import os
+import sys
+from collections import Counter
 from pathlib import Path
 
+from bitwarden_csv_manager import lazy, lite, profiling
+from bitwarden_csv_manager.display import format_for_display
+from bitwarden_csv_manager.workers import BackgroundTask
+
+# The data modules import pandas, so they load in the background once the
+# window is up; see lazy.py
+breach = lazy.LazyModule('bitwarden_csv_manager.breach')
+cache = lazy.LazyModule('bitwarden_csv_manager.cache')
+cleaning = lazy.LazyModule('bitwarden_csv_manager.cleaning')
+dedup = lazy.LazyModule('bitwarden_csv_manager.dedup')
+diff = lazy.LazyModule('bitwarden_csv_manager.diff')
+hygiene = lazy.LazyModule('bitwarden_csv_manager.hygiene')
+importers = lazy.LazyModule('bitwarden_csv_manager.importers')
+near_dedup = lazy.LazyModule('bitwarden_csv_manager.near_dedup')
+query = lazy.LazyModule('bitwarden_csv_manager.query')
+schema = lazy.LazyModule('bitwarden_csv_manager.schema')
+search = lazy.LazyModule('bitwarden_csv_manager.search')
+streaming = lazy.LazyModule('bitwarden_csv_manager.streaming')
+
+BACKGROUND_MODULES = tuple(
+    module.__name__ for module in (
+        streaming, schema, search, query, cache, cleaning, importers, dedup, near_dedup, hygiene, breach, diff
+    )
+)
+PRELOAD_POLL_MS = 100
+
+# Rows kept in memory for preview when a large file is streamed.
+STREAMING_PREVIEW_ROWS = 1000
+
+# Changes shown when comparing exports; the full list can be saved
+DIFF_VIEW_ROWS = 100000
+
+# File types offered when opening or saving a vault, as opposed to a report
+EXPORT_FILETYPES = [("CSV files", "*.csv"), ("Bitwarden JSON", "*.json")]
+
+
+def open_env_cache():
+    """Returns the parsed-file cache configured in the environment, or None."""
+    try:
+        return cache.FrameCache.from_env()
+    except cache.CacheUnavailable:
+        return None
+
 
 class BitwardenCSVManager:
     def __init__(self, root):
@@ -16,11 +60,33 @@ class BitwardenCSVManager:
         self.input_file = None
         self.output_file = None
         self.df = None
+        self.streaming = False
+        self.memory_limit = lite.DEFAULT_MEMORY_LIMIT
+        self.task = None  # Running BackgroundTask, if any
+        self.timings = profiling.Timings()  # Stages of the last operation
+        self.search_index = None
+        self.ideal_columns = lite.load_ideal_columns()  # Read once, reused by every export
+        self.breach_corpus = None  # Local Pwned Passwords file, once chosen
+        
+        # The cache set in the environment is opened once the data modules have loaded
+        self.cache = None
+        self.cache_pending = True
+        self.preloading = None
         
         self.setup_ui()
+        self.root.after_idle(self.start_preload)
         
     def setup_ui(self):
         """Set up the user interface."""
+        # Menu
+        menubar = tk.Menu(self.root)
+        cache_menu = tk.Menu(menubar, tearoff=0)
+        cache_menu.add_command(label="Choose Cache Folder...", command=self.choose_cache_folder)
+        cache_menu.add_command(label="Stop Caching", command=self.disable_cache)
+        cache_menu.add_command(label="Purge Cache", command=self.purge_cache)
+        menubar.add_cascade(label="Cache", menu=cache_menu)
+        self.root.config(menu=menubar)
+        
         # Title
         title_frame = ttk.Frame(self.root)
         title_frame.pack(pady=10, padx=20, fill='x')
@@ -103,6 +169,51 @@ class BitwardenCSVManager:
         )
         self.format_button.pack(side='left', padx=5)
         
+        self.dedup_button = ttk.Button(
+            button_frame,
+            text="🧹 Find Duplicates",
+            command=self.open_dedup_window,
+            state='disabled',
+            width=16
+        )
+        self.dedup_button.pack(side='left', padx=5)
+        
+        self.hygiene_button = ttk.Button(
+            button_frame,
+            text="🔑 Password Report",
+            command=self.check_passwords,
+            state='disabled',
+            width=17
+        )
+        self.hygiene_button.pack(side='left', padx=5)
+        
+        self.breach_button = ttk.Button(
+            button_frame,
+            text="🛡 Breach Check",
+            command=self.check_breaches,
+            state='disabled',
+            width=15
+        )
+        self.breach_button.pack(side='left', padx=5)
+        
+        self.diff_button = ttk.Button(
+            button_frame,
+            text="🔀 Compare Exports",
+            command=self.compare_exports,
+            state='disabled',
+            width=17
+        )
+        self.diff_button.pack(side='left', padx=5)
+        
+        self.cancel_button = ttk.Button(
+            button_frame,
+            text="⏹ Cancel",
+            command=self.cancel_task,
+            state='disabled',
+            width=10
+        )
+        self.cancel_button.pack(side='left', padx=5)
+        
         # Results section
         results_frame = ttk.LabelFrame(self.root, text="📊 Data Preview", padding=10)
         results_frame.pack(pady=10, padx=20, fill='both', expand=True)
@@ -111,22 +222,9 @@ class BitwardenCSVManager:
         self.tree_frame = ttk.Frame(results_frame)
         self.tree_frame.pack(fill='both', expand=True)
         
-        # Scrollbars
-        tree_scroll_v = ttk.Scrollbar(self.tree_frame, orient='vertical')
-        tree_scroll_h = ttk.Scrollbar(self.tree_frame, orient='horizontal')
-        
-        self.tree = ttk.Treeview(
-            self.tree_frame,
-            yscrollcommand=tree_scroll_v.set,
-            xscrollcommand=tree_scroll_h.set
-        )
-        
-        tree_scroll_v.config(command=self.tree.yview)
-        tree_scroll_h.config(command=self.tree.xview)
-        
-        tree_scroll_v.pack(side='right', fill='y')
-        tree_scroll_h.pack(side='bottom', fill='x')
-        self.tree.pack(side='left', fill='both', expand=True)
+        # Only the rows in view are turned into Treeview items
+        self.tree_view = VirtualTreeview(self.tree_frame)
+        self.tree = self.tree_view.tree
         
         # Status bar
         self.status_var = tk.StringVar()
@@ -134,11 +232,35 @@ class BitwardenCSVManager:
         status_bar = ttk.Label(self.root, textvariable=self.status_var, relief='sunken')
         status_bar.pack(side='bottom', fill='x', padx=5, pady=2)
         
+    def start_preload(self):
+        """Start importing the data modules once the window has been drawn."""
+        self.preloading = lazy.preload(*BACKGROUND_MODULES)
+        self.root.after(PRELOAD_POLL_MS, self.finish_preload)
+        
+    def finish_preload(self):
+        """Open the configured cache once the data modules have loaded."""
+        if not self.preloading.done():
+            self.root.after(PRELOAD_POLL_MS, self.finish_preload)
+            return
+            
+        error = self.preloading.exception()
+        if error is not None:
+            self.status_var.set("Failed to load the data modules")
+            messagebox.showerror(
+                "Error",
+                f"Failed to load the data modules:\n{error}\n\nMake sure you have pandas installed: pip install pandas"
+            )
+            return
+            
+        if self.cache_pending:
+            self.cache = open_env_cache()
+            self.cache_pending = False
+            
     def select_input_file(self):
         """Open file dialog to select input CSV file."""
         file_path = filedialog.askopenfilename(
-            title="Select Bitwarden CSV Export",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            title="Select Bitwarden Export",
+            filetypes=EXPORT_FILETYPES + [("All files", "*.*")]
         )
         
         if file_path:
@@ -147,57 +269,169 @@ class BitwardenCSVManager:
             self.load_data()
             
     def load_data(self):
-        """Load the selected CSV file."""
-        try:
-            self.df = pd.read_csv(self.input_file)
+        """Load the selected CSV file in the background."""
+        file_path = self.input_file
+        memory_limit = self.memory_limit
+        frame_cache = self.cache
+        cache_pending = self.cache_pending
+        
+        def work(task):
+            # Large exports are streamed: only a preview is kept in memory and
+            # filtering/formatting re-read the file chunk by chunk.
+            streamed = streaming.needs_streaming(file_path, memory_limit)
+            with task.timings.span('load') as span:
+                if streamed:
+                    df = next(streaming.iter_chunks(file_path, chunksize=STREAMING_PREVIEW_ROWS))
+                else:
+                    # A file picked before start-up finished uses the configured cache too
+                    df = cache.load_with_cache(
+                        file_path, streaming.read_export, open_env_cache() if cache_pending else frame_cache
+                    )
+                span.add_rows(len(df))
+            task.check_cancelled()
+            return streamed, df
+            
+        self.run_task(
+            f"Loading {os.path.basename(file_path)}...",
+            work,
+            self.data_loaded,
+            "Failed to load file"
+        )
+        
+    def data_loaded(self, result):
+        """Show a freshly loaded file."""
+        self.streaming, self.df = result
+        if self.streaming:
+            self.search_index = None
+        else:
+            with self.timings.span('index', rows=len(self.df)):
+                self.search_index = search.SearchIndex(self.df)
+        if self.streaming:
+            self.status_var.set(
+                f"Large file - previewing first {len(self.df)} records from {os.path.basename(self.input_file)}"
+            )
+        else:
             self.status_var.set(f"Loaded {len(self.df)} records from {os.path.basename(self.input_file)}")
+        
+        # Enable buttons
+        self.set_busy(False)
+        
+        # Auto-preview first few rows
+        self.display_data(self.df.head(10))
+        
+    def choose_cache_folder(self):
+        """Pick a private folder for caching parsed files."""
+        directory = filedialog.askdirectory(title="Choose a Private Cache Folder")
+        if not directory:
+            return
             
-            # Enable buttons
-            self.preview_button.config(state='normal')
-            self.filter_button.config(state='normal')
-            self.format_button.config(state='normal')
+        try:
+            self.cache = cache.FrameCache(directory)
+        except cache.CacheUnavailable as e:
+            messagebox.showerror("Cache Unavailable", str(e))
+            return
+        self.cache_pending = False
             
-            # Auto-preview first few rows
-            self.display_data(self.df.head(10))
+        messagebox.showinfo(
+            "Cache Enabled",
+            f"Parsed files will be cached in:\n{self.cache.directory}\n\n"
+            f"The cache contains your passwords. Keep it on an encrypted disk."
+        )
+        
+    def disable_cache(self):
+        """Stop caching parsed files."""
+        self.cache = None
+        self.cache_pending = False
+        self.status_var.set("Caching disabled")
+        
+    def purge_cache(self):
+        """Delete every cached file."""
+        if self.cache is None:
+            messagebox.showinfo("No Cache", "No cache folder is selected.")
+            return
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load file:\n{str(e)}")
-            self.status_var.set("Error loading file")
+        removed = self.cache.purge()
+        self.status_var.set(f"Removed {removed} cached file(s)")
+        
+    def run_task(self, message, work, on_success, error_message, on_finish=None):
+        """Run work(task) on a background thread while the window stays responsive."""
+        if self.task is not None:
+            messagebox.showwarning("Busy", "Please wait for the current operation to finish.")
+            return None
             
-    def display_data(self, df):
-        """Display data in the treeview."""
-        # Clear existing data
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        def on_error(e):
+            messagebox.showerror("Error", f"{error_message}:\n{str(e)}")
+            self.status_var.set(error_message)
             
-        if df.empty:
-            return
+        timings = profiling.Timings()
+        
+        def on_done(result):
+            # Showing the result is timed along with the work
+            self.timings = timings
+            on_success(result)
+            if self.task is None:
+                self.show_timings()
             
-        # Configure columns
-        self.tree['columns'] = list(df.columns)
-        self.tree['show'] = 'headings'
+        self.status_var.set(message)
+        self.set_busy(True)
+        self.task = BackgroundTask(
+            self.root,
+            work,
+            on_done,
+            on_error=on_error,
+            on_status=self.status_var.set,
+            on_cancel=lambda: self.status_var.set("Operation cancelled"),
+            on_finish=lambda: self.task_finished(on_finish),
+            timings=timings
+        ).start()
+        return self.task
         
-        # Configure column headings and widths
-        for col in df.columns:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, width=100, minwidth=50)
+    def task_finished(self, on_finish=None):
+        """Re-enable the window once a background task is done."""
+        self.task = None
+        self.set_busy(False)
+        if on_finish:
+            on_finish()
+        
+    def show_timings(self):
+        """Append the slowest stages of the last operation to the status bar."""
+        if self.timings.spans:
+            self.status_var.set(f"{self.status_var.get()}  ·  ⏱ {self.timings.summary(limit=3)}")
+            
+    def cancel_task(self):
+        """Cancel the running background task."""
+        if self.task is not None:
+            self.task.cancel()
+            self.status_var.set("Cancelling...")
+            
+    def set_busy(self, busy):
+        """Toggle buttons while a background task is running."""
+        data_state = 'normal' if self.df is not None and not busy else 'disabled'
+        self.select_button.config(state='disabled' if busy else 'normal')
+        self.preview_button.config(state=data_state)
+        self.filter_button.config(state=data_state)
+        self.format_button.config(state=data_state)
+        self.dedup_button.config(state=data_state)
+        self.hygiene_button.config(state=data_state)
+        self.breach_button.config(state=data_state)
+        self.diff_button.config(state=data_state)
+        self.cancel_button.config(state='normal' if busy else 'disabled')
             
-        # Insert data
-        for index, row in df.iterrows():
-            # Truncate long values for display
-            display_row = []
-            for value in row:
-                str_val = str(value) if pd.notna(value) else ""
-                if len(str_val) > 50:
-                    str_val = str_val[:47] + "..."
-                display_row.append(str_val)
-            self.tree.insert('', 'end', values=display_row)
+    def display_data(self, df):
+        """Display data in the treeview."""
+        with self.timings.span('display', rows=len(df)):
+            self.tree_view.set_data(df)
             
     def preview_data(self):
         """Show data preview."""
         if self.df is not None:
+            self.timings = profiling.Timings()
             self.display_data(self.df)
-            self.status_var.set(f"Showing all {len(self.df)} records")
+            if self.streaming:
+                self.status_var.set(f"Showing first {len(self.df)} records of a large file")
+            else:
+                self.status_var.set(f"Showing all {len(self.df)} records")
+            self.show_timings()
         else:
             messagebox.showwarning("No Data", "Please select a file first.")
             
@@ -207,7 +441,14 @@ class BitwardenCSVManager:
             messagebox.showwarning("No Data", "Please select a file first.")
             return
             
-        FilterWindow(self.root, self.df, self.apply_filter)
+        FilterWindow(
+            self.root,
+            self.df,
+            self.apply_filter,
+            self.run_task,
+            file_path=self.input_file if self.streaming else None,
+            search_index=self.search_index
+        )
         
     def apply_filter(self, filtered_df):
         """Apply filter results."""
@@ -216,82 +457,506 @@ class BitwardenCSVManager:
         
         # Ask if user wants to save filtered results
         if messagebox.askyesno("Save Filtered Data", "Would you like to save the filtered results?"):
-            self.save_data(filtered_df, "filtered_export.csv")
+            self.save_data(filtered_df, "filtered_export.csv", EXPORT_FILETYPES)
             
-    def format_for_bitwarden(self):
-        """Format the data for perfect Bitwarden compatibility."""
+    def open_dedup_window(self):
+        """Open duplicate detection dialog."""
         if self.df is None:
             messagebox.showwarning("No Data", "Please select a file first.")
             return
             
-        try:
-            # Define ideal Bitwarden column order
-            ideal_columns = [
-                'folder', 'favorite', 'type', 'name', 'notes', 'fields',
-                'reprompt', 'login_uri', 'login_username', 'login_password', 'login_totp'
-            ]
-            
-            # Create formatted dataframe
-            formatted_df = pd.DataFrame()
-            
-            for col in ideal_columns:
-                if col in self.df.columns:
-                    formatted_df[col] = self.df[col]
+        DedupWindow(self.root, self.find_duplicates)
+        
+    def find_duplicates(self, policy):
+        """Find duplicate entries in the background."""
+        output_file = None
+        if self.streaming and policy != 'report':
+            # Large files are written during the second streaming pass
+            output_file = filedialog.asksaveasfilename(
+                title="Save De-duplicated Export",
+                defaultextension=".csv",
+                filetypes=EXPORT_FILETYPES,
+                initialvalue="deduplicated_export.csv"
+            )
+            if not output_file:
+                return
+                
+        df = self.df
+        input_file = self.input_file
+        memory_limit = self.memory_limit
+        streamed = self.streaming
+        
+        def work(task):
+            if policy == 'similar':
+                if streamed:
+                    # Only the compared columns are read from large files
+                    columns = [col for col in near_dedup.KEY_COLUMNS if col in df.columns]
+                    chunks = streaming.iter_chunks(
+                        input_file, memory_limit=memory_limit, progress=task.progress, workers=None, usecols=columns
+                    )
+                    df_to_check = streaming.collect_chunks(task.timings.chunks('parse', chunks), columns=columns)
                 else:
-                    formatted_df[col] = ""  # Add missing columns as empty
+                    df_to_check = df
+                task.report("Comparing similar entries...")
+                with task.timings.span('similar', rows=len(df_to_check)):
+                    return None, near_dedup.find_near_duplicates(df_to_check)
+            if streamed:
+                with task.timings.span('dedup') as span:
+                    rows, report = dedup.dedup_file(
+                        input_file, output_file, policy, memory_limit=memory_limit, progress=task.progress, workers=None
+                    )
+                    span.add_rows(rows)
+                return None, report
+            with task.timings.span('dedup', rows=len(df)):
+                return dedup.drop_duplicates(df, policy)
+            
+        def done(result):
+            deduped_df, report = result
+            group_column = near_dedup.NEAR_GROUP_COLUMN if policy == 'similar' else dedup.GROUP_COLUMN
+            groups = report[group_column].nunique() if len(report) else 0
+            self.display_data(report)
+            if policy == 'similar':
+                self.status_var.set(f"Found {len(report)} similar records in {groups} clusters - review them below")
+            else:
+                self.status_var.set(f"Found {len(report)} duplicate records in {groups} groups")
+            
+            if report.empty:
+                messagebox.showinfo("No Duplicates", "No duplicate records were found.")
+            elif output_file:
+                messagebox.showinfo("Success", f"De-duplicated data saved to {os.path.basename(output_file)}")
+            elif deduped_df is not None and policy != 'report':
+                if messagebox.askyesno(
+                    "Save De-duplicated Data",
+                    f"{len(report) - groups} duplicate records can be removed.\n\n"
+                    f"Would you like to save the de-duplicated data?"
+                ):
+                    self.save_data(deduped_df, "deduplicated_export.csv", EXPORT_FILETYPES)
+                    
+        self.run_task("Looking for duplicates...", work, done, "Failed to find duplicates")
+        
+    def check_passwords(self):
+        """Find reused and weak passwords in the background."""
+        if self.df is None:
+            messagebox.showwarning("No Data", "Please select a file first.")
+            return
+            
+        df = self.df
+        input_file = self.input_file
+        memory_limit = self.memory_limit
+        streamed = self.streaming
+        
+        def work(task):
+            if streamed:
+                with task.timings.span('hygiene'):
+                    return hygiene.password_report_file(input_file, memory_limit=memory_limit, progress=task.progress)
+            with task.timings.span('hygiene', rows=len(df)):
+                return hygiene.password_report(df)
+            
+        def done(report):
+            if report.empty:
+                messagebox.showinfo("No Passwords", "No records have a password.")
+                return
+                
+            summary = hygiene.hygiene_summary(report)
+            weak = summary['strength']['very weak'] + summary['strength']['weak']
+            self.display_data(report)
+            self.status_var.set(
+                f"{summary['passwords']} passwords: {summary['reused_passwords']} reused, "
+                f"{weak} weak - click a column heading to sort"
+            )
+            
+            if messagebox.askyesno(
+                "Password Report",
+                "\n".join(hygiene.describe_summary(summary)) + "\n\nWould you like to save the report?"
+            ):
+                output_file = filedialog.asksaveasfilename(
+                    title="Save Password Report",
+                    defaultextension=".csv",
+                    filetypes=[("CSV files", "*.csv"), ("JSON files", "*.json")],
+                    initialvalue="password_report.csv"
+                )
+                if output_file:
+                    self.run_task(
+                        "Saving report...",
+                        lambda task: save_report(task, report, output_file),
+                        lambda result: self.status_var.set(f"Saved password report: {os.path.basename(output_file)}"),
+                        "Failed to save report"
+                    )
                     
-            # Clean up the data
-            formatted_df = formatted_df.fillna("")  # Replace NaN with empty strings
+        self.run_task("Checking passwords...", work, done, "Failed to check passwords")
+        
+    def check_breaches(self):
+        """Flag entries whose password appears in a local breach corpus."""
+        if self.df is None:
+            messagebox.showwarning("No Data", "Please select a file first.")
+            return
+            
+        known_corpus = self.breach_corpus or os.environ.get(breach.CORPUS_ENV)
+        corpus_path = filedialog.askopenfilename(
+            title="Select a Breach Corpus (Pwned Passwords SHA-1, ordered by hash)",
+            initialdir=os.path.dirname(known_corpus) if known_corpus else None,
+            initialfile=os.path.basename(known_corpus) if known_corpus else None,
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if not corpus_path:
+            return
+        self.breach_corpus = corpus_path
+        
+        df = self.df
+        input_file = self.input_file
+        memory_limit = self.memory_limit
+        streamed = self.streaming
+        
+        def work(task):
+            if streamed:
+                with task.timings.span('breach'):
+                    return breach.breached_entries_file(
+                        input_file, corpus_path, memory_limit=memory_limit, progress=task.progress
+                    )
+            checked = int(df[breach.PASSWORD_COLUMN].notna().sum()) if breach.PASSWORD_COLUMN in df.columns else 0
+            with task.timings.span('breach', rows=len(df)):
+                return breach.breached_entries(df, corpus_path), checked
+            
+        def done(result):
+            flagged, checked = result
+            if flagged.empty:
+                self.status_var.set(f"None of {checked} passwords were found in the breach corpus")
+                messagebox.showinfo("No Breaches", "No passwords were found in the breach corpus.")
+                return
+                
+            self.display_data(flagged)
+            self.status_var.set(
+                f"{len(flagged)} of {checked} entries use a breached password - change these first"
+            )
+            if messagebox.askyesno(
+                "Breached Passwords",
+                f"{len(flagged)} entries use a password found in the breach corpus.\n\n"
+                f"Would you like to save the list (no passwords included)?"
+            ):
+                self.save_data(flagged, "breached_entries.csv")
+                
+        self.run_task("Checking passwords against the breach corpus...", work, done, "Failed to check breaches")
+        
+    def compare_exports(self):
+        """Show what changed between an earlier export and the loaded one."""
+        if self.df is None:
+            messagebox.showwarning("No Data", "Please select a file first.")
+            return
+            
+        old_file = filedialog.askopenfilename(
+            title="Select an Earlier Export to Compare With",
+            filetypes=EXPORT_FILETYPES + [("All files", "*.*")]
+        )
+        if not old_file:
+            return
             
-            # Show preview
-            self.display_data(formatted_df.head(10))
-            self.status_var.set(f"Formatted {len(formatted_df)} records for Bitwarden import")
+        new_file = self.input_file
+        memory_limit = self.memory_limit
+        counts = diff.empty_counts()
+        
+        def work(task):
+            # Both files are streamed; only the first DIFF_VIEW_ROWS changes are kept
+            kept = []
+            rows = 0
+            changes = diff.diff_chunks(old_file, new_file, counts, memory_limit, progress=task.progress)
+            for chunk in task.timings.chunks('diff', changes):
+                task.check_cancelled()
+                if rows < DIFF_VIEW_ROWS:
+                    kept.append(chunk.head(DIFF_VIEW_ROWS - rows))
+                rows += len(chunk)
+            return streaming.collect_chunks(kept, columns=diff.REPORT_COLUMNS), rows
             
-            # Save formatted data
+        def done(result):
+            report, rows = result
+            if rows == 0:
+                self.status_var.set(f"No changes since {os.path.basename(old_file)}")
+                messagebox.showinfo("No Changes", "Both exports contain the same entries.")
+                return
+                
+            self.display_data(report)
+            self.status_var.set(
+                f"Since {os.path.basename(old_file)}: {counts['added']} added, {counts['removed']} removed, "
+                f"{counts['modified']} modified"
+                + (f" - showing the first {len(report)} changes" if rows > len(report) else "")
+            )
+            if not messagebox.askyesno(
+                "Compare Exports",
+                "\n".join(diff.describe_counts(counts)) +
+                "\n\nWould you like to save the list of changes (no passwords included)?"
+            ):
+                return
+            if rows == len(report):
+                self.save_data(report, "vault_changes.csv")
+                return
+                
+            # Not every change is in memory, so the full list is written by a second run
             output_file = filedialog.asksaveasfilename(
-                title="Save Formatted CSV",
+                title="Save Changes",
                 defaultextension=".csv",
                 filetypes=[("CSV files", "*.csv")],
-                initialvalue="bitwarden_formatted_export.csv"
+                initialvalue="vault_changes.csv"
             )
-            
             if output_file:
-                formatted_df.to_csv(output_file, index=False)
-                messagebox.showinfo(
-                    "Success",
-                    f"Formatted CSV saved successfully!\n\n"
-                    f"File: {os.path.basename(output_file)}\n"
-                    f"Records: {len(formatted_df)}\n\n"
-                    f"This file is ready for import into Bitwarden."
+                self.run_task(
+                    "Saving changes...",
+                    lambda task: diff.diff_files(old_file, new_file, output_file, memory_limit, progress=task.progress),
+                    lambda saved: messagebox.showinfo("Success", f"Changes saved to {os.path.basename(output_file)}"),
+                    "Failed to save changes"
                 )
-                self.status_var.set(f"Saved formatted export: {os.path.basename(output_file)}")
                 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to format data:\n{str(e)}")
+        self.run_task("Comparing exports...", work, done, "Failed to compare exports")
+        
+    def format_for_bitwarden(self):
+        """Format the data for perfect Bitwarden compatibility."""
+        if self.df is None:
+            messagebox.showwarning("No Data", "Please select a file first.")
+            return
             
-    def save_data(self, df, default_name):
-        """Save dataframe to CSV file."""
+        clean = messagebox.askyesno(
+            "Clean Data",
+            "Clean export artifacts while formatting?\n\n"
+            "This decodes _xHHHH_ escapes, trims whitespace, repairs login URIs "
+            "and normalizes type, favorite and reprompt values."
+        )
+        
+        # Other password managers' exports are mapped to Bitwarden's columns first
+        source = importers.detect_format(self.input_file)
+        
+        # Show preview
+        preview = self.df.head(10)
+        if source in importers.IMPORTERS:
+            preview = importers.IMPORTERS[source](preview)
+        if clean:
+            preview, _ = cleaning.clean_frame(preview)
+        self.display_data(schema.format_frame(preview, self.ideal_columns))
+        
+        # Save formatted data
+        output_file = filedialog.asksaveasfilename(
+            title="Save Formatted Export",
+            defaultextension=".csv",
+            filetypes=EXPORT_FILETYPES,
+            initialvalue="bitwarden_formatted_export.csv"
+        )
+        
+        if not output_file:
+            return
+            
+        df = self.df
+        input_file = self.input_file
+        memory_limit = self.memory_limit
+        streamed = self.streaming
+        ideal_columns = self.ideal_columns
+        counts = Counter()
+        
+        def work(task):
+            # Rows are cleaned, reordered and written one chunk at a time
+            if streamed:
+                chunks = task.timings.chunks(
+                    'parse', streaming.iter_chunks(input_file, memory_limit=memory_limit, progress=task.progress, workers=None)
+                )
+            else:
+                chunks = streaming.split_frame(df, progress=task.progress)
+            if source in importers.IMPORTERS:
+                chunks = task.timings.chunks('import', importers.import_chunks(chunks, source))
+            if clean:
+                chunks = task.timings.chunks('clean', cleaning.clean_chunks(chunks, counts=counts))
+            chunks = task.timings.chunks('format', streaming.format_chunks(chunks, ideal_columns))
+            return write_chunks(chunks, output_file, task.timings)
+            
+        def done(records):
+            cleaned = ""
+            if source in importers.IMPORTERS:
+                cleaned = f"Converted from a {importers.SOURCE_LABELS[source]} export.\n\n"
+            if clean:
+                cleaned += "Cleaning:\n" + "\n".join(cleaning.describe_counts(counts)) + "\n\n"
+            messagebox.showinfo(
+                "Success",
+                f"Formatted export saved successfully!\n\n"
+                f"File: {os.path.basename(output_file)}\n"
+                f"Records: {records}\n\n"
+                f"{cleaned}"
+                f"This file is ready for import into Bitwarden."
+            )
+            self.status_var.set(f"Formatted {records} records: {os.path.basename(output_file)}")
+            
+        self.run_task("Saving formatted export...", work, done, "Failed to format data")
+            
+    def save_data(self, df, default_name, filetypes=(("CSV files", "*.csv"),)):
+        """Save dataframe to CSV file, or Bitwarden JSON when offered and chosen."""
         output_file = filedialog.asksaveasfilename(
             title="Save CSV",
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv")],
+            filetypes=list(filetypes),
             initialvalue=default_name
         )
         
         if output_file:
-            df.to_csv(output_file, index=False)
-            messagebox.showinfo("Success", f"Data saved to {os.path.basename(output_file)}")
+            self.run_task(
+                "Saving...",
+                lambda task: write_chunks(streaming.split_frame(df, progress=task.progress), output_file, task.timings),
+                lambda records: messagebox.showinfo("Success", f"Data saved to {os.path.basename(output_file)}"),
+                "Failed to save data"
+            )
+
+
+def write_chunks(chunks, output_file, timings=None):
+    """Export chunks as a timed stage; a cancelled export leaves no partial file."""
+    if timings is None:
+        return streaming.export_chunks(chunks, output_file)
+    with timings.span('write') as span:
+        records = streaming.export_chunks(chunks, output_file)
+        span.add_rows(records)
+    return records
+
+
+class VirtualTreeview:
+    """Treeview that only creates items for the rows currently in view."""
+
+    # Extra items kept beyond the visible rows so resizing does not show gaps
+    BUFFER_ROWS = 10
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, parent):
+        self.df = None
+        self.start = 0
+        self.items = []
+        self.sort_column = None
+        self.sort_ascending = True
+        
+        # Scrollbars
+        self.scroll_v = ttk.Scrollbar(parent, orient='vertical', command=self.yview)
+        self.scroll_h = ttk.Scrollbar(parent, orient='horizontal')
+        
+        # The vertical scrollbar tracks the position in the dataframe, not in the widget
+        self.tree = ttk.Treeview(parent, xscrollcommand=self.scroll_h.set)
+        self.scroll_h.config(command=self.tree.xview)
+        
+        self.scroll_v.pack(side='right', fill='y')
+        self.scroll_h.pack(side='bottom', fill='x')
+        self.tree.pack(side='left', fill='both', expand=True)
+        
+        self.tree.bind('<Configure>', lambda event: self.render())
+        self.tree.bind('<MouseWheel>', self.on_mousewheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll(3))
+        self.tree.bind('<Prior>', lambda event: self.scroll(-self.visible_rows()))
+        self.tree.bind('<Next>', lambda event: self.scroll(self.visible_rows()))
+        
+    def set_data(self, df):
+        """Show a dataframe, creating items lazily as the user scrolls."""
+        # Clear existing data
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+        self.items = []
+        self.start = 0
+        self.df = None
+        self.sort_column = None
+        self.scroll_v.set(0, 1)
+        
+        if df.empty:
+            return
+            
+        self.df = df
+        
+        # Configure columns
+        self.tree['columns'] = list(df.columns)
+        self.tree['show'] = 'headings'
+        
+        # Configure column headings and widths; clicking a heading sorts by it
+        for col in df.columns:
+            self.tree.heading(col, text=col, command=lambda col=col: self.sort_by(col))
+            self.tree.column(col, width=100, minwidth=50)
+            
+        self.render()
+        
+    def sort_by(self, column):
+        """Sort the rows by a column, reversing the order on a second click."""
+        if self.df is None:
+            return
+        if self.sort_column == column:
+            self.sort_ascending = not self.sort_ascending
+        else:
+            self.sort_ascending = True
+            
+        self.df = self.df.sort_values(column, ascending=self.sort_ascending, kind='stable', na_position='last')
+        
+        # Mark the sorted column
+        if self.sort_column is not None:
+            self.tree.heading(self.sort_column, text=self.sort_column)
+        self.sort_column = column
+        self.tree.heading(column, text=f"{column} {'▲' if self.sort_ascending else '▼'}")
+        
+        self.start = 0
+        self.render()
+        
+    def visible_rows(self):
+        """Number of rows that fit in the widget."""
+        row_height = ttk.Style().lookup('Treeview', 'rowheight')
+        row_height = int(row_height) if row_height else self.DEFAULT_ROW_HEIGHT
+        return max(1, self.tree.winfo_height() // row_height)
+        
+    def yview(self, *args):
+        """Scrollbar command: move the window over the dataframe."""
+        if self.df is None:
+            return
+        if args[0] == 'moveto':
+            self.start = int(float(args[1]) * len(self.df))
+            self.render()
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= self.visible_rows()
+            self.scroll(amount)
+            
+    def scroll(self, amount):
+        """Scroll by a number of rows."""
+        if self.df is not None:
+            self.start += amount
+            self.render()
+        return 'break'
+        
+    def on_mousewheel(self, event):
+        """Scroll on Windows/macOS wheel events."""
+        # Windows reports multiples of 120, macOS reports small deltas
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-3 * step)
+        
+    def render(self):
+        """Fill the item pool with the rows of the current window."""
+        if self.df is None:
+            return
+            
+        visible = self.visible_rows()
+        total = len(self.df)
+        self.start = max(0, min(self.start, total - visible))
+        window = self.df.iloc[self.start:self.start + visible + self.BUFFER_ROWS]
+        
+        # Reuse existing items so widget memory stays constant
+        while len(self.items) < len(window):
+            self.items.append(self.tree.insert('', 'end'))
+        while len(self.items) > len(window):
+            self.tree.delete(self.items.pop())
+            
+        for item, row in zip(self.items, format_for_display(window)):
+            self.tree.item(item, values=row)
+            
+        self.tree.yview_moveto(0)
+        self.scroll_v.set(self.start / total, min(1.0, (self.start + visible) / total))
 
 
 class FilterWindow:
-    def __init__(self, parent, df, callback):
+    def __init__(self, parent, df, callback, run_task, file_path=None, search_index=None):
         self.df = df
+        self.search_index = search_index
         self.callback = callback
+        self.run_task = run_task
+        self.file_path = file_path  # Set when the source file is streamed
+        self.task = None
         
         # Create window
         self.window = tk.Toplevel(parent)
         self.window.title("Filter Data")
-        self.window.geometry("400x300")
+        self.window.geometry("420x460")
         self.window.grab_set()  # Make modal
         
         self.setup_filter_ui()
@@ -327,53 +992,181 @@ class FilterWindow:
         case_check = ttk.Checkbutton(options_frame, text="Case sensitive", variable=self.case_sensitive_var)
         case_check.pack(anchor='w')
         
+        self.mode_var = tk.StringVar(value=search.DEFAULT_SEARCH_MODE)
+        literal_radio = ttk.Radiobutton(options_frame, text="Plain text", variable=self.mode_var, value='literal')
+        literal_radio.pack(anchor='w')
+        regex_radio = ttk.Radiobutton(options_frame, text="Regular expression", variable=self.mode_var, value='regex')
+        regex_radio.pack(anchor='w')
+        
+        # Multi-column query, used instead of the column search when given
+        query_frame = ttk.LabelFrame(self.window, text="Or Query (e.g. type=login AND login_uri~bank)", padding=10)
+        query_frame.pack(pady=10, padx=20, fill='x')
+        
+        self.query_var = tk.StringVar()
+        self.query_entry = ttk.Entry(query_frame, textvariable=self.query_var)
+        self.query_entry.pack(fill='x')
+        
         # Buttons
         button_frame = ttk.Frame(self.window)
         button_frame.pack(pady=20)
         
-        filter_button = ttk.Button(button_frame, text="Apply Filter", command=self.apply_filter)
-        filter_button.pack(side='left', padx=5)
+        self.filter_button = ttk.Button(button_frame, text="Apply Filter", command=self.apply_filter)
+        self.filter_button.pack(side='left', padx=5)
         
-        cancel_button = ttk.Button(button_frame, text="Cancel", command=self.window.destroy)
+        cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel)
         cancel_button.pack(side='left', padx=5)
         
     def apply_filter(self):
-        """Apply the filter and return results."""
+        """Apply the filter in the background and return results."""
         column = self.column_var.get()
         search_value = self.search_var.get()
+        query_text = self.query_var.get().strip()
+        case_sensitive = self.case_sensitive_var.get()
         
-        if not column or not search_value:
-            messagebox.showwarning("Missing Information", "Please select a column and enter a search value.")
+        if not query_text and (not column or not search_value):
+            messagebox.showwarning(
+                "Missing Information",
+                "Please select a column and enter a search value, or enter a query."
+            )
             return
             
         try:
-            # Apply filter
-            case_sensitive = self.case_sensitive_var.get()
-            filtered_df = self.df[
-                self.df[column].astype(str).str.contains(
-                    search_value, 
-                    case=case_sensitive, 
-                    na=False
-                )
-            ]
+            if query_text:
+                row_query = query.parse_query(query_text, columns=self.df.columns, case=case_sensitive)
+            else:
+                row_query = query.column_query(column, search_value, mode=self.mode_var.get(), case=case_sensitive)
+        except query.QueryError as e:
+            messagebox.showerror("Invalid Filter", str(e))
+            return
             
-            if filtered_df.empty:
-                messagebox.showinfo("No Results", "No records match your filter criteria.")
-                return
-                
-            # Return results
-            self.callback(filtered_df)
-            self.window.destroy()
+        df = self.df
+        file_path = self.file_path
+        search_index = self.search_index
+        
+        def work(task):
+            if file_path:
+                chunks = task.timings.chunks('parse', streaming.iter_chunks(file_path, progress=task.progress, workers=None))
+                chunks = task.timings.chunks('filter', streaming.query_chunks(chunks, row_query))
+                return streaming.collect_chunks(chunks, columns=df.columns)
+            with task.timings.span('filter', rows=len(df)):
+                return row_query.filter(df, index=search_index)
+            
+        self.task = self.run_task(
+            "Filtering records...",
+            work,
+            self.show_results,
+            "Failed to apply filter",
+            on_finish=self.filter_finished
+        )
+        if self.task is not None:
+            self.filter_button.config(state='disabled')
             
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to apply filter:\n{str(e)}")
+    def filter_finished(self):
+        """Re-enable the dialog after a filter run."""
+        self.task = None
+        if self.window.winfo_exists():
+            self.filter_button.config(state='normal')
+            
+    def show_results(self, filtered_df):
+        """Hand filter results to the main window."""
+        if not self.window.winfo_exists():
+            return
+            
+        if filtered_df.empty:
+            messagebox.showinfo("No Results", "No records match your filter criteria.")
+            return
+            
+        # Return results
+        self.window.destroy()
+        self.callback(filtered_df)
+        
+    def cancel(self):
+        """Close the dialog, cancelling a running filter."""
+        if self.task is not None:
+            self.task.cancel()
+        self.window.destroy()
+
+
+class DedupWindow:
+    def __init__(self, parent, callback):
+        self.callback = callback
+        
+        # Create window
+        self.window = tk.Toplevel(parent)
+        self.window.title("Find Duplicates")
+        self.window.geometry("400x290")
+        self.window.grab_set()  # Make modal
+        
+        self.setup_dedup_ui()
+        
+    def setup_dedup_ui(self):
+        """Set up duplicate detection dialog UI."""
+        # Title
+        title_label = ttk.Label(self.window, text="🧹 Find Duplicates", font=("Helvetica", 14, "bold"))
+        title_label.pack(pady=10)
+        
+        info_label = ttk.Label(
+            self.window,
+            text="Entries with the same name, URI, username and password\n"
+                 "(ignoring http/https, www. and trailing slashes)",
+            justify='center'
+        )
+        info_label.pack()
+        
+        # Policy
+        policy_frame = ttk.LabelFrame(self.window, text="Duplicates", padding=10)
+        policy_frame.pack(pady=10, padx=20, fill='x')
+        
+        self.policy_var = tk.StringVar(value='report')
+        for text, value in (
+            ("Report only", 'report'),
+            ("Keep the first entry of each group", 'keep_first'),
+            ("Keep the newest entry of each group", 'keep_newest'),
+            ("Find similar entries (possible typos) for review", 'similar'),
+        ):
+            ttk.Radiobutton(policy_frame, text=text, variable=self.policy_var, value=value).pack(anchor='w')
+        
+        # Buttons
+        button_frame = ttk.Frame(self.window)
+        button_frame.pack(pady=10)
+        
+        run_button = ttk.Button(button_frame, text="Find Duplicates", command=self.run)
+        run_button.pack(side='left', padx=5)
+        
+        cancel_button = ttk.Button(button_frame, text="Cancel", command=self.window.destroy)
+        cancel_button.pack(side='left', padx=5)
+        
+    def run(self):
+        """Close the dialog and start the search."""
+        policy = self.policy_var.get()
+        self.window.destroy()
+        self.callback(policy)
+
+
+def save_report(task, report, output_file):
+    """Save a password report as a timed stage of task."""
+    with task.timings.span('write', rows=len(report)):
+        hygiene.save_report(report, output_file)
 
 
-def main():
-    """Main function to run the GUI application."""
-    root = tk.Tk()
-    app = BitwardenCSVManager(root)
-    root.mainloop()
+def main(argv=None):
+    """
+    Main function to run the GUI application.
+    
+    "--profile FILE" writes a cProfile file covering the window and every
+    background task once the window is closed.
+    """
+    profile_path, _ = profiling.pop_profile_option(sys.argv[1:] if argv is None else argv)
+    if profile_path:
+        profiling.start_profiling(profile_path)
+    try:
+        with profiling.profile_thread():
+            root = tk.Tk()
+            app = BitwardenCSVManager(root)
+            root.mainloop()
+    finally:
+        if profiling.stop_profiling():
+            print(f"Profile written to {profile_path} (view it with: python -m pstats {profile_path})")
 
 
 if __name__ == "__main__":
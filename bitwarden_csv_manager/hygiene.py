@@ -0,0 +1,186 @@
+"""
+Password hygiene report: reused and weak passwords.
+
+Each distinct login_password is hashed with BLAKE2b under a random key that
+only lives for one report, and reuse is found by grouping the hashes, so
+the report never contains or keeps a plaintext password and its hashes
+cannot be matched against other reports. Strength is estimated from the
+length and the character classes used:
+
+    entropy_bits = length * log2(size of the character pool)
+
+which is an upper bound: dictionary words and patterns are weaker than
+their pool suggests. Distinct passwords are scored in batches spread over
+a process pool; large files are read chunk by chunk, only the columns the
+report needs.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from bitwarden_csv_manager.lite import atomic_output
+from bitwarden_csv_manager.parallel import map_batches
+from bitwarden_csv_manager.schema import ENTRY_COLUMNS, PASSWORD_COLUMN
+from bitwarden_csv_manager.search import column_values
+from bitwarden_csv_manager.streaming import DEFAULT_MEMORY_LIMIT, iter_chunks, read_header
+
+# Character classes and the number of characters each adds to the pool
+CHARACTER_CLASSES = {
+    'lowercase': ('[a-z]', 26),
+    'uppercase': ('[A-Z]', 26),
+    'digits': ('[0-9]', 10),
+    'symbols': ('[^A-Za-z0-9]', 33),
+}
+
+# Entropy thresholds in bits between consecutive strength labels
+STRENGTH_LABELS = ('very weak', 'weak', 'fair', 'strong', 'very strong')
+STRENGTH_BITS = (28, 36, 60, 128)
+
+REPORT_COLUMNS = (
+    ['length'] + list(CHARACTER_CLASSES) + ['entropy_bits', 'strength', 'reuse_count', 'reuse_group']
+)
+
+HASH_KEY_BYTES = 32
+
+BATCH_PASSWORDS = 10000
+
+
+def hash_passwords(passwords, key):
+    """Returns a keyed 64-bit BLAKE2b hash of each password."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(p.encode('utf-8'), key=key, digest_size=8).digest(), 'little')
+         for p in passwords),
+        dtype=np.uint64,
+        count=len(passwords)
+    )
+
+
+def _score_batch(passwords, key):
+    """Returns the hash, length and character classes of a batch of passwords."""
+    values = pd.Series(passwords, dtype=object)
+    scores = {'hash': hash_passwords(passwords, key), 'length': values.str.len().to_numpy()}
+    for name, (pattern, _) in CHARACTER_CLASSES.items():
+        scores[name] = values.str.contains(pattern, regex=True).to_numpy()
+    return scores
+
+
+def score_passwords(passwords, key, workers=None):
+    """Scores a list of distinct passwords, in parallel when there are many."""
+    batches = [passwords[i:i + BATCH_PASSWORDS] for i in range(0, len(passwords), BATCH_PASSWORDS)]
+    results = map_batches(_score_batch, batches, key, workers=workers, items=len(passwords))
+    if not results:
+        return _score_batch([], key)
+    return {name: np.concatenate([result[name] for result in results]) for name in results[0]}
+
+
+def entropy_bits(scores):
+    """Returns the character-pool entropy estimate of scored passwords."""
+    pool = sum(scores[name] * size for name, (_, size) in CHARACTER_CLASSES.items())
+    with np.errstate(divide='ignore'):
+        bits = scores['length'] * np.log2(np.maximum(pool, 1))
+    return np.round(bits, 1)
+
+
+def strength_labels(bits):
+    """Returns the strength label for each entropy estimate."""
+    return pd.Categorical.from_codes(np.searchsorted(STRENGTH_BITS, bits, side='right'), STRENGTH_LABELS, ordered=True)
+
+
+def _score_frame(df, key, workers=None):
+    """Returns the entry columns and scores of the rows of df that have a password."""
+    passwords = column_values(df[PASSWORD_COLUMN]) if PASSWORD_COLUMN in df.columns else pd.Series([], dtype=object)
+    present = (passwords != "").to_numpy()
+    codes, uniques = pd.factorize(passwords[present])
+    scores = score_passwords(list(uniques), key, workers)
+
+    part = df.loc[present, [col for col in ENTRY_COLUMNS if col in df.columns]].copy()
+    for name in ['length'] + list(CHARACTER_CLASSES):
+        part[name] = scores[name][codes]
+    part['entropy_bits'] = entropy_bits(scores)[codes]
+    part['_hash'] = scores['hash'][codes]
+    return part
+
+
+def _finish_report(parts, columns):
+    """Adds reuse counts and strength to scored parts and drops the hashes."""
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return pd.DataFrame(columns=[col for col in ENTRY_COLUMNS if col in columns] + REPORT_COLUMNS)
+    report = pd.concat(parts, ignore_index=True)
+    report['strength'] = strength_labels(report['entropy_bits'].to_numpy())
+    report['reuse_count'] = report['_hash'].map(report['_hash'].value_counts()).to_numpy()
+    # Worst first: most reused, then weakest
+    report = report.sort_values(['reuse_count', 'entropy_bits'], ascending=[False, True], kind='stable')
+
+    hashes = report.pop('_hash')
+    reused = (report['reuse_count'] > 1).to_numpy()
+    groups = np.zeros(len(report), dtype=np.int64)
+    groups[reused] = pd.factorize(hashes[reused])[0] + 1
+    report['reuse_group'] = groups
+    return report.reset_index(drop=True)
+
+
+def password_report(df, workers=None):
+    """
+    Returns one row per entry with a password, with strength and reuse columns.
+
+    reuse_count is how many entries share the password and reuse_group
+    numbers each reused password (0 when unique). workers sets the process
+    pool size (default: all cores); 1 disables it.
+    """
+    key = os.urandom(HASH_KEY_BYTES)
+    return _finish_report([_score_frame(df, key, workers)], df.columns)
+
+
+def password_report_file(file_path, memory_limit=DEFAULT_MEMORY_LIMIT, workers=None, progress=None):
+    """Builds the password report of a CSV file chunk by chunk, reading only the needed columns."""
+    columns = read_header(file_path).columns
+    usecols = [col for col in ENTRY_COLUMNS + [PASSWORD_COLUMN] if col in columns]
+    key = os.urandom(HASH_KEY_BYTES)
+    parts = [
+        _score_frame(chunk, key, workers)
+        for chunk in iter_chunks(file_path, memory_limit=memory_limit, progress=progress, workers=workers, usecols=usecols)
+    ]
+    return _finish_report(parts, columns)
+
+
+def hygiene_summary(report):
+    """Returns totals for a password report."""
+    reused = report['reuse_count'] > 1
+    groups = int(report['reuse_group'].max()) if len(report) else 0
+    return {
+        'passwords': len(report),
+        'unique_passwords': int((~reused).sum()) + groups,
+        'reused_passwords': groups,
+        'entries_with_reused_password': int(reused.sum()),
+        'strength': {label: int((report['strength'] == label).sum()) for label in STRENGTH_LABELS},
+        'median_length': float(report['length'].median()) if len(report) else 0.0,
+    }
+
+
+def describe_summary(summary):
+    """Returns the summary as human-readable lines."""
+    lines = [
+        f"{summary['passwords']} passwords, {summary['unique_passwords']} distinct",
+        f"{summary['reused_passwords']} passwords are reused across "
+        f"{summary['entries_with_reused_password']} entries",
+    ]
+    lines.extend(f"{label}: {count}" for label, count in summary['strength'].items())
+    return lines
+
+
+def save_report(report, file_path):
+    """Writes a report as JSON (with its summary) if file_path ends in .json, else as CSV."""
+    with atomic_output(file_path) as tmp_path:
+        if file_path.lower().endswith('.json'):
+            with open(tmp_path, 'w', encoding='utf-8') as handle:
+                json.dump({
+                    'summary': hygiene_summary(report),
+                    'entries': json.loads(report.to_json(orient='records')),
+                }, handle, indent=2)
+        else:
+            report.to_csv(tmp_path, index=False)
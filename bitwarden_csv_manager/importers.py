@@ -0,0 +1,207 @@
+"""
+Importers for CSV exports of other password managers.
+
+    chrome     Chrome, Edge, Brave and other Chromium browsers
+               (name, url, username, password[, note])
+    firefox    Firefox (url, username, password, httpRealm,
+               formActionOrigin, guid, ...)
+    lastpass   LastPass (url, username, password, totp, extra, name,
+               grouping, fav)
+    1password  1Password 8 (Title, Url, Username, Password, OTPAuth,
+               Favorite, Archived, Tags, Notes)
+
+detect_format identifies an export from its header, matched without
+regard to case, and checks the guess against the first SAMPLE_ROWS rows,
+so the file is never read in full. Each importer maps a chunk onto the
+Bitwarden columns with whole-column string operations; import_chunks
+applies one to a stream of chunks, ahead of cleaning and formatting.
+"""
+
+import numpy as np
+import pandas as pd
+
+from bitwarden_csv_manager.json_format import is_json_path
+from bitwarden_csv_manager.lite import BITWARDEN_COLUMNS
+from bitwarden_csv_manager.schema import compact_frame
+from bitwarden_csv_manager.search import column_values
+from bitwarden_csv_manager.streaming import iter_chunks, read_header
+
+SAMPLE_ROWS = 100
+
+# Header columns, lower case, that identify each source format
+SOURCE_COLUMNS = {
+    'chrome': {'name', 'url', 'username', 'password'},
+    'firefox': {'url', 'username', 'password', 'httprealm', 'formactionorigin', 'guid'},
+    'lastpass': {'url', 'username', 'password', 'extra', 'name', 'grouping', 'fav'},
+    '1password': {'title', 'username', 'password'},
+}
+SOURCE_LABELS = {
+    'bitwarden': 'Bitwarden',
+    'chrome': 'Chrome',
+    'firefox': 'Firefox',
+    'lastpass': 'LastPass',
+    '1password': '1Password',
+}
+
+# Host of a URL without scheme, credentials, "www." or port, for entries without a name
+HOST_RE = r'^(?:[A-Za-z][A-Za-z0-9+.-]*://)?(?:[^@/]*@)?(?:www\.)?([^/:?#]+)'
+# LastPass stores secure notes as entries with this URL
+LASTPASS_NOTE_URL = 'http://sn'
+FIREFOX_GUID_RE = r'^\{[0-9A-Fa-f-]{36}\}$'
+FLAG_TRUE = ('1', 'true', 'yes')
+
+
+def _columns(df):
+    """Maps lower-case column names to the frame's own names."""
+    return {str(col).lstrip('\ufeff').strip().lower(): col for col in df.columns}
+
+
+def _text(df, *names, strip=True):
+    """Returns the first present column of names as strings, blank when none is present."""
+    columns = _columns(df)
+    for name in names:
+        if name in columns:
+            values = column_values(df[columns[name]])
+            return values.str.strip() if strip else values
+    return pd.Series("", index=df.index, dtype=object)
+
+
+def _host(urls):
+    """Returns the host of each URL, blank where there is none."""
+    return urls.str.extract(HOST_RE, expand=False).fillna("")
+
+
+def _flag(values):
+    """Maps truthy values to '1' and everything else to blank."""
+    return np.where(values.str.lower().isin(FLAG_TRUE), '1', '')
+
+
+def _frame(columns, index):
+    """Builds a compact Bitwarden frame from text columns, blank values missing."""
+    df = pd.DataFrame(columns, index=index)
+    return compact_frame(df.mask(df == ""))
+
+
+def map_chrome(df):
+    """Maps a Chromium password export."""
+    urls = _text(df, 'url')
+    names = _text(df, 'name')
+    return _frame({
+        'type': 'login',
+        'name': names.where(names != "", _host(urls)),
+        'notes': _text(df, 'note', 'notes'),
+        'login_uri': urls,
+        'login_username': _text(df, 'username'),
+        'login_password': _text(df, 'password', strip=False),
+    }, df.index)
+
+
+def map_firefox(df):
+    """Maps a Firefox password export, naming entries after their host."""
+    urls = _text(df, 'url')
+    return _frame({
+        'type': 'login',
+        'name': _host(urls),
+        'login_uri': urls,
+        'login_username': _text(df, 'username'),
+        'login_password': _text(df, 'password', strip=False),
+    }, df.index)
+
+
+def map_lastpass(df):
+    """Maps a LastPass export; entries with the http://sn URL are secure notes."""
+    urls = _text(df, 'url')
+    notes = (urls == LASTPASS_NOTE_URL).to_numpy()
+    return _frame({
+        # LastPass nests folders with backslashes, Bitwarden with slashes
+        'folder': _text(df, 'grouping').str.replace('\\', '/', regex=False),
+        'favorite': _flag(_text(df, 'fav')),
+        'type': np.where(notes, 'note', 'login'),
+        'name': _text(df, 'name'),
+        'notes': _text(df, 'extra'),
+        'login_uri': urls.mask(notes, ""),
+        'login_username': _text(df, 'username'),
+        'login_password': _text(df, 'password', strip=False),
+        'login_totp': _text(df, 'totp'),
+    }, df.index)
+
+
+def map_1password(df):
+    """Maps a 1Password CSV export; the first tag becomes the folder."""
+    urls = _text(df, 'url', 'urls', 'website')
+    usernames = _text(df, 'username')
+    passwords = _text(df, 'password', strip=False)
+    logins = ((urls != "") | (usernames != "") | (passwords != "")).to_numpy()
+    return _frame({
+        'folder': _text(df, 'tags').str.split(';').str[0].str.strip(),
+        'favorite': _flag(_text(df, 'favorite')),
+        'type': np.where(logins, 'login', 'note'),
+        'name': _text(df, 'title'),
+        'notes': _text(df, 'notes', 'notesplain'),
+        'login_uri': urls,
+        'login_username': usernames,
+        'login_password': passwords,
+        'login_totp': _text(df, 'otpauth', 'one-time password'),
+    }, df.index)
+
+
+IMPORTERS = {
+    'chrome': map_chrome,
+    'firefox': map_firefox,
+    'lastpass': map_lastpass,
+    '1password': map_1password,
+}
+
+
+def _sample_matches(source, sample):
+    """Returns False when sample rows contradict a format guessed from the header."""
+    if sample.empty:
+        return True
+    if source == 'firefox':
+        guids = _text(sample, 'guid')
+        return guids[guids != ""].str.match(FIREFOX_GUID_RE).all()
+    if source == 'lastpass':
+        return _text(sample, 'fav').isin(['', '0', '1']).all()
+    if source == 'chrome':
+        urls = _text(sample, 'url')
+        urls = urls[urls != ""]
+        return urls.empty or urls.str.contains('://', regex=False).mean() >= 0.5
+    return True
+
+
+def detect_format(file_path):
+    """
+    Returns the source format of an export: 'bitwarden', an IMPORTERS key,
+    or None when it is not recognized.
+
+    Only the header and the first SAMPLE_ROWS rows are read.
+    """
+    if is_json_path(file_path):
+        return 'bitwarden'
+    chunks = iter_chunks(file_path, chunksize=SAMPLE_ROWS)
+    try:
+        sample = next(chunks, None)
+    finally:
+        chunks.close()
+    if sample is None:
+        sample = read_header(file_path)
+    header = set(_columns(sample))
+    if BITWARDEN_COLUMNS & header:
+        return 'bitwarden'
+    # The most specific format first: LastPass's columns include Chrome's
+    candidates = sorted(
+        (source for source, columns in SOURCE_COLUMNS.items() if columns <= header),
+        key=lambda source: len(SOURCE_COLUMNS[source]),
+        reverse=True
+    )
+    for source in candidates:
+        if _sample_matches(source, sample):
+            return source
+    return None
+
+
+def import_chunks(chunks, source):
+    """Yields each chunk mapped from a source format onto the Bitwarden columns."""
+    mapper = IMPORTERS[source]
+    for chunk in chunks:
+        yield mapper(chunk)
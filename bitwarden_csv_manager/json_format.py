@@ -0,0 +1,355 @@
+"""
+Streaming reader and writer for Bitwarden's JSON export format.
+
+A JSON export is an object with a "folders" array of {id, name} and an
+"items" array, one object per vault item. json.load would hold the whole
+vault in memory several times over, so the reader walks the top-level
+object itself and decodes one item at a time from a sliding buffer; the
+writer emits each item as it comes. Both map items to and from the CSV
+column model, so a CSV and a JSON export of the same vault convert into
+each other chunk by chunk:
+
+    folder          folders[].name of the item's folderId
+    favorite        favorite (true <-> 1, false <-> blank)
+    type            type (1 login, 2 note, 3 card, 4 identity)
+    name, notes     name, notes
+    fields          fields, one "name: value" line each
+    reprompt        reprompt
+    login_uri       login.uris[].uri, comma-separated
+    login_username  login.username, login.password and login.totp
+    login_password
+    login_totp
+
+Card and identity details have no CSV columns and are not carried over.
+Encrypted exports cannot be read.
+"""
+
+import codecs
+import json
+import os
+import uuid
+
+import pandas as pd
+
+from bitwarden_csv_manager.cleaning import TYPE_ALIASES
+from bitwarden_csv_manager.schema import IDEAL_COLUMNS, compact_frame
+from bitwarden_csv_manager.search import column_values
+
+ITEMS_PER_CHUNK = 50000
+READ_BYTES = 1024 * 1024
+
+ITEM_TYPES = {1: 'login', 2: 'note', 3: 'card', 4: 'identity'}
+TYPE_IDS = {name: type_id for type_id, name in ITEM_TYPES.items()}
+# Objects holding the type-specific part of an item
+TYPE_KEYS = {1: 'login', 2: 'secureNote', 3: 'card', 4: 'identity'}
+
+LOGIN_COLUMNS = {'login_username': 'username', 'login_password': 'password', 'login_totp': 'totp'}
+URI_SEPARATOR = ','
+FAVORITE_TRUE = ('1', '1.0', 'true', 'yes', 'y')
+FIELD_SEPARATOR = ': '
+
+# Folder ids are derived from folder names so each item's folderId is known
+# without a lookup table
+FOLDER_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'bitwarden-csv-manager/folder')
+
+WHITESPACE = ' \t\r\n'
+
+# Top-level keys that mark a JSON file as an export when scanning directories
+EXPORT_KEYS = ('encrypted', 'folders', 'items')
+SNIFF_CHARS = 4096
+
+
+def is_json_path(file_path):
+    """Returns True when a path names a JSON export."""
+    return str(file_path).lower().endswith('.json')
+
+
+def looks_like_json_export(file_path):
+    """Returns True when a .json file starts like a Bitwarden export rather than, say, a report."""
+    try:
+        with open(file_path, 'r', encoding='utf-8-sig', errors='replace') as handle:
+            start = handle.read(SNIFF_CHARS)
+    except OSError:
+        return False
+    return start.lstrip().startswith('{') and any(f'"{key}"' in start for key in EXPORT_KEYS)
+
+
+class JSONStream:
+    """Decodes the values of a large JSON document one at a time."""
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.decoder = json.JSONDecoder()
+        self.text = codecs.getincrementaldecoder('utf-8-sig')()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Appends the next block of the file to the buffer; returns False at the end."""
+        if self.eof:
+            return False
+        data = self.handle.read(READ_BYTES)
+        self.eof = not data
+        self.buffer = self.buffer[self.pos:] + self.text.decode(data, final=self.eof)
+        self.pos = 0
+        return not self.eof
+
+    def _error(self, message):
+        return ValueError(f"Invalid JSON export: {message}")
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it, '' at the end."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, characters):
+        """Consumes the next character, which must be one of characters, and returns it."""
+        found = self.peek()
+        if not found or found not in characters:
+            raise self._error(f"expected {' or '.join(repr(c) for c in characters)}, found {found or 'end of file'!r}")
+        self.pos += 1
+        return found
+
+    def value(self):
+        """Decodes and returns the next complete value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # Most likely cut off by the end of the buffer; retry with more
+                if not self._fill():
+                    raise self._error(str(e)) from None
+                continue
+            # A number at the very end of the buffer may continue in the next block
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def events(self):
+        """
+        Yields (key, value) for each member of the top-level object.
+
+        The items array is not decoded whole: ('items', item) is yielded for
+        each of its elements instead.
+        """
+        self.expect('{')
+        if self.peek() == '}':
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise self._error("expected a member name")
+            self.expect(':')
+            if key == 'items':
+                self.expect('[')
+                if self.peek() == ']':
+                    self.pos += 1
+                else:
+                    while True:
+                        yield key, self.value()
+                        if self.expect(',]') == ']':
+                            break
+            else:
+                yield key, self.value()
+            if self.expect(',}') == '}':
+                return
+
+
+def _folder_names(folders):
+    """Maps folder ids to names."""
+    return {folder.get('id'): folder.get('name') for folder in folders or [] if isinstance(folder, dict)}
+
+
+def read_folders(file_path):
+    """Returns the folder id to name map of a JSON export, reading past its items."""
+    with open(file_path, 'rb') as handle:
+        for key, value in JSONStream(handle).events():
+            if key == 'folders':
+                return _folder_names(value)
+    return {}
+
+
+def iter_json_items(file_path, progress=None):
+    """
+    Yields (item, folder names) for every item of a JSON export.
+
+    Bitwarden writes folders before items; if a file has them after, they
+    are found by a first pass over the file. progress is called as
+    progress(items_read, bytes_read, total_bytes).
+    """
+    total_bytes = os.path.getsize(file_path)
+    folders = None
+    items = 0
+    with open(file_path, 'rb') as handle:
+        for key, value in JSONStream(handle).events():
+            if key == 'encrypted' and value:
+                raise ValueError(f"'{file_path}' is an encrypted export; export the vault unencrypted to read it")
+            elif key == 'folders':
+                folders = _folder_names(value)
+            elif key == 'items':
+                if folders is None:
+                    folders = read_folders(file_path)
+                if not isinstance(value, dict):
+                    raise ValueError(f"Invalid JSON export: item {items + 1} is not an object")
+                items += 1
+                if progress is not None:
+                    progress(items, min(handle.tell(), total_bytes), total_bytes)
+                yield value, folders
+
+
+def _text(value):
+    """Returns a value as CSV text, None for missing and blank."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        return str(int(value))
+    return str(value)
+
+
+def item_row(item, folders):
+    """Maps a JSON item to a row of the CSV column model."""
+    login = item.get('login') or {}
+    uris = [uri.get('uri') for uri in login.get('uris') or [] if uri.get('uri')]
+    fields = [
+        field.get('name') or '' if field.get('value') is None
+        else f"{field.get('name') or ''}{FIELD_SEPARATOR}{field['value']}"
+        for field in item.get('fields') or []
+    ]
+    row = {
+        'folder': folders.get(item.get('folderId')),
+        'favorite': '1' if item.get('favorite') else None,
+        'type': ITEM_TYPES.get(item.get('type'), _text(item.get('type'))),
+        'name': _text(item.get('name')),
+        'notes': _text(item.get('notes')),
+        'fields': '\n'.join(fields) or None,
+        'reprompt': _text(item.get('reprompt')),
+        'login_uri': URI_SEPARATOR.join(uris) or None,
+    }
+    for column, key in LOGIN_COLUMNS.items():
+        row[column] = _text(login.get(key))
+    return row
+
+
+def iter_json_chunks(file_path, chunksize=ITEMS_PER_CHUNK, progress=None, compact=True, usecols=None):
+    """
+    Yields DataFrame chunks of the ideal columns from a JSON export.
+
+    Matches streaming.iter_chunks: progress is called after every chunk,
+    compact narrows the dtypes and usecols selects columns.
+    """
+    columns = [col for col in IDEAL_COLUMNS if usecols is None or col in usecols]
+    rows = []
+    last = None
+
+    def track(*args):
+        nonlocal last
+        last = args
+
+    def chunk():
+        frame = pd.DataFrame.from_records(rows, columns=columns)
+        if progress is not None and last is not None:
+            progress(*last)
+        return compact_frame(frame) if compact else frame
+
+    for item, folders in iter_json_items(file_path, track):
+        rows.append(item_row(item, folders))
+        if len(rows) >= chunksize:
+            yield chunk()
+            rows = []
+    if rows or last is None:
+        yield chunk()
+
+
+def folder_id(name):
+    """Returns the stable id written for a folder name."""
+    return str(uuid.uuid5(FOLDER_NAMESPACE, name))
+
+
+def row_item(row):
+    """Maps a row of the CSV column model (text, blank for missing) to a JSON item."""
+    row = {col: value or None for col, value in row.items()}
+    type_name = (row.get('type') or 'login').strip().lower()
+    type_id = TYPE_IDS.get(TYPE_ALIASES.get(type_name, type_name), 1)
+    folder = row.get('folder')
+    reprompt = row.get('reprompt')
+    item = {
+        'organizationId': None,
+        'folderId': folder_id(folder) if folder else None,
+        'type': type_id,
+        'reprompt': int(float(reprompt)) if reprompt and reprompt.replace('.', '', 1).isdigit() else None,
+        'name': row.get('name'),
+        'notes': row.get('notes'),
+        'favorite': (row.get('favorite') or '').strip().lower() in FAVORITE_TRUE,
+    }
+    if row.get('fields'):
+        item['fields'] = []
+        for line in row['fields'].split('\n'):
+            name, separator, value = line.partition(FIELD_SEPARATOR)
+            item['fields'].append({'name': name, 'value': value if separator else None, 'type': 0, 'linkedId': None})
+
+    login = {key: row.get(column) for column, key in LOGIN_COLUMNS.items()}
+    uris = row.get('login_uri')
+    if type_id == 1 or uris or any(login.values()):
+        item['login'] = dict(
+            uris=[{'match': None, 'uri': uri} for uri in uris.split(URI_SEPARATOR)] if uris else [],
+            **login
+        )
+    if type_id == 2:
+        item['secureNote'] = {'type': 0}
+    elif type_id != 1:
+        item[TYPE_KEYS[type_id]] = {}
+    item['collectionIds'] = None
+    return item
+
+
+def _records(chunk):
+    """Returns a chunk's rows as dicts of text, blank for missing values."""
+    columns = list(chunk.columns)
+    values = [column_values(chunk[col]).to_numpy(dtype=object) for col in columns]
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+
+def _write_folders(handle, names):
+    folders = [{'id': folder_id(name), 'name': name} for name in names]
+    handle.write('  "folders": ')
+    handle.write(json.dumps(folders, indent=2, ensure_ascii=False).replace('\n', '\n  '))
+
+
+def export_json_chunks(chunks, file_path, folders=None):
+    """
+    Writes DataFrame chunks to a JSON export and returns the item count.
+
+    Items are written as they are read. folders, the folder names in use,
+    puts the folders before the items as Bitwarden does; without it they
+    are collected on the way and written after the items.
+    """
+    rows = 0
+    seen = dict.fromkeys(folders or [])
+    with open(file_path, 'w', encoding='utf-8', newline='\n') as handle:
+        handle.write('{\n  "encrypted": false,\n')
+        if folders is not None:
+            _write_folders(handle, seen)
+            handle.write(',\n')
+        handle.write('  "items": [')
+        for chunk in chunks:
+            for row in _records(chunk):
+                if row.get('folder'):
+                    seen.setdefault(row['folder'])
+                handle.write(',\n    ' if rows else '\n    ')
+                # One compact line per item keeps to json's C encoder
+                handle.write(json.dumps(row_item(row), ensure_ascii=False))
+                rows += 1
+        handle.write('\n  ]' if rows else ']')
+        if folders is None:
+            handle.write(',\n')
+            _write_folders(handle, seen)
+        handle.write('\n}\n')
+    return rows
@@ -0,0 +1,76 @@
+"""
+Deferred imports, so the menu and the GUI appear before pandas has loaded.
+
+A LazyModule stands in for a module and imports it the first time one of
+its attributes is used. preload imports modules on a background thread
+while the user reads the menu or picks a file; a LazyModule used while a
+preload is running waits for it instead of importing the same modules
+from a second thread, which could deadlock on Python's per-module import
+locks.
+"""
+
+import importlib
+import threading
+from concurrent.futures import Future, wait
+
+# Running preloads and their threads
+_preloads = []
+_preload_threads = set()
+
+
+def run_in_background(function, *args):
+    """Calls function(*args) on a daemon thread and returns a Future of its result."""
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def _import_all(names):
+    _preload_threads.add(threading.get_ident())
+    try:
+        for name in names:
+            importlib.import_module(name)
+    finally:
+        _preload_threads.discard(threading.get_ident())
+
+
+def preload(*names):
+    """
+    Imports modules on a background thread and returns a Future.
+
+    The Future fails with the first import error, e.g. when pandas is not
+    installed.
+    """
+    future = run_in_background(_import_all, names)
+    _preloads.append(future)
+    return future
+
+
+def wait_for_preloads():
+    """Blocks until every running preload has finished, successfully or not."""
+    if _preloads and threading.get_ident() not in _preload_threads:
+        wait(list(_preloads))
+        _preloads[:] = [future for future in _preloads if not future.done()]
+
+
+class LazyModule:
+    """A module imported on first attribute access."""
+
+    def __init__(self, name):
+        self.__name__ = name
+
+    def __getattr__(self, attr):
+        wait_for_preloads()
+        return getattr(importlib.import_module(self.__name__), attr)
+
+    def __repr__(self):
+        return f"<LazyModule {self.__name__!r}>"
@@ -0,0 +1,122 @@
+"""
+Pandas-free helpers for the first screen and for small exports.
+
+Importing pandas takes longer than formatting a small export, so the menu
+and the GUI appear before it has loaded (see lazy.py) using only what is
+here: the ideal column order, the streaming threshold and the header of
+an export. format_small_file formats a Bitwarden CSV export of up to
+SMALL_EXPORT_BYTES with the csv module; its output is byte for byte what
+the pandas path writes.
+"""
+
+import contextlib
+import csv
+import functools
+import os
+import tempfile
+
+IDEAL_COLUMNS = [
+    'folder', 'favorite', 'type', 'name', 'notes', 'fields',
+    'reprompt', 'login_uri', 'login_username', 'login_password', 'login_totp'
+]
+
+# A reference export whose header, if present, overrides IDEAL_COLUMNS
+IDEAL_FORMAT_FILE = 'ideal_bitwarden_export.csv'
+
+# Columns only a Bitwarden export has
+BITWARDEN_COLUMNS = {'login_uri', 'login_username', 'login_password'}
+
+# Default budget for a single in-memory chunk.
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+# pandas object columns take several times the raw CSV size in memory.
+MEMORY_OVERHEAD_FACTOR = 8
+
+# Up to this size the csv module formats an export faster than pandas imports
+SMALL_EXPORT_BYTES = 4 * 1024 * 1024
+
+
+@functools.lru_cache(maxsize=None)
+def load_ideal_columns(file_path=IDEAL_FORMAT_FILE):
+    """Returns the ideal column order, read once from the header of file_path."""
+    try:
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as handle:
+            columns = next(csv.reader(handle), [])
+    except FileNotFoundError:
+        columns = []
+    return tuple(columns or IDEAL_COLUMNS)
+
+
+def needs_streaming(file_path, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """Returns True when a file is likely too large to load in one piece."""
+    return os.path.getsize(file_path) * MEMORY_OVERHEAD_FACTOR > memory_limit
+
+
+def read_header_row(file_path):
+    """Returns the column names of a CSV export."""
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as handle:
+        return next(csv.reader(handle), [])
+
+
+def is_small_export(file_path, output_file):
+    """
+    Returns True when format_small_file can format file_path into output_file:
+    both are CSV, the input is a Bitwarden export and at most SMALL_EXPORT_BYTES.
+    """
+    paths = (str(file_path).lower(), str(output_file).lower())
+    if any(path.endswith('.json') for path in paths) or os.path.getsize(file_path) > SMALL_EXPORT_BYTES:
+        return False
+    header = {col.strip().lower() for col in read_header_row(file_path)}
+    return bool(BITWARDEN_COLUMNS & header)
+
+
+@contextlib.contextmanager
+def atomic_output(file_path):
+    """
+    Yields a temporary path beside file_path that replaces file_path when
+    the block finishes. On an error or a cancelled task the temporary file
+    is removed instead, so no partial output is left behind.
+    """
+    handle, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(file_path)), prefix=f".{os.path.basename(file_path)}.", suffix='.tmp'
+    )
+    os.close(handle)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def format_small_file(file_path, output_file, columns=None):
+    """
+    Writes a CSV export reordered to the ideal columns, missing ones blank,
+    and returns the row count, as streaming.format_chunks and export_chunks do.
+
+    Blank lines are skipped and short rows padded, as pandas reads them.
+    """
+    columns = list(columns or load_ideal_columns())
+    rows = 0
+    with atomic_output(output_file) as tmp_path, \
+            open(file_path, 'r', encoding='utf-8-sig', newline='') as source, \
+            open(tmp_path, 'w', encoding='utf-8', newline='') as target:
+        reader = csv.reader(source)
+        header = next(reader, [])
+        # The first of duplicate names wins, as pandas renames the others
+        positions = {}
+        for position, name in enumerate(header):
+            positions.setdefault(name, position)
+        picks = [positions.get(col) for col in columns]
+        writer = csv.writer(target, lineterminator=os.linesep)
+        writer.writerow(columns)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) > len(header):
+                raise ValueError(
+                    f"Error tokenizing data. Expected {len(header)} fields in line {reader.line_num}, saw {len(row)}"
+                )
+            writer.writerow([row[pick] if pick is not None and pick < len(row) else '' for pick in picks])
+            rows += 1
+    return rows
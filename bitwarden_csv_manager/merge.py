@@ -0,0 +1,140 @@
+"""
+Streaming k-way merge of many exports into one import file.
+
+Every input is aligned to the ideal Bitwarden columns and read chunk by
+chunk. Each chunk is sorted on the normalized duplicate key (login URI,
+name, username, password as in dedup.py) and written to a temporary run
+file; the runs are then merged with a heap, a bounded number at a time,
+and rows whose key was already written are dropped. Memory use is one
+chunk per worker while sorting and one row per run while merging, so the
+inputs never have to fit in RAM together. The output is ordered by key,
+and of each group of duplicates the first one in input order is kept.
+
+Run files hold passwords in the clear; they are written to a private
+temporary directory that is removed afterwards.
+"""
+
+import csv
+import heapq
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from bitwarden_csv_manager.dedup import key_frame
+from bitwarden_csv_manager.lite import atomic_output
+from bitwarden_csv_manager.schema import format_frame, load_ideal_columns
+from bitwarden_csv_manager.streaming import DEFAULT_MEMORY_LIMIT, iter_chunks
+
+# Order of the key fields, so merged output is grouped by site
+SORT_KEY_COLUMNS = ['login_uri', 'name', 'login_username', 'login_password']
+KEY_SEPARATOR = '\x1f'
+KEY_COLUMN = '_merge_key'
+
+# Runs merged at once; more are merged in several passes to bound open files
+MAX_FAN_IN = 64
+
+# Exported notes can exceed the csv module's default field limit
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+
+def sort_keys(df):
+    """Returns the normalized merge key of every row as one string."""
+    keys = key_frame(df)[SORT_KEY_COLUMNS]
+    return keys[SORT_KEY_COLUMNS[0]].str.cat(
+        [keys[col] for col in SORT_KEY_COLUMNS[1:]], sep=KEY_SEPARATOR
+    ).astype(object)
+
+
+def _sort_runs(file_path, run_prefix, columns, memory_limit):
+    """Writes each chunk of file_path sorted and deduplicated as a run; returns (run paths, rows read)."""
+    runs = []
+    rows = 0
+    for number, chunk in enumerate(iter_chunks(file_path, memory_limit=memory_limit)):
+        rows += len(chunk)
+        chunk = format_frame(chunk, columns)
+        chunk.insert(0, KEY_COLUMN, sort_keys(chunk).to_numpy())
+        chunk = chunk.sort_values(KEY_COLUMN, kind='stable').drop_duplicates(KEY_COLUMN)
+
+        run_path = f"{run_prefix}-{number:06d}.csv"
+        chunk.to_csv(run_path, index=False, header=False)
+        runs.append(run_path)
+    return runs, rows
+
+
+def _read_run(run_path):
+    with open(run_path, 'r', encoding='utf-8', newline='') as handle:
+        yield from csv.reader(handle)
+
+
+def _merge_runs(run_paths, writer):
+    """Merges sorted runs, writing the first row of every key; returns the rows written."""
+    written = 0
+    previous = None
+    for row in heapq.merge(*(_read_run(path) for path in run_paths), key=lambda row: row[0]):
+        if row[0] != previous:
+            previous = row[0]
+            writer(row)
+            written += 1
+    return written
+
+
+def _merge_passes(runs, directory):
+    """Merges runs MAX_FAN_IN at a time until at most MAX_FAN_IN are left, keeping their order."""
+    level = 0
+    while len(runs) > MAX_FAN_IN:
+        merged = []
+        for start in range(0, len(runs), MAX_FAN_IN):
+            group = runs[start:start + MAX_FAN_IN]
+            path = os.path.join(directory, f"pass{level}-{start // MAX_FAN_IN:06d}.csv")
+            with open(path, 'w', encoding='utf-8', newline='') as handle:
+                _merge_runs(group, csv.writer(handle, lineterminator=os.linesep).writerow)
+            for run in group:
+                os.remove(run)
+            merged.append(path)
+        runs = merged
+        level += 1
+    return runs
+
+
+def merge_files(files, output_file, memory_limit=DEFAULT_MEMORY_LIMIT, workers=None,
+                temp_dir=None, columns=None):
+    """
+    Merges CSV exports into output_file, dropping duplicates across and within files.
+
+    Inputs are sorted into runs by a process pool of workers processes
+    (default: all cores; 1 disables it), each holding one chunk of up to
+    memory_limit at a time. Returns a dict with the rows read per input,
+    the rows written and the duplicates removed.
+    """
+    columns = list(columns or load_ideal_columns())
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+
+    with tempfile.TemporaryDirectory(prefix='bitwarden-merge-', dir=temp_dir) as directory:
+        prefixes = [os.path.join(directory, f"input{i:05d}") for i in range(len(files))]
+        if workers == 1:
+            sorted_runs = [_sort_runs(path, prefix, columns, memory_limit) for path, prefix in zip(files, prefixes)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                sorted_runs = list(pool.map(_sort_runs, files, prefixes, repeat(columns), repeat(memory_limit)))
+
+        # Runs stay in input order so the first copy of a duplicate wins the merge
+        runs = [run for file_runs, _ in sorted_runs for run in file_runs]
+        rows_read = [rows for _, rows in sorted_runs]
+        runs = _merge_passes(runs, directory)
+
+        with atomic_output(output_file) as tmp_path, open(tmp_path, 'w', encoding='utf-8', newline='') as handle:
+            writer = csv.writer(handle, lineterminator=os.linesep)
+            writer.writerow(columns)
+            # The key is only needed for sorting
+            written = _merge_runs(runs, lambda row: writer.writerow(row[1:]))
+
+    return {
+        'inputs': [{'file': path, 'rows': rows} for path, rows in zip(files, rows_read)],
+        'rows_read': sum(rows_read),
+        'rows': written,
+        'duplicates': sum(rows_read) - written,
+        'runs': sum(len(file_runs) for file_runs, _ in sorted_runs),
+        'output': output_file,
+    }
@@ -0,0 +1,233 @@
+"""
+Near-duplicate detection, for entries such as "Dribble" vs "Dribbble" or
+usernames that differ only in case or a typo.
+
+Rows are blocked by registrable domain. Inside a block, candidates come
+from MinHash LSH buckets over the trigrams of name + login_username, and
+every pair in a bucket is verified by its exact Jaccard similarity; in
+buckets too large for that, members are compared with representatives
+instead. Verified pairs are merged into clusters. Blocks are spread over
+a process pool.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from bitwarden_csv_manager.dedup import normalize_uri_value
+from bitwarden_csv_manager.parallel import map_batches
+from bitwarden_csv_manager.search import column_values, trigrams
+
+NUM_PERMUTATIONS = 64
+# 16 bands of 4 rows make pairs above roughly 0.5 Jaccard likely candidates
+BANDS = 16
+MERSENNE_PRIME = (1 << 31) - 1
+MINHASH_SEED = 1
+
+DEFAULT_THRESHOLD = 0.7
+
+# Blocks this small are compared pairwise instead of through LSH
+SMALL_BLOCK = 16
+# LSH buckets up to this size are compared pairwise as sets; larger ones as
+# matrix products over tiles of PAIRWISE_BUCKET members, each tile against
+# itself and against the representatives of earlier tiles
+SMALL_BUCKET = 8
+PAIRWISE_BUCKET = 1024
+
+BATCH_ROWS = 5000
+
+NEAR_GROUP_COLUMN = 'near_duplicate_group'
+
+# The only columns find_near_duplicates reads
+KEY_COLUMNS = ['name', 'login_uri', 'login_username']
+
+# Second-level labels under country TLDs, as in example.co.uk
+SECOND_LEVEL_LABELS = {'ac', 'co', 'com', 'edu', 'gov', 'net', 'org'}
+
+HOST_END_RE = re.compile(r'[/?#:]')
+
+_rng = np.random.RandomState(MINHASH_SEED)
+_A = _rng.randint(1, MERSENNE_PRIME, NUM_PERMUTATIONS).astype(np.int64)
+_B = _rng.randint(0, MERSENNE_PRIME, NUM_PERMUTATIONS).astype(np.int64)
+
+
+def _domain_of(uri):
+    normalized = normalize_uri_value(uri)
+    if '://' in normalized:
+        # App and other non-web URIs are their own block
+        return normalized
+    labels = HOST_END_RE.split(normalized, 1)[0].split('.')
+    if len(labels) >= 3 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        return '.'.join(labels[-3:])
+    return '.'.join(labels[-2:])
+
+
+def registrable_domain(series):
+    """Returns the registrable domain of each URI, e.g. accounts.google.com -> google.com."""
+    codes, uniques = pd.factorize(column_values(series))
+    domains = np.array([_domain_of(uri) for uri in uniques], dtype=object)
+    return pd.Series(domains[codes] if len(domains) else [""] * len(codes), index=series.index)
+
+
+def shingles(text):
+    """Returns the trigram shingles of text; short texts are a single shingle."""
+    return trigrams(text) or {text}
+
+
+def minhash_signature(shingle_set):
+    """Returns the MinHash signature of a set of shingles."""
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode('utf-8')) & MERSENNE_PRIME for shingle in shingle_set),
+        dtype=np.int64,
+        count=len(shingle_set)
+    )
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % MERSENNE_PRIME).min(axis=1)
+
+
+def jaccard(a, b):
+    """Returns the Jaccard similarity of two sets."""
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _buckets(shingle_sets):
+    """Yields the groups of a block whose members may be similar: the block itself if small, else LSH buckets."""
+    if len(shingle_sets) <= SMALL_BLOCK:
+        yield list(range(len(shingle_sets)))
+        return
+
+    signatures = np.array([minhash_signature(s) for s in shingle_sets])
+    rows_per_band = NUM_PERMUTATIONS // BANDS
+    for band in range(BANDS):
+        buckets = defaultdict(list)
+        band_rows = signatures[:, band * rows_per_band:(band + 1) * rows_per_band]
+        for i, key in enumerate(map(bytes, band_rows)):
+            buckets[key].append(i)
+        for members in buckets.values():
+            if len(members) > 1:
+                yield members
+
+
+def _jaccard_matrix(row_sets, column_sets):
+    """Returns the Jaccard similarity of each row set to each column set, given as arrays of distinct ids."""
+    id_arrays = row_sets + column_sets
+    lengths = np.array([len(ids) for ids in id_arrays])
+    _, columns = np.unique(np.concatenate(id_arrays), return_inverse=True)
+    matrix = np.zeros((len(id_arrays), columns.max() + 1), dtype=np.float32)
+    matrix[np.repeat(np.arange(len(id_arrays)), lengths), columns] = 1
+    intersections = (matrix[:len(row_sets)] @ matrix[len(row_sets):].T).astype(np.float64)
+    sizes = lengths.astype(np.float64)
+    return intersections / (sizes[:len(row_sets), None] + sizes[None, len(row_sets):] - intersections)
+
+
+def _similar_pairs(shingle_sets, threshold):
+    """Returns the (i, j) pairs of a block whose Jaccard similarity reaches threshold."""
+    vocabulary = defaultdict(lambda: len(vocabulary))
+    id_arrays = [np.array([vocabulary[shingle] for shingle in s], dtype=np.int64) for s in shingle_sets]
+
+    def matches(rows, columns):
+        return _jaccard_matrix([id_arrays[i] for i in rows], [id_arrays[j] for j in columns]) >= threshold
+
+    pairs = set()
+    for members in _buckets(shingle_sets):
+        if len(members) <= SMALL_BUCKET:
+            pairs.update((i, j) for i, j in combinations(members, 2)
+                         if jaccard(shingle_sets[i], shingle_sets[j]) >= threshold)
+            continue
+        # Larger buckets are taken a tile at a time: every pair inside the
+        # tile, and each member against the representatives of earlier tiles.
+        # Members that match none become representatives; clustering restores
+        # the rest of the group.
+        members = np.array(members)
+        representatives = members[:0]
+        for start in range(0, len(members), PAIRWISE_BUCKET):
+            tile = members[start:start + PAIRWISE_BUCKET]
+            rows, cols = np.nonzero(np.triu(matches(tile, tile), 1))
+            pairs.update(zip(tile[rows].tolist(), tile[cols].tolist()))
+            if not len(representatives):
+                representatives = tile
+                continue
+            similar = matches(representatives, tile)
+            rows, cols = np.nonzero(similar)
+            pairs.update(zip(representatives[rows].tolist(), tile[cols].tolist()))
+            representatives = np.concatenate([representatives, tile[~similar.any(axis=0)]])
+    return pairs
+
+
+def _block_pairs(blocks, threshold):
+    """Returns verified (position, position) pairs for a batch of blocks."""
+    pairs = []
+    for positions, texts in blocks:
+        shingle_sets = [shingles(text) for text in texts]
+        pairs.extend((positions[i], positions[j]) for i, j in _similar_pairs(shingle_sets, threshold))
+    return pairs
+
+
+def _batches(domains, texts, positions):
+    codes, _ = pd.factorize(domains[positions])
+    order = np.argsort(codes, kind='stable')
+    boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+
+    batch, batch_rows = [], 0
+    for block in np.split(positions[order], boundaries):
+        if len(block) < 2:
+            continue
+        batch.append((block.tolist(), [texts[i] for i in block]))
+        batch_rows += len(block)
+        if batch_rows >= BATCH_ROWS:
+            yield batch
+            batch, batch_rows = [], 0
+    if batch:
+        yield batch
+
+
+def _clusters(pairs, size):
+    parent = list(range(size))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    members = defaultdict(list)
+    for i in {i for pair in pairs for i in pair}:
+        members[find(i)].append(i)
+    return [sorted(group) for _, group in sorted(members.items())]
+
+
+def find_near_duplicates(df, threshold=DEFAULT_THRESHOLD, workers=None):
+    """
+    Returns the rows of df that belong to a near-duplicate cluster.
+
+    The result has a near_duplicate_group column and is ordered by cluster.
+    workers sets the process pool size (default: all cores); 1 disables it.
+    """
+    empty = pd.Series([""] * len(df), index=df.index)
+    uris = df['login_uri'] if 'login_uri' in df.columns else empty
+    names = column_values(df['name']) if 'name' in df.columns else empty
+    usernames = column_values(df['login_username']) if 'login_username' in df.columns else empty
+
+    domains = registrable_domain(uris).to_numpy()
+    texts = (names + " " + usernames).str.strip().str.lower().to_numpy()
+
+    # Entries with neither a name nor a username have nothing to compare
+    batches = list(_batches(domains, texts, np.flatnonzero(texts != "")))
+
+    results = map_batches(_block_pairs, batches, threshold, workers=workers, items=len(df))
+
+    clusters = _clusters([pair for result in results for pair in result], len(df))
+    positions = [i for cluster in clusters for i in cluster]
+    groups = [n for n, cluster in enumerate(clusters, 1) for _ in cluster]
+
+    report = df.iloc[positions].copy()
+    report.insert(0, NEAR_GROUP_COLUMN, groups)
+    return report
@@ -0,0 +1,224 @@
+"""
+Parallel parsing of one large CSV export across cores.
+
+The file is memory-mapped and cut into byte ranges, one or more per
+worker. A cut may only fall after a newline that ends a record, and
+quoted notes and fields span lines, so a newline ends a record exactly
+when an even number of quote characters precedes it (an escaped quote
+is written twice and does not change the parity). The quotes in each
+range are counted in the process pool, which gives the parity at every
+range start; each cut is then moved forward to the first newline where
+the parity is even.
+
+The ranges are parsed in the pool as headerless CSV with the file's
+column names and joined in file order. Text columns are narrowed in the
+workers; folder, type and the flag columns are narrowed once after
+joining, so the result is identical to schema.read_compact_csv. Files
+with an odd number of quotes, which the rule cannot split safely, and
+files too small to gain from it are read in one piece.
+
+iter_ranges does the same for files streamed in chunks: ranges sized to
+the memory budget are parsed a few at a time and yielded in file order.
+
+map_batches is the process pool shared by the checks that work through
+batches of rows or passwords: near-duplicates, hygiene and breach.
+"""
+
+import io
+import mmap
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from bitwarden_csv_manager.engines import read_text_records, resolve_engine
+from bitwarden_csv_manager.schema import CATEGORY_COLUMNS, FLAG_COLUMNS, compact_column, read_compact_csv
+
+# Below this many rows or distinct passwords a process pool costs more than it saves
+PARALLEL_MIN_ITEMS = 20000
+
+# Below this size a single parse is faster than starting a pool
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+# Ranges per worker, so uneven ranges still keep every worker busy
+RANGES_PER_WORKER = 4
+MIN_RANGE_BYTES = 1024 * 1024
+COUNT_BLOCK_BYTES = 16 * 1024 * 1024
+
+QUOTE = ord('"')
+
+
+def resolve_workers(workers=None):
+    """Returns the process pool size to use: workers, or the number of cores."""
+    return workers or os.cpu_count() or 1
+
+
+def use_pool(workers, items, batches):
+    """Says whether a pool is worth starting for items rows or passwords split into batches."""
+    return resolve_workers(workers) > 1 and items >= PARALLEL_MIN_ITEMS and len(batches) >= 2
+
+
+def map_batches(function, batches, *args, workers=None, items=0):
+    """
+    Returns [function(batch, *args) for batch in batches], run in a process
+    pool when use_pool says it is worth it.
+    """
+    if not use_pool(workers, items, batches):
+        return [function(batch, *args) for batch in batches]
+    with ProcessPoolExecutor(max_workers=resolve_workers(workers)) as pool:
+        return list(pool.map(function, batches, *(repeat(arg) for arg in args)))
+
+
+def _count_quotes(file_path, start, end):
+    """Pool worker: returns the number of quote characters in a byte range."""
+    with open(file_path, 'rb') as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        view = np.frombuffer(data, dtype=np.uint8)
+        try:
+            return sum(
+                int(np.count_nonzero(view[i:min(i + COUNT_BLOCK_BYTES, end)] == QUOTE))
+                for i in range(start, end, COUNT_BLOCK_BYTES)
+            )
+        finally:
+            del view  # The map cannot close while a buffer points into it
+
+
+def record_end(data, position, odd=False):
+    """
+    Returns the offset just past the first record-ending newline at or after position.
+
+    odd says whether an odd number of quotes precedes position. Returns
+    the end of data when no newline ends a record.
+    """
+    while True:
+        newline = data.find(b'\n', position)
+        if newline == -1:
+            return len(data)
+        odd ^= data[position:newline].count(b'"') % 2 == 1
+        if not odd:
+            return newline + 1
+        position = newline + 1
+
+
+def split_ranges(file_path, pieces, pool=None):
+    """
+    Returns (header bytes, [(start, end), ...]) cutting a CSV file at record boundaries.
+
+    Returns None when the file has an odd number of quotes and so cannot
+    be split safely.
+    """
+    with open(file_path, 'rb') as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        size = len(data)
+        body = record_end(data, 0)
+        step = max(MIN_RANGE_BYTES, -(-(size - body) // pieces))
+        starts = list(range(body, size, step))
+        ends = starts[1:] + [size]
+        if pool is not None:
+            counts = list(pool.map(_count_quotes, repeat(file_path), starts, ends))
+        else:
+            counts = [_count_quotes(file_path, start, end) for start, end in zip(starts, ends)]
+        if sum(counts) % 2:
+            return None
+
+        cuts = [body]
+        parity = 0
+        for start, count in zip(starts[1:], counts):
+            parity ^= count % 2
+            cut = record_end(data, start, bool(parity))
+            if cut > cuts[-1]:
+                cuts.append(cut)
+        if cuts[-1] < size:
+            cuts.append(size)
+        return data[:body], list(zip(cuts[:-1], cuts[1:]))
+
+
+def _parse_range(file_path, start, end, columns, usecols=None, engine=None):
+    """Pool worker: parses a byte range of records, narrowing its text columns."""
+    with open(file_path, 'rb') as handle:
+        handle.seek(start)
+        data = handle.read(end - start)
+    df = read_text_records(data, columns, usecols, engine)
+    for col in df.columns:
+        # Narrowed after joining, as their dtype depends on every row
+        if col in CATEGORY_COLUMNS or col in FLAG_COLUMNS:
+            df[col] = df[col].astype('category')
+        else:
+            df[col] = compact_column(col, df[col])
+    return df
+
+
+def _range_columns(header, usecols=None):
+    """Returns the column names of a split file, checking usecols against them as pandas does."""
+    columns = pd.read_csv(io.BytesIO(header), nrows=0, encoding='utf-8-sig').columns.tolist()
+    if usecols is not None:
+        missing = set(usecols) - set(columns)
+        if missing:
+            raise ValueError(f"Usecols do not match columns, columns expected but not found: {sorted(missing)}")
+    return columns
+
+
+def _narrow_categories(df):
+    """Narrows the folder, type and flag columns left as plain categories by _parse_range."""
+    for col in df.columns:
+        if col in CATEGORY_COLUMNS or col in FLAG_COLUMNS:
+            df[col] = compact_column(col, df[col].astype(object))
+    return df
+
+
+def iter_ranges(file_path, header, ranges, workers=None, engine=None, usecols=None):
+    """
+    Yields (chunk, end offset) for each range of a CSV export cut by
+    split_ranges, in file order, narrowed as by schema.compact_frame.
+
+    At most workers ranges are parsed ahead of the one being consumed.
+    """
+    workers = resolve_workers(workers)
+    engine = resolve_engine(engine)
+    columns = _range_columns(header, usecols)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def submitted():
+            pending = deque()
+            for start, end in ranges:
+                pending.append((pool.submit(_parse_range, file_path, start, end, columns, usecols, engine), end))
+                if len(pending) > workers:
+                    yield pending.popleft()
+            yield from pending
+
+        rows = 0
+        for future, end in submitted():
+            chunk = _narrow_categories(future.result())
+            # Continue the index across chunks, as pandas' chunked reader does
+            chunk.index = pd.RangeIndex(rows, rows + len(chunk))
+            rows += len(chunk)
+            yield chunk, end
+
+
+def read_parallel(file_path, workers=None, engine=None, usecols=None):
+    """
+    Reads a CSV export like schema.read_compact_csv, parsing ranges of it
+    in a process pool.
+
+    workers defaults to the number of cores; with 1, or for small files,
+    the file is read in one piece.
+    """
+    workers = resolve_workers(workers)
+    engine = resolve_engine(engine)
+    if workers == 1 or os.path.getsize(file_path) < PARALLEL_MIN_BYTES:
+        return read_compact_csv(file_path, engine=engine, usecols=usecols)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        split = split_ranges(file_path, workers * RANGES_PER_WORKER, pool)
+        if split is None:
+            return read_compact_csv(file_path, engine=engine, usecols=usecols)
+        header, ranges = split
+        columns = _range_columns(header, usecols)
+        starts, ends = zip(*ranges) if ranges else ((), ())
+        parts = list(pool.map(
+            _parse_range, repeat(file_path), starts, ends, repeat(columns), repeat(usecols), repeat(engine)
+        ))
+
+    if not parts:
+        return read_compact_csv(file_path, engine=engine, usecols=usecols)
+    return _narrow_categories(pd.concat(parts, ignore_index=True))
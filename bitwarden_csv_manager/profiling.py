@@ -0,0 +1,250 @@
+"""
+Per-stage timing and optional cProfile output for the menu and the GUI.
+
+A Timings collects named spans for one operation: how long each stage
+took, how many rows it handled and how much the process's resident memory
+grew meanwhile. Spans nest, and a span's time excludes the spans inside
+it, so in
+
+    chunks = timings.chunks('parse', iter_chunks(path))
+    chunks = timings.chunks('filter', query_chunks(chunks, query))
+    with timings.span('write'):
+        export_chunks(chunks, output)
+
+'write' counts only to_csv, although pulling each chunk runs the parser
+and the filter. summary() gives the one-line form shown in the GUI status
+bar and after each menu action.
+
+start_profiling(path) turns on cProfile for every thread that runs inside
+profile_thread(); stop_profiling() merges them into one pstats file. From
+Python 3.12 cProfile is built on sys.monitoring, which allows a single
+profiler per process but sees every thread, so there one profiler runs
+from start to stop and profile_thread() does nothing. The module uses
+only the standard library so the entry points can import it before
+pandas.
+"""
+
+import contextlib
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+
+_frames = threading.local()
+
+_profile_lock = threading.Lock()
+_profile_path = None
+_profiles = []
+
+# One profiler for the whole process, which also sees every thread
+PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+
+
+def current_rss():
+    """Returns the resident set size of this process in bytes, or None where unknown."""
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Span:
+    """Totals for one named stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.seconds = 0.0
+        self.calls = 0
+        self.rows = None
+        self.memory = None  # Change in resident memory, bytes
+
+    def add_rows(self, rows):
+        self.rows = (self.rows or 0) + rows
+
+    def as_dict(self):
+        return {
+            'stage': self.name,
+            'seconds': round(self.seconds, 6),
+            'rows': self.rows,
+            'memory_delta_bytes': self.memory,
+        }
+
+
+class Timings:
+    """Spans of one operation, in the order the stages first ran."""
+
+    def __init__(self):
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def _span(self, name):
+        with self._lock:
+            if name not in self.spans:
+                self.spans[name] = Span(name)
+            return self.spans[name]
+
+    @contextlib.contextmanager
+    def _timed(self, span):
+        """Times a block as part of span, excluding nested spans."""
+        stack = getattr(_frames, 'stack', None)
+        if stack is None:
+            stack = _frames.stack = []
+        frame = [0.0]  # Seconds spent in nested spans
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            with self._lock:
+                span.seconds += elapsed - frame[0]
+                span.calls += 1
+
+    def _add_memory(self, span, before):
+        after = current_rss()
+        if before is not None and after is not None:
+            with self._lock:
+                span.memory = (span.memory or 0) + after - before
+
+    @contextlib.contextmanager
+    def span(self, name, rows=None):
+        """
+        Times a block as the stage name and yields its Span.
+
+        rows may be given up front or added inside the block with
+        span.add_rows().
+        """
+        span = self._span(name)
+        if rows is not None:
+            span.add_rows(rows)
+        before = current_rss()
+        try:
+            with self._timed(span):
+                yield span
+        finally:
+            self._add_memory(span, before)
+
+    def chunks(self, name, chunks):
+        """Yields chunks, timing the work that produces each one as the stage name."""
+        span = self._span(name)
+        chunks = iter(chunks)
+        before = current_rss()
+        try:
+            while True:
+                with self._timed(span):
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                span.add_rows(len(chunk))
+                yield chunk
+        finally:
+            self._add_memory(span, before)
+
+    def total(self):
+        """Returns the seconds spent in all spans."""
+        return sum(span.seconds for span in self.spans.values())
+
+    def summary(self, limit=4):
+        """Returns the slowest stages as one short line, e.g. 'parse 1.20s · write 0.31s'."""
+        spans = sorted(self.spans.values(), key=lambda span: span.seconds, reverse=True)
+        parts = [f"{span.name} {span.seconds:.2f}s" for span in spans[:limit]]
+        if len(spans) > limit:
+            parts.append(f"+{len(spans) - limit} more")
+        return " · ".join(parts)
+
+    def describe(self):
+        """Returns one line per stage with its time, rows, throughput and memory change."""
+        lines = []
+        for span in self.spans.values():
+            line = f"{span.name:<10} {span.seconds:8.3f}s"
+            if span.rows is not None:
+                line += f" {span.rows:>10,} rows"
+                if span.seconds > 0:
+                    line += f" {span.rows / span.seconds:>12,.0f} rows/s"
+            if span.memory is not None:
+                line += f"  memory {span.memory / 2 ** 20:+.1f} MiB"
+            lines.append(line)
+        return lines
+
+    def as_dict(self):
+        return [span.as_dict() for span in self.spans.values()]
+
+
+def _enable_profile():
+    """Returns an enabled cProfile.Profile, or None if another profiler is active."""
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:
+        # sys.monitoring allows one profiler per process; timings still work
+        return None
+    return profile
+
+
+def start_profiling(path):
+    """Profiles every thread that runs inside profile_thread() until stop_profiling()."""
+    global _profile_path
+    with _profile_lock:
+        _profile_path = path
+        _profiles.clear()
+        if PROCESS_WIDE_PROFILER:
+            profile = _enable_profile()
+            if profile is not None:
+                _profiles.append(profile)
+
+
+@contextlib.contextmanager
+def profile_thread():
+    """Runs a block under cProfile if profiling has been started; otherwise does nothing."""
+    profile = None
+    if _profile_path is not None and not PROCESS_WIDE_PROFILER:
+        profile = _enable_profile()
+    if profile is None:
+        yield
+        return
+    try:
+        yield
+    finally:
+        profile.disable()
+        with _profile_lock:
+            _profiles.append(profile)
+
+
+def stop_profiling():
+    """Writes the collected profiles to one pstats file and returns its path, or None."""
+    global _profile_path
+    with _profile_lock:
+        path, _profile_path = _profile_path, None
+        profiles = list(_profiles)
+        _profiles.clear()
+    if PROCESS_WIDE_PROFILER:
+        for profile in profiles:
+            profile.disable()
+    if path is None or not profiles:
+        return None
+    stats = pstats.Stats(profiles[0])
+    for profile in profiles[1:]:
+        stats.add(profile)
+    stats.dump_stats(path)
+    return path
+
+
+def pop_profile_option(argv):
+    """
+    Removes a leading "--profile FILE" (or "--profile=FILE") from argv.
+
+    Returns (FILE or None, the remaining arguments).
+    """
+    if argv and argv[0].startswith('--profile='):
+        return argv[0].split('=', 1)[1], argv[1:]
+    if argv and argv[0] == '--profile':
+        if len(argv) < 2:
+            raise SystemExit("--profile needs a file name, e.g. --profile run.prof")
+        return argv[1], argv[2:]
+    return None, argv
@@ -0,0 +1,170 @@
+"""
+A small query language for filtering exports, e.g.
+
+    type=login AND login_uri~bank AND folder!=Work
+
+Predicates are joined with AND. Operators:
+
+    =   equals                  !=  does not equal
+    ~   contains                !~  does not contain
+    =~  matches a regular expression
+
+Comparisons ignore case unless the query is case sensitive. Values may be
+quoted to keep spaces or the word AND; an empty value matches blank fields.
+"""
+
+import re
+import shlex
+
+import numpy as np
+
+from bitwarden_csv_manager.search import column_values, compile_pattern, match_mask
+
+# Tried in order at each position, so two-character operators come first.
+OPERATORS = ('!=', '!~', '=~', '=', '~')
+PREDICATE_RE = re.compile(r'^(.*?)(' + '|'.join(re.escape(op) for op in OPERATORS) + r')(.*)$', re.S)
+
+# Rows sampled to estimate how selective each predicate is.
+PLAN_SAMPLE_ROWS = 2000
+
+
+class QueryError(ValueError):
+    """Raised for a query that cannot be parsed or names unknown columns."""
+
+
+class Predicate:
+    """One column comparison in a query."""
+
+    def __init__(self, column, op, value):
+        if op not in OPERATORS:
+            raise QueryError(f"Unknown operator: {op}")
+        if op == '=~':
+            try:
+                compile_pattern(value)
+            except re.error as e:
+                raise QueryError(f"Invalid regular expression '{value}': {e}")
+        self.column = column
+        self.op = op
+        self.value = value
+
+    def __str__(self):
+        value = self.value
+        if not value or re.search(r'\s|"', value) or value.upper() == 'AND':
+            value = "'" + value + "'"
+        return f"{self.column}{self.op}{value}"
+
+    def mask(self, df, case=False):
+        """Returns a boolean array marking the rows of df that satisfy the predicate."""
+        values = column_values(df[self.column])
+        if self.op in ('=', '!='):
+            if case:
+                matches = (values == self.value).to_numpy(dtype=bool)
+            else:
+                matches = (values.str.lower() == self.value.lower()).to_numpy(dtype=bool)
+        elif self.op in ('~', '!~'):
+            matches = match_mask(values, self.value, case=case, mode='literal')
+        else:
+            matches = match_mask(values, self.value, case=case, mode='regex')
+        return ~matches if self.op.startswith('!') else matches
+
+
+class Query:
+    """A conjunction of predicates, evaluated most selective first."""
+
+    def __init__(self, predicates, case=False):
+        if not predicates:
+            raise QueryError("Empty query")
+        self.predicates = list(predicates)
+        self.case = case
+        self._plan = None
+
+    def __str__(self):
+        return " AND ".join(str(predicate) for predicate in self.predicates)
+
+    @property
+    def columns(self):
+        return [predicate.column for predicate in self.predicates]
+
+    def plan(self, df):
+        """
+        Orders the predicates by the fraction of rows they keep on a sample of df.
+
+        The order is computed once and reused, so for streamed input it comes
+        from the first chunk.
+        """
+        if self._plan is None:
+            sample = df.head(PLAN_SAMPLE_ROWS)
+            if len(self.predicates) == 1 or sample.empty:
+                self._plan = list(self.predicates)
+            else:
+                keep_rates = [predicate.mask(sample, self.case).mean() for predicate in self.predicates]
+                # Regex predicates are the most expensive, so they break ties last
+                order = sorted(
+                    range(len(self.predicates)),
+                    key=lambda i: (keep_rates[i], self.predicates[i].op == '=~')
+                )
+                self._plan = [self.predicates[i] for i in order]
+        return self._plan
+
+    def mask(self, df, index=None):
+        """
+        Returns a boolean array marking the rows of df that match.
+
+        Each predicate only looks at rows that survived the previous ones.
+        If index is a SearchIndex over df, contains predicates use it.
+        """
+        keep = np.arange(len(df))
+        for predicate in self.plan(df):
+            if len(keep) == 0:
+                break
+            if index is not None and predicate.op == '~':
+                positions = index.column_index(predicate.column).search(predicate.value, case=self.case)
+                keep = np.intersect1d(keep, positions, assume_unique=True)
+            else:
+                subset = df if len(keep) == len(df) else df.iloc[keep]
+                keep = keep[predicate.mask(subset, self.case)]
+
+        result = np.zeros(len(df), dtype=bool)
+        result[keep] = True
+        return result
+
+    def filter(self, df, index=None):
+        """Returns the rows of df that match."""
+        return df[self.mask(df, index=index)]
+
+
+def parse_query(text, columns=None, case=False):
+    """Parses a query string, checking column names against columns if given."""
+    lexer = shlex.shlex(text, posix=True)
+    lexer.whitespace_split = True
+    lexer.commenters = ''
+    lexer.escape = ''  # Keep backslashes for regular expressions
+    try:
+        tokens = list(lexer)
+    except ValueError as e:
+        raise QueryError(f"Invalid query: {e}")
+
+    groups = [[]]
+    for token in tokens:
+        if token.upper() == 'AND':
+            groups.append([])
+        else:
+            groups[-1].append(token)
+
+    predicates = []
+    for group in groups:
+        term = " ".join(group)
+        match = PREDICATE_RE.match(term)
+        if not match or not match.group(1).strip():
+            raise QueryError(f"Expected column, operator and value, got '{term}'")
+        column, op, value = match.group(1).strip(), match.group(2), match.group(3).strip()
+        if columns is not None and column not in columns:
+            raise QueryError(f"Unknown column: {column}")
+        predicates.append(Predicate(column, op, value))
+
+    return Query(predicates, case=case)
+
+
+def column_query(column, value, mode='literal', case=False):
+    """Builds a single-predicate query from a column search."""
+    return Query([Predicate(column, '=~' if mode == 'regex' else '~', value)], case=case)
@@ -0,0 +1,116 @@
+"""
+Bitwarden export schema and memory-compact dtypes.
+
+Exports are read with every field as text, so values such as phone-number
+usernames, "0123" passwords or the literal string "NA" survive unchanged,
+and then narrowed column by column:
+
+    folder, type          categorical
+    favorite, reprompt    nullable UInt8
+    everything else       arrow-backed strings if pyarrow is installed,
+                          otherwise object strings with repeats shared
+
+Writing a compact frame with to_csv(index=False) reproduces the input.
+"""
+
+import importlib.util
+import sys
+
+import numpy as np
+import pandas as pd
+
+from bitwarden_csv_manager.engines import read_text_csv
+from bitwarden_csv_manager.lite import IDEAL_COLUMNS, load_ideal_columns
+
+CATEGORY_COLUMNS = ['folder', 'type']
+FLAG_COLUMNS = ['favorite', 'reprompt']
+
+# Columns identifying an entry in reports; passwords are never included
+ENTRY_COLUMNS = ['folder', 'name', 'login_uri', 'login_username']
+PASSWORD_COLUMN = 'login_password'
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+def format_frame(df, columns=None):
+    """Projects df onto the ideal columns, adding missing ones, and fills blanks."""
+    columns = list(columns or load_ideal_columns())
+    return fill_blanks(df.reindex(columns=columns))
+
+
+def read_compact_csv(file_path, engine=None, usecols=None):
+    """Reads a CSV export with compact, lossless dtypes using the given parser engine."""
+    return compact_frame(read_text_csv(file_path, engine=engine, usecols=usecols))
+
+
+def compact_frame(df):
+    """Narrows the text columns of a frame read by engines.read_text_csv."""
+    df = df.copy()
+    for col in df.columns:
+        df[col] = compact_column(col, df[col])
+    return df
+
+
+def compact_column(name, series):
+    """Narrows one text column according to its Bitwarden column name."""
+    if name in CATEGORY_COLUMNS:
+        return series.astype('category')
+    if name in FLAG_COLUMNS:
+        return _flag_column(series)
+    return _string_column(series)
+
+
+def _flag_column(series):
+    numbers = pd.to_numeric(series, errors='coerce')
+    present = series.notna()
+    values = numbers[present]
+    # Only convert when every value is a plain small integer, so output is unchanged;
+    # the integral check keeps values such as 1.5 from reaching the Int64 cast
+    canonical = (
+        values.notna().all() and values.between(0, 255).all() and (values % 1 == 0).all()
+        and (values.astype('Int64').astype(str) == series[present]).all()
+    )
+    if canonical:
+        return numbers.astype('UInt8')
+    return series.astype('category')
+
+
+def _string_column(series):
+    # The pyarrow string dtype needs pandas 1.3, the oldest version supported
+    if HAS_PYARROW:
+        return series.astype('string[pyarrow]')
+    # Point equal values at one str object instead of one copy per row
+    codes, uniques = pd.factorize(series)
+    values = np.asarray(uniques, dtype=object)[codes] if len(uniques) else np.empty(len(codes), dtype=object)
+    values[codes == -1] = np.nan
+    return pd.Series(values, index=series.index, dtype=object, name=series.name)
+
+
+def fill_blanks(df):
+    """Replaces missing values with empty strings, keeping compact dtypes."""
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            if series.isna().any() and "" not in series.cat.categories:
+                series = series.cat.add_categories([""])
+            df[col] = series.fillna("")
+        elif not pd.api.types.is_integer_dtype(series.dtype):
+            # Nullable integers stay <NA>, which to_csv writes as a blank
+            df[col] = series.fillna("")
+    return df
+
+
+def memory_usage(df):
+    """Returns the memory used by a frame in bytes, counting shared strings once."""
+    total = int(df.index.memory_usage(deep=True))
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == object:
+            values = series.to_numpy()
+            unique = {id(value): value for value in values}
+            total += values.nbytes + sum(sys.getsizeof(value) for value in unique.values())
+        else:
+            total += int(series.memory_usage(deep=True, index=False))
+    return total
+
@@ -0,0 +1,124 @@
+"""
+Literal and regex search over exports, with a trigram index for fast
+repeated substring search.
+"""
+
+import functools
+import re
+from array import array
+
+import numpy as np
+
+GRAM_SIZE = 3
+
+# Literal matches plain substrings; regex treats the query as a regular expression.
+SEARCH_MODES = ('literal', 'regex')
+DEFAULT_SEARCH_MODE = 'literal'
+
+PATTERN_CACHE_SIZE = 128
+
+
+def column_values(series):
+    """Returns a column as strings, with NaN as the empty string."""
+    return series.astype(object).where(series.notna(), "").astype(str)
+
+
+def trigrams(text):
+    """Returns the set of character trigrams of text."""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+@functools.lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern, case=False):
+    """Compiles a regular expression, keeping recently used ones in an LRU cache."""
+    return re.compile(pattern, 0 if case else re.IGNORECASE)
+
+
+def match_mask(values, query, case=False, mode=DEFAULT_SEARCH_MODE):
+    """Returns a boolean array marking the string values that match query."""
+    if mode == 'literal':
+        return values.str.contains(query, case=case, regex=False).to_numpy(dtype=bool)
+    if mode == 'regex':
+        search = compile_pattern(query, case).search
+        return np.fromiter((search(text) is not None for text in values), dtype=bool, count=len(values))
+    raise ValueError(f"Unknown search mode: {mode}")
+
+
+class TrigramIndex:
+    """
+    Inverted index from lowercased trigrams to row positions of one column.
+
+    Posting lists are stored as one sorted array with per-trigram offsets.
+    Lookups return candidate rows only; callers must verify them.
+    """
+
+    def __init__(self, series):
+        self.values = column_values(series).reset_index(drop=True)
+        self._grams = {}
+
+        gram_ids = array('q')
+        rows = array('q')
+        for row, text in enumerate(self.values):
+            for gram in trigrams(text.lower()):
+                gram_ids.append(self._grams.setdefault(gram, len(self._grams)))
+                rows.append(row)
+
+        gram_ids = np.frombuffer(gram_ids, dtype=np.int64) if gram_ids else np.empty(0, dtype=np.int64)
+        rows = np.frombuffer(rows, dtype=np.int64) if rows else np.empty(0, dtype=np.int64)
+
+        # A stable sort keeps the rows of each trigram in ascending order
+        order = np.argsort(gram_ids, kind='stable')
+        self._rows = rows[order].astype(np.int32 if len(self.values) < 2 ** 31 else np.int64)
+        self._offsets = np.searchsorted(gram_ids[order], np.arange(len(self._grams) + 1))
+
+    def candidates(self, query):
+        """Returns sorted row positions that contain every trigram of query, or None for all rows."""
+        grams = trigrams(query.lower())
+        if not grams:
+            return None
+
+        postings = []
+        for gram in grams:
+            gram_id = self._grams.get(gram)
+            if gram_id is None:
+                return np.empty(0, dtype=self._rows.dtype)
+            postings.append(self._rows[self._offsets[gram_id]:self._offsets[gram_id + 1]])
+
+        # Intersect from the rarest trigram up so the working set stays small
+        postings.sort(key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+    def search(self, query, case=False):
+        """Returns the sorted row positions whose value contains query as a substring."""
+        candidates = self.candidates(query)
+        values = self.values if candidates is None else self.values.iloc[candidates]
+        matches = match_mask(values, query, case=case)
+        if candidates is None:
+            return np.flatnonzero(matches)
+        return candidates[matches]
+
+
+class SearchIndex:
+    """Trigram indices for the columns of one DataFrame, built on first use."""
+
+    def __init__(self, df):
+        self.df = df
+        self._indices = {}
+
+    def column_index(self, column):
+        """Returns the index for column, building it once."""
+        if column not in self._indices:
+            self._indices[column] = TrigramIndex(self.df[column])
+        return self._indices[column]
+
+    def filter(self, column, value, case=False, mode=DEFAULT_SEARCH_MODE):
+        """Returns the rows whose column matches value in the given search mode."""
+        if mode == 'regex':
+            # Regular expressions need a full scan
+            return self.df[match_mask(column_values(self.df[column]), value, case=case, mode=mode)]
+        return self.df.iloc[self.column_index(column).search(value, case=case)]
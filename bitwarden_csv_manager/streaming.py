@@ -0,0 +1,174 @@
+"""
+Chunked CSV streaming for exports that are too large to load at once.
+
+Paths ending in .json are read and written as Bitwarden JSON exports
+instead, see json_format.
+"""
+
+import csv
+import io
+import math
+import os
+
+import pandas as pd
+
+from bitwarden_csv_manager.engines import READ_KWARGS
+from bitwarden_csv_manager.json_format import export_json_chunks, is_json_path, iter_json_chunks
+from bitwarden_csv_manager.lite import DEFAULT_MEMORY_LIMIT, MEMORY_OVERHEAD_FACTOR, atomic_output, needs_streaming
+from bitwarden_csv_manager.parallel import PARALLEL_MIN_BYTES, iter_ranges, read_parallel, resolve_workers, split_ranges
+from bitwarden_csv_manager.schema import IDEAL_COLUMNS, compact_frame, format_frame
+from bitwarden_csv_manager.search import DEFAULT_SEARCH_MODE, column_values, match_mask
+
+DEFAULT_CHUNKSIZE = 50000
+MIN_CHUNKSIZE = 1000
+SAMPLE_BYTES = 1024 * 1024
+
+# Rough size of one item in a JSON export, which has no records to sample cheaply
+JSON_BYTES_PER_ITEM = 600
+
+
+def estimate_chunksize(file_path, memory_limit=DEFAULT_MEMORY_LIMIT):
+    """Estimates how many rows of a CSV file fit within memory_limit bytes."""
+    if is_json_path(file_path):
+        return max(MIN_CHUNKSIZE, int(memory_limit / (JSON_BYTES_PER_ITEM * MEMORY_OVERHEAD_FACTOR)))
+
+    with open(file_path, 'r', encoding='utf-8', errors='replace', newline='') as handle:
+        sample = handle.read(SAMPLE_BYTES)
+
+    # Count records rather than lines so multi-line notes are not overcounted.
+    rows = sum(1 for _ in csv.reader(io.StringIO(sample))) - 1
+    if rows <= 0:
+        return MIN_CHUNKSIZE
+
+    bytes_per_row = len(sample) / rows
+    return max(MIN_CHUNKSIZE, int(memory_limit / (bytes_per_row * MEMORY_OVERHEAD_FACTOR)))
+
+
+def read_header(file_path):
+    """Reads only the header of a CSV file into an empty DataFrame."""
+    if is_json_path(file_path):
+        return pd.DataFrame(columns=IDEAL_COLUMNS)
+    return pd.read_csv(file_path, nrows=0)
+
+
+def iter_chunks(file_path, chunksize=None, memory_limit=DEFAULT_MEMORY_LIMIT,
+                progress=None, compact=True, workers=1, **read_kwargs):
+    """
+    Yields DataFrame chunks from a CSV file (or a JSON export, see json_format).
+
+    When chunksize is not given it is derived from memory_limit. If progress
+    is given it is called after every chunk as
+    progress(rows_read, bytes_read, total_bytes). With compact, chunks are
+    read losslessly as text and narrowed as in schema.read_compact_csv.
+
+    workers other than 1 (None for every core) parses large compact CSV
+    files in a process pool, see parallel.iter_ranges; the default reads
+    in this process, as code already running in a pool worker must.
+    """
+    sized_by_memory = chunksize is None
+    if chunksize is None:
+        chunksize = estimate_chunksize(file_path, memory_limit)
+    if is_json_path(file_path):
+        yield from iter_json_chunks(
+            file_path, chunksize, progress=progress, compact=compact, usecols=read_kwargs.get('usecols')
+        )
+        return
+
+    total_bytes = os.path.getsize(file_path)
+    rows_read = 0
+    workers = resolve_workers(workers)
+    split = None
+    if (sized_by_memory and workers > 1 and compact and total_bytes >= PARALLEL_MIN_BYTES
+            and set(read_kwargs) <= {'usecols'}):
+        # The budget covers the chunk in use and those parsed ahead of it
+        split = split_ranges(file_path, math.ceil(total_bytes * MEMORY_OVERHEAD_FACTOR * (workers + 1) / memory_limit))
+    if split is not None:
+        for chunk, bytes_read in iter_ranges(file_path, *split, workers=workers, usecols=read_kwargs.get('usecols')):
+            rows_read += len(chunk)
+            if progress is not None:
+                progress(rows_read, bytes_read, total_bytes)
+            yield chunk
+        return
+
+    if compact:
+        read_kwargs = dict(READ_KWARGS, **read_kwargs)
+    with open(file_path, 'rb') as handle:
+        reader = pd.read_csv(handle, chunksize=chunksize, **read_kwargs)
+        for chunk in reader:
+            if compact:
+                chunk = compact_frame(chunk)
+            rows_read += len(chunk)
+            if progress is not None:
+                progress(rows_read, min(handle.tell(), total_bytes), total_bytes)
+            yield chunk
+
+
+def split_frame(df, chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    """
+    Yields consecutive slices of an in-memory DataFrame.
+
+    progress has the same signature as in iter_chunks, with rows standing in
+    for bytes.
+    """
+    total_rows = len(df)
+    for start in range(0, total_rows, chunksize):
+        chunk = df.iloc[start:start + chunksize]
+        if progress is not None:
+            progress(start + len(chunk), start + len(chunk), total_rows)
+        yield chunk
+
+
+def filter_chunks(chunks, column, value, case=False, mode=DEFAULT_SEARCH_MODE):
+    """Yields the rows of each chunk whose column matches value."""
+    for chunk in chunks:
+        yield chunk[match_mask(column_values(chunk[column]), value, case=case, mode=mode)]
+
+
+def query_chunks(chunks, query):
+    """Yields the rows of each chunk that match a Query, dropping the rest as they are read."""
+    for chunk in chunks:
+        yield chunk[query.mask(chunk)]
+
+
+def format_chunks(chunks, columns=None):
+    """Yields each chunk reordered to the ideal Bitwarden columns, see schema.format_frame."""
+    for chunk in chunks:
+        yield format_frame(chunk, columns)
+
+
+def export_chunks(chunks, file_path):
+    """
+    Writes DataFrame chunks to a single CSV (or JSON) file and returns the row count.
+
+    The file only appears once every chunk is written, see lite.atomic_output.
+    """
+    with atomic_output(file_path) as tmp_path:
+        if is_json_path(file_path):
+            return export_json_chunks(chunks, tmp_path)
+        rows = 0
+        header = True
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as handle:
+            for chunk in chunks:
+                chunk.to_csv(handle, index=False, header=header)
+                header = False
+                rows += len(chunk)
+        return rows
+
+
+def collect_chunks(chunks, columns=None):
+    """Concatenates DataFrame chunks, keeping columns when nothing is yielded."""
+    frames = [chunk for chunk in chunks if not chunk.empty]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_export(file_path):
+    """
+    Reads a whole CSV or JSON export, narrowed as by schema.read_compact_csv.
+
+    Large CSV files are parsed on every core, see parallel.read_parallel.
+    """
+    if is_json_path(file_path):
+        return compact_frame(collect_chunks(iter_json_chunks(file_path, compact=False), columns=IDEAL_COLUMNS))
+    return read_parallel(file_path)
@@ -0,0 +1,105 @@
+"""
+Background execution of long-running work for the GUI.
+"""
+
+import queue
+import threading
+
+from bitwarden_csv_manager import profiling
+
+
+class TaskCancelled(Exception):
+    """Raised inside a task once the user has asked to cancel it."""
+
+
+class BackgroundTask:
+    """
+    Runs work(task) on a daemon thread and hands the outcome back to the Tk thread.
+
+    The work function must not touch any widget. It reports progress through
+    report() or progress() and should call check_cancelled() between steps;
+    both raise TaskCancelled after cancel() has been called. The Tk thread
+    polls for messages with root.after, so every callback runs on the UI thread.
+    Stages of the work can be timed with task.timings (see profiling.py).
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, root, work, on_success, on_error=None, on_status=None,
+                 on_cancel=None, on_finish=None, timings=None):
+        self.root = root
+        self.work = work
+        self.on_success = on_success
+        self.on_error = on_error
+        self.on_status = on_status
+        self.on_cancel = on_cancel
+        self.on_finish = on_finish
+        self.timings = timings if timings is not None else profiling.Timings()
+
+        self._messages = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Start the worker thread and begin polling for its messages."""
+        self._thread.start()
+        self.root.after(self.POLL_MS, self._poll)
+        return self
+
+    def cancel(self):
+        """Ask the worker to stop at its next check point."""
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        """Raise TaskCancelled if cancel() has been called."""
+        if self._cancel_event.is_set():
+            raise TaskCancelled()
+
+    def report(self, message):
+        """Send a status message to the UI thread."""
+        self.check_cancelled()
+        self._messages.put(('status', message))
+
+    def progress(self, rows_read, bytes_read, total_bytes):
+        """Streaming progress callback, see streaming.iter_chunks."""
+        percent = 100 * bytes_read / total_bytes if total_bytes else 100
+        self.report(f"Processed {rows_read} records ({percent:.0f}%) - press Cancel to stop")
+
+    def _run(self):
+        try:
+            with profiling.profile_thread():
+                result = self.work(self)
+        except TaskCancelled:
+            self._messages.put(('cancelled', None))
+        except Exception as e:
+            self._messages.put(('error', e))
+        else:
+            self._messages.put(('done', result))
+
+    def _poll(self):
+        while True:
+            try:
+                kind, payload = self._messages.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == 'status':
+                if self.on_status:
+                    self.on_status(payload)
+                continue
+
+            if self.on_finish:
+                self.on_finish()
+            if kind == 'done':
+                self.on_success(payload)
+            elif kind == 'error' and self.on_error:
+                self.on_error(payload)
+            elif kind == 'cancelled' and self.on_cancel:
+                self.on_cancel()
+            return
+
+        self.root.after(self.POLL_MS, self._poll)
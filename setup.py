@@ -33,6 +33,9 @@ setup(
     ],
     python_requires=">=3.7",
     install_requires=requirements,
+    extras_require={
+        "fast": ["pyarrow"],
+    },
     entry_points={
         "console_scripts": [
             "bitwarden-csv-manager=bitwarden_csv_manager.main:main",